@@ -0,0 +1,43 @@
+-- ============================================================================
+-- EMAIL OUTBOX (POST /passes/generate queues emails, email workers send them)
+-- ============================================================================
+--
+-- New databases get these from the models (init_db).
+-- Existing databases need this script - run it in the Supabase SQL Editor.
+--
+-- ============================================================================
+
+-- Queued pass emails
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id SERIAL PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    recipient VARCHAR(255) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 6,
+    next_attempt_at TIMESTAMPTZ NOT NULL,
+    last_error VARCHAR(1000),
+    provider VARCHAR(50),
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMPTZ,
+    created_by VARCHAR(100),
+    created_at TIMESTAMPTZ DEFAULT now(),
+    sent_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS ix_email_outbox_entry_id
+    ON email_outbox (entry_id);
+
+-- Workers poll for due messages
+CREATE INDEX IF NOT EXISTS ix_email_outbox_status_next
+    ON email_outbox (status, next_attempt_at);
+
+-- Delivery status shown with each entry
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS email_status VARCHAR(20);
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS email_status_at TIMESTAMPTZ;
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS email_error VARCHAR(500);
+
+-- Show results
+SELECT
+    (SELECT COUNT(*) FROM email_outbox) AS queued_emails,
+    (SELECT COUNT(*) FROM entries WHERE email_status IS NOT NULL) AS entries_with_email_status;
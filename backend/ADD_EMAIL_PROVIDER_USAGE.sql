@@ -0,0 +1,19 @@
+-- ============================================================================
+-- EMAIL PROVIDER DAILY CAPS (EMAIL_RATE_LIMITS "daily", e.g. Gmail 500/day)
+-- ============================================================================
+--
+-- New databases get this from the models (init_db).
+-- Existing databases need this script - run it in the Supabase SQL Editor.
+--
+-- ============================================================================
+
+-- Sends per provider and UTC day, shared by all API and email worker processes
+CREATE TABLE IF NOT EXISTS email_provider_usage (
+    provider VARCHAR(50) NOT NULL,
+    day DATE NOT NULL,
+    sent INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (provider, day)
+);
+
+-- Show results
+SELECT provider, day, sent FROM email_provider_usage ORDER BY day DESC, provider;
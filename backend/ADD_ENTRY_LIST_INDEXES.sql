@@ -0,0 +1,45 @@
+-- ============================================================================
+-- INDEXES FOR THE PAGINATED ADMIN ENTRY LIST (GET /admin/entries/page)
+-- ============================================================================
+--
+-- New databases get the composite indexes from the Entry model (init_db).
+-- Existing databases need this script - run it in the Supabase SQL Editor.
+-- CONCURRENTLY avoids locking the entries table while the indexes build
+-- (run each statement on its own, not inside a transaction).
+--
+-- ============================================================================
+
+-- Keyset pagination (ORDER BY id) filtered by organization / exhibitor flag
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entries_username_id
+    ON entries (username, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entries_exhibitor_id
+    ON entries (is_exhibitor_pass, id);
+
+-- Per pass type filters (partial indexes stay small - only rows with the pass)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entries_ex_day1_id
+    ON entries (id) WHERE exhibition_day1;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entries_ex_day2_id
+    ON entries (id) WHERE exhibition_day2;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entries_interactive_id
+    ON entries (id) WHERE interactive_sessions;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entries_plenary_id
+    ON entries (id) WHERE plenary;
+
+-- Text search on name / email (LIKE '%term%' on lower(...)) needs trigram indexes
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entries_name_trgm
+    ON entries USING gin (lower(name) gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entries_email_trgm
+    ON entries USING gin (lower(email) gin_trgm_ops);
+
+-- Check the indexes exist
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'entries'
+ORDER BY indexname;
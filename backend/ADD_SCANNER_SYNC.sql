@@ -0,0 +1,40 @@
+-- ============================================================================
+-- OFFLINE SCANNER SYNC (GET /scanner/sync, POST /scanner/checkins/batch)
+-- ============================================================================
+--
+-- New databases get these from the models (init_db).
+-- Existing databases need this script - run it in the Supabase SQL Editor.
+--
+-- ============================================================================
+
+-- Revocation log for deleted entries (sync cursor = id)
+CREATE TABLE IF NOT EXISTS pass_revocations (
+    id SERIAL PRIMARY KEY,
+    entry_id INTEGER NOT NULL,
+    reason VARCHAR(255),
+    revoked_by VARCHAR(100),
+    revoked_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_pass_revocations_entry_id
+    ON pass_revocations (entry_id);
+
+-- Delta downloads of changed entries (keyset on updated_at, id)
+CREATE INDEX IF NOT EXISTS ix_entries_updated_id
+    ON entries (updated_at, id);
+
+-- Keep only the earliest check-in per attendee and session before adding the constraint
+DELETE FROM check_ins c
+USING check_ins earlier
+WHERE c.entry_id = earlier.entry_id
+  AND c.session_type = earlier.session_type
+  AND (earlier.check_in_time, earlier.id) < (c.check_in_time, c.id);
+
+-- One check-in per attendee per session (duplicate scans across gates)
+ALTER TABLE check_ins
+    ADD CONSTRAINT uq_check_ins_entry_session UNIQUE (entry_id, session_type);
+
+-- Show results
+SELECT
+    (SELECT COUNT(*) FROM pass_revocations) AS revocations,
+    (SELECT COUNT(*) FROM check_ins) AS check_ins;
@@ -0,0 +1,30 @@
+-- ============================================================================
+-- SCANNER SYNC CHANGE CURSORS (GET /scanner/sync)
+-- ============================================================================
+--
+-- Revocations and check-ins are paged on settled (timestamp, id) cursors
+-- instead of bare ids, and a check-in moved by an earlier offline scan gets
+-- a new updated_at so devices download it again.
+--
+-- New databases get these from the models (init_db).
+-- Existing databases need this script - run it in the Supabase SQL Editor
+-- (after ADD_SCANNER_SYNC.sql).
+--
+-- ============================================================================
+
+-- Change marker for check-ins, bumped by the app when a check-in moves
+-- (existing rows get the time of this migration)
+ALTER TABLE check_ins ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+
+-- Delta downloads of check-ins (keyset on updated_at, id)
+CREATE INDEX IF NOT EXISTS ix_check_ins_updated_id
+    ON check_ins (updated_at, id);
+
+-- Delta downloads of revocations (keyset on revoked_at, id)
+CREATE INDEX IF NOT EXISTS ix_pass_revocations_revoked_id
+    ON pass_revocations (revoked_at, id);
+
+-- Show results
+SELECT
+    (SELECT COUNT(*) FROM check_ins WHERE updated_at IS NOT NULL) AS check_ins_with_updated_at,
+    (SELECT COUNT(*) FROM pass_revocations) AS revocations;
@@ -1,17 +1,31 @@
 """
 Admin API endpoints - User and entry management
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
+from datetime import datetime
 from pydantic import BaseModel
 
 from ..core.database import get_db
-from ..api.auth import get_current_admin, get_current_user
-from ..core.security import hash_password
-from ..models import Entry, User
-from ..schemas.entry import EntryResponse
+from ..api.auth import get_current_admin, get_current_user, hash_password_offloaded
+from ..api.entries import DashboardStats, build_dashboard_stats, entry_stats_columns
+from ..models import BulkEmailJob, Entry, User
+from ..schemas.entry import EntryResponse, EntryListResponse
 from ..schemas.user import UserCreate, UserResponse
+from ..services.bulk_email_jobs import bulk_email_runner
+from ..services.checkin_index import checkin_index
+from ..services.quota_ledger import quota_ledger
+from ..services.entry_export import entry_export, ExportFormatError
+from ..services.scanner_sync import scanner_sync
+from ..services.user_cache import user_cache
+from ..services.password_hasher import password_hasher
+from ..services.login_throttle import login_throttle
+from ..services.email_outbox import email_outbox
+from ..services.email_service import email_service
 
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -30,20 +44,45 @@ class UserUpdate(BaseModel):
     quota_plenary: int | None = None
 
 
+class OrganizationStats(DashboardStats):
+    """Dashboard statistics for one organization (user account)"""
+    username: str
+    organization: str
+
+
 class BulkEmailRequest(BaseModel):
     """Schema for bulk email request"""
     entry_ids: List[int]
 
 
-class BulkEmailResponse(BaseModel):
-    """Schema for bulk email response"""
-    success: int
+class BulkEmailFailure(BaseModel):
+    """Schema for a failed entry in a bulk email job"""
+    entry_id: int
+    email: Optional[str] = None
+    error: str
+
+
+class BulkEmailJobStatus(BaseModel):
+    """Schema for bulk email job progress"""
+    job_id: str
+    status: str
+    total: int
+    processed: int
+    sent: int
     failed: int
-    message: str
+    remaining: int
+    throughput_per_minute: Optional[float] = None
+    eta_seconds: Optional[int] = None
+    failures: List[BulkEmailFailure] = []
+    error: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 
 @router.get("/users", response_model=List[UserResponse])
-async def get_all_users(
+def get_all_users(
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -60,32 +99,37 @@ async def create_user(
 ):
     """Create new user (admin only)"""
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.username == user_data.username).first()
+    )
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Username '{user_data.username}' already exists"
         )
 
-    # Create user
+    # Create user (bcrypt runs in its pool, the insert in the threadpool)
     db_user = User(
         username=user_data.username,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hash_password_offloaded(user_data.password),
         organization=user_data.organization,
         max_entries=user_data.max_entries,
         role=user_data.role,
         allowed_passes=user_data.allowed_passes or {}
     )
 
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    def save_user() -> None:
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+
+    await run_in_threadpool(save_user)
 
     return db_user
 
 
 @router.put("/users/{username}", response_model=UserResponse)
-async def update_user(
+def update_user(
     username: str,
     user_update: UserUpdate,
     current_user: User = Depends(get_current_admin),
@@ -107,12 +151,14 @@ async def update_user(
 
     db.commit()
     db.refresh(user)
+    # Role, quota and is_active changes apply to the user's next request
+    user_cache.invalidate(user.username)
 
     return user
 
 
 @router.delete("/users/{username}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(
+def delete_user(
     username: str,
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
@@ -133,14 +179,19 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
 
+    quota_ledger.forget(db, user.username)
+    entry_ids = [entry_id for (entry_id,) in db.query(Entry.id).filter(Entry.username == user.username)]
+    scanner_sync.revoke(db, entry_ids, "user_deleted", current_user.username)
     db.delete(user)
     db.commit()
+    user_cache.invalidate(username)
+    checkin_index.evict(entry_ids)
 
     return None
 
 
 @router.get("/entries", response_model=List[EntryResponse])
-async def get_all_entries(
+def get_all_entries(
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -149,8 +200,210 @@ async def get_all_entries(
     return entries
 
 
-@router.post("/bulk-email", response_model=BulkEmailResponse)
-async def send_bulk_email(
+def filter_entries(
+    query,
+    username: Optional[str] = None,
+    organization: Optional[str] = None,
+    pass_type: Optional[str] = None,
+    is_exhibitor: Optional[bool] = None,
+    generated: Optional[bool] = None,
+    search: Optional[str] = None
+):
+    """Apply the admin entry list filters to an Entry query"""
+    if username:
+        query = query.filter(Entry.username == username)
+    if organization:
+        query = query.filter(Entry.username.in_(
+            select(User.username).where(User.organization == organization)
+        ))
+    if pass_type:
+        query = query.filter(getattr(Entry, pass_type).is_(True))
+    if is_exhibitor is not None:
+        query = query.filter(Entry.is_exhibitor_pass.is_(is_exhibitor))
+    if generated is not None:
+        any_generated = or_(
+            Entry.pass_generated_exhibition_day1.is_(True),
+            Entry.pass_generated_exhibition_day2.is_(True),
+            Entry.pass_generated_interactive_sessions.is_(True),
+            Entry.pass_generated_plenary.is_(True)
+        )
+        query = query.filter(any_generated if generated else ~any_generated)
+    if search:
+        pattern = "%" + search.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = query.filter(or_(
+            func.lower(Entry.name).like(pattern, escape="\\"),
+            func.lower(Entry.email).like(pattern, escape="\\")
+        ))
+    return query
+
+
+@router.get("/entries/page", response_model=EntryListResponse)
+def get_entries_page(
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    order: Literal["desc", "asc"] = "desc",
+    username: Optional[str] = None,
+    organization: Optional[str] = None,
+    pass_type: Optional[Literal["exhibition_day1", "exhibition_day2", "interactive_sessions", "plenary"]] = None,
+    is_exhibitor: Optional[bool] = None,
+    generated: Optional[bool] = Query(None, description="Has at least one pass been generated"),
+    search: Optional[str] = Query(None, description="Text search on name / email"),
+    include_total: bool = True,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get one page of entries across all organizations (admin only)
+
+    Keyset pagination on entries.id - each page is an index range scan
+    regardless of how deep it is. Newest entries come first by default.
+    """
+    filtered = filter_entries(
+        db.query(Entry), username, organization, pass_type, is_exhibitor, generated, search
+    )
+
+    page_query = filtered
+    if cursor is not None:
+        page_query = page_query.filter(Entry.id < cursor if order == "desc" else Entry.id > cursor)
+    page_query = page_query.order_by(Entry.id.desc() if order == "desc" else Entry.id.asc())
+
+    # Fetch one extra row to know whether another page exists
+    rows = page_query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    entries = rows[:limit]
+
+    total = -1
+    if include_total:
+        total = filtered.with_entities(func.count(Entry.id)).scalar()
+
+    return EntryListResponse(
+        total=total,
+        entries=entries,
+        next_cursor=entries[-1].id if has_more else None
+    )
+
+
+def _export_response(export_format: str, header: List[str], rows, name: str, sheet_title: str):
+    """Wrap export rows in a streaming file download"""
+    try:
+        body = entry_export.stream(export_format, header, rows, sheet_title)
+    except ExportFormatError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    filename = f"swavlamban2025_{name}_{datetime.utcnow().strftime('%Y-%m-%d')}.{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=entry_export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/entries/export")
+def export_entries(
+    format: Literal["csv", "xlsx"] = "csv",
+    include_pass_status: bool = Query(False, description="Add a column with the passes already generated"),
+    include_checkins: bool = Query(False, description="Add check-in count and last check-in time"),
+    username: Optional[str] = None,
+    organization: Optional[str] = None,
+    pass_type: Optional[Literal["exhibition_day1", "exhibition_day2", "interactive_sessions", "plenary"]] = None,
+    is_exhibitor: Optional[bool] = None,
+    generated: Optional[bool] = None,
+    search: Optional[str] = None,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Download entries as CSV or XLSX (admin only)
+
+    Takes the same filters as /admin/entries/page. Rows are streamed from a
+    database cursor, so large events do not have to fit in memory.
+    """
+    filtered = filter_entries(
+        db.query(Entry), username, organization, pass_type, is_exhibitor, generated, search
+    )
+    rows = entry_export.entry_rows(filtered, include_pass_status, include_checkins)
+    header = entry_export.entry_header(include_pass_status, include_checkins)
+    return _export_response(format, header, rows, "all_entries", "Entries")
+
+
+@router.get("/checkins/export")
+def export_checkins(
+    format: Literal["csv", "xlsx"] = "csv",
+    session_type: Optional[str] = None,
+    current_user: User = Depends(get_current_admin)
+):
+    """Download gate check-ins as CSV or XLSX (admin only)"""
+    rows = entry_export.checkin_rows(session_type)
+    return _export_response(format, entry_export.checkin_header(), rows, "checkins", "Check-ins")
+
+
+@router.get("/stats", response_model=List[OrganizationStats])
+def get_all_stats(
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Get dashboard statistics for every organization in one query (admin only)"""
+    rows = db.query(User, *entry_stats_columns()).outerjoin(
+        Entry, Entry.username == User.username
+    ).group_by(User.username).order_by(User.username).all()
+
+    return [
+        OrganizationStats(
+            username=row.User.username,
+            organization=row.User.organization,
+            **build_dashboard_stats(row.User, row)
+        )
+        for row in rows
+    ]
+
+
+@router.post("/quota-ledger/rebuild")
+def rebuild_quota_ledger(
+    username: Optional[str] = None,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Recompute quota ledger counters from the entries table (admin only)
+
+    Only needed after entries were changed outside the API (e.g. manual SQL fixes)
+    """
+    rebuilt = quota_ledger.rebuild(db, username)
+    return {"rebuilt": rebuilt}
+
+
+@router.get("/auth-stats")
+def get_auth_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """Get password hashing pool and login throttle metrics (admin only)"""
+    return {
+        "password_hashing": password_hasher.stats(),
+        "login_throttle": login_throttle.stats()
+    }
+
+
+@router.get("/email-outbox")
+def get_email_outbox_stats(
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Get queued / sent / failed pass email counts (admin only)"""
+    return email_outbox.stats(db)
+
+
+@router.get("/email-providers")
+def get_email_provider_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """Get health, latency, circuit breaker state and rate limit metrics of each email provider in this worker (admin only)"""
+    return {"providers": email_service.provider_stats()}
+
+
+@router.post("/bulk-email", response_model=BulkEmailJobStatus, status_code=status.HTTP_202_ACCEPTED)
+def send_bulk_email(
     request: BulkEmailRequest,
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
@@ -160,9 +413,8 @@ async def send_bulk_email(
 
     This endpoint will:
     1. Validate all entry IDs exist
-    2. Generate passes for each entry (if not already generated)
-    3. Send email with passes to each entry's email address
-    4. Return success/failure count
+    2. Queue a background job that generates passes and emails each entry
+    3. Return the job immediately - poll GET /admin/bulk-email/{job_id} for progress
     """
     if not request.entry_ids:
         raise HTTPException(
@@ -170,56 +422,38 @@ async def send_bulk_email(
             detail="No entry IDs provided"
         )
 
-    # Get all entries
-    entries = db.query(Entry).filter(Entry.id.in_(request.entry_ids)).all()
+    # Validate all entries exist
+    requested_ids = set(request.entry_ids)
+    found_ids = {
+        entry_id for (entry_id,) in
+        db.query(Entry.id).filter(Entry.id.in_(requested_ids)).all()
+    }
 
-    if len(entries) != len(request.entry_ids):
-        found_ids = {e.id for e in entries}
-        missing_ids = set(request.entry_ids) - found_ids
+    if len(found_ids) != len(requested_ids):
+        missing_ids = requested_ids - found_ids
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Entries not found: {list(missing_ids)}"
+            detail=f"Entries not found: {sorted(missing_ids)}"
         )
 
-    # TODO: Implement pass generation and email sending
-    # For now, just return a placeholder response
-    success_count = 0
-    failed_count = 0
-
-    # This would be implemented with the email service
-    # from ..services.email_service import email_service
-    # from ..services.pass_generator import pass_generator
-    #
-    # for entry in entries:
-    #     try:
-    #         # Generate passes if not already generated
-    #         pass_files = pass_generator.generate_passes_for_entry(entry)
-    #
-    #         # Send email with passes
-    #         email_service.send_pass_email(
-    #             recipient_email=entry.email,
-    #             recipient_name=entry.name,
-    #             pass_files=pass_files
-    #         )
-    #
-    #         # Update pass generation flags
-    #         entry.pass_generated_exhibition_day1 = entry.exhibition_day1
-    #         entry.pass_generated_exhibition_day2 = entry.exhibition_day2
-    #         entry.pass_generated_interactive_sessions = entry.interactive_sessions
-    #         entry.pass_generated_plenary = entry.plenary
-    #
-    #         success_count += 1
-    #     except Exception as e:
-    #         failed_count += 1
-    #         continue
-    #
-    # db.commit()
-
-    # Placeholder response
-    success_count = len(entries)
-
-    return BulkEmailResponse(
-        success=success_count,
-        failed=failed_count,
-        message=f"Bulk email initiated for {len(entries)} entries. Implementation pending."
-    )
+    job = bulk_email_runner.enqueue(db, request.entry_ids, current_user.username)
+
+    return bulk_email_runner.describe(job)
+
+
+@router.get("/bulk-email/{job_id}", response_model=BulkEmailJobStatus)
+def get_bulk_email_job(
+    job_id: str,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Get progress of a bulk email job (admin only)"""
+    job = db.query(BulkEmailJob).filter(BulkEmailJob.id == job_id).first()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Bulk email job '{job_id}' not found"
+        )
+
+    return bulk_email_runner.describe(job)
@@ -1,15 +1,21 @@
 """
 Authentication API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from datetime import datetime
+import ipaddress
 
+from ..core.config import settings
 from ..core.database import get_db
-from ..core.security import verify_password, create_access_token, create_refresh_token, verify_token
+from ..core.security import create_access_token, create_refresh_token, verify_token
 from ..models import User
+from ..services.login_throttle import login_throttle
+from ..services.password_hasher import password_hasher, PasswordHasherBusyError
+from ..services.user_cache import user_cache
 from ..schemas.user import UserLogin, UserResponse, TokenResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -17,11 +23,75 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-async def get_current_user(
+def _trusted_proxies() -> list:
+    """Parsed TRUSTED_PROXIES networks"""
+    networks = []
+    for value in settings.TRUSTED_PROXIES.split(","):
+        if value.strip():
+            networks.append(ipaddress.ip_network(value.strip(), strict=False))
+    return networks
+
+
+TRUSTED_PROXY_NETWORKS = _trusted_proxies()
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    """Check if an address belongs to a configured proxy"""
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXY_NETWORKS)
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Client address used for throttling
+
+    X-Forwarded-For is client-controlled, so it is only used when the
+    request comes from a TRUSTED_PROXIES address - then the rightmost hop
+    that is not one of our proxies is the real client.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+
+    hops = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+async def verify_password_offloaded(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the bcrypt pool (503 when the pool is saturated)"""
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+
+
+async def hash_password_offloaded(password: str) -> str:
+    """Hash a password in the bcrypt pool (503 when the pool is saturated)"""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+
+
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    """Dependency to get current authenticated user"""
+    """Dependency to get current authenticated user (sync - FastAPI runs it in the threadpool)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -36,7 +106,7 @@ async def get_current_user(
     if username is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    user = user_cache.get(db, username)
     if user is None:
         raise credentials_exception
     
@@ -61,27 +131,55 @@ async def get_current_admin(
     return current_user
 
 
+async def get_current_scanner(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    """Dependency to require scanner (gate operator) or admin role"""
+    if current_user.role not in ("scanner", "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Scanner access required"
+        )
+    return current_user
+
+
 @router.post("/login", response_model=TokenResponse)
 async def login(
     credentials: UserLogin,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Login endpoint - returns JWT tokens"""
-    # Find user
-    user = db.query(User).filter(User.username == credentials.username).first()
+    # Throttle repeated failures before doing any bcrypt work
+    client_ip = get_client_ip(request)
+    retry_after = login_throttle.retry_after(credentials.username, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many failed login attempts. Try again in {retry_after} seconds.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    # Find user (database calls stay off the event loop)
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.username == credentials.username).first()
+    )
     
     if not user:
+        login_throttle.record_failure(credentials.username, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
     
-    # Verify password
-    if not verify_password(credentials.password, user.password_hash):
+    # Verify password (bcrypt runs in a thread pool, not on the event loop)
+    if not await verify_password_offloaded(credentials.password, user.password_hash):
+        login_throttle.record_failure(credentials.username, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
+    login_throttle.record_success(credentials.username, client_ip)
     
     # Check if active
     if not user.is_active:
@@ -90,33 +188,35 @@ async def login(
             detail="Account is inactive"
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
-    
-    # Create tokens
-    access_token = create_access_token(data={"sub": user.username, "role": user.role})
-    refresh_token = create_refresh_token(data={"sub": user.username})
-    
-    return TokenResponse(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        user=UserResponse.from_orm(user)
-    )
+    def record_login() -> TokenResponse:
+        """Update last login and build the response in the threadpool"""
+        user.last_login = datetime.utcnow()
+        db.commit()
+        # The commit expires the user - reading it reloads with a blocking SELECT, so do it here
+        return TokenResponse(
+            access_token=create_access_token(data={"sub": user.username, "role": user.role}),
+            refresh_token=create_refresh_token(data={"sub": user.username}),
+            user=UserResponse.from_orm(user)
+        )
+
+    response = await run_in_threadpool(record_login)
+    user_cache.invalidate(response.user.username)
+    return response
 
 
 @router.post("/login/form", response_model=TokenResponse)
 async def login_form(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """OAuth2 compatible login (for docs UI)"""
     credentials = UserLogin(username=form_data.username, password=form_data.password)
-    return await login(credentials, db)
+    return await login(credentials, request, db)
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(
+def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user information"""
@@ -124,7 +224,7 @@ async def get_current_user_info(
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(
+def refresh_token(
     refresh_token: str,
     db: Session = Depends(get_db)
 ):
@@ -171,7 +271,7 @@ async def change_password(
 ):
     """Change user password"""
     # Verify current password
-    if not verify_password(request.current_password, current_user.password_hash):
+    if not await verify_password_offloaded(request.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -184,9 +284,10 @@ async def change_password(
             detail="New password must be at least 8 characters long"
         )
 
-    # Hash and update password
-    from ..core.security import hash_password
-    current_user.password_hash = hash_password(request.new_password)
-    db.commit()
+    # Hash and update password (read the username first - the commit expires current_user)
+    username = current_user.username
+    current_user.password_hash = await hash_password_offloaded(request.new_password)
+    await run_in_threadpool(db.commit)
+    user_cache.invalidate(username)
 
     return {"message": "Password updated successfully"}
@@ -0,0 +1,179 @@
+"""
+Gate check-in API endpoints - QR scan verification at venue gates
+"""
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+from datetime import datetime
+
+from ..core.config import settings
+from ..core.database import get_db, SessionLocal
+from ..api.auth import get_current_admin, get_current_scanner, get_current_user
+from ..models import User
+from ..services.checkin_index import checkin_index
+from ..services.live_counters import live_counters
+
+
+router = APIRouter(prefix="/checkin", tags=["Check-in"])
+
+
+class ScanRequest(BaseModel):
+    """Schema for a scanned pass"""
+    qr_data: str
+    # Session the gate admits to (default: session printed on the pass)
+    session_type: Optional[Literal["exhibition_day1", "exhibition_day2", "interactive_sessions", "plenary"]] = None
+    gate_number: Optional[str] = None
+    gate_location: Optional[str] = None
+    device_id: Optional[str] = None
+
+
+class ScanResponse(BaseModel):
+    """Schema for scan verification result"""
+    valid: bool
+    status: str  # 'accepted', 'duplicate', 'not_found', 'invalid_qr', 'not_entitled', 'outside_hours'
+    message: str
+    entry_id: Optional[int] = None
+    name: Optional[str] = None
+    organization: Optional[str] = None
+    session_type: Optional[str] = None
+    checked_in_at: Optional[datetime] = None  # This scan, or the first check-in for duplicates (UTC)
+
+
+@router.post("/scan", response_model=ScanResponse)
+def scan_pass(
+    scan: ScanRequest,
+    current_user: User = Depends(get_current_scanner),
+    db: Session = Depends(get_db)
+):
+    """
+    Verify a scanned pass and record the check-in (scanner/admin only)
+
+    Every scan returns 200 - rejected passes are reported in status/message so the
+    gate app can show them. Only accepted scans create a CheckIn row.
+    """
+    outcome = checkin_index.scan(
+        db,
+        scan.qr_data,
+        session_type=scan.session_type,
+        gate_number=scan.gate_number,
+        gate_location=scan.gate_location,
+        device_id=scan.device_id,
+        operator=current_user.username
+    )
+    entry = outcome.entry
+    return ScanResponse(
+        valid=outcome.valid,
+        status=outcome.status,
+        message=outcome.message,
+        entry_id=entry.id if entry else None,
+        name=entry.name if entry else None,
+        organization=entry.organization if entry else None,
+        session_type=outcome.session_type,
+        checked_in_at=outcome.checked_in_at
+    )
+
+
+@router.get("/index-stats")
+def get_index_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """Get check-in index statistics (admin only)"""
+    return checkin_index.stats()
+
+
+@router.post("/index/reload")
+def reload_index(
+    current_user: User = Depends(get_current_admin)
+):
+    """Rebuild the check-in index from the database (admin only)"""
+    return {"entries": checkin_index.load()}
+
+
+class GateCounter(BaseModel):
+    """Check-ins at one gate for one session"""
+    session_type: str
+    gate_number: str
+    total: int
+    last_5_minutes: int
+
+
+class MinuteCounter(BaseModel):
+    """Check-ins in one minute at one gate for one session"""
+    minute: datetime  # UTC, start of the minute
+    session_type: str
+    gate_number: str
+    count: int
+
+
+class LiveCountersResponse(BaseModel):
+    """Schema for live occupancy / throughput counters"""
+    generated_at: datetime
+    version: int  # Changes whenever a counter changes
+    total: int
+    by_session: Dict[str, int]
+    by_gate: List[GateCounter]
+    per_minute: List[MinuteCounter]
+
+
+@router.get("/live", response_model=LiveCountersResponse)
+async def get_live_counters(
+    window: Optional[int] = Query(None, ge=1, description="Minutes of per-minute history"),
+    current_user: User = Depends(get_current_admin)
+):
+    """Get live check-in counts per session, gate and minute (admin only)"""
+    return await run_in_threadpool(live_counters.snapshot, window)
+
+
+@router.get("/live/stream")
+async def stream_live_counters(
+    request: Request,
+    token: str = Query(..., description="Access token (EventSource cannot send headers)"),
+    window: Optional[int] = Query(None, ge=1, description="Minutes of per-minute history")
+):
+    """
+    Server-Sent Events stream of live counters (admin only)
+
+    Sends a 'counters' event (same body as GET /checkin/live) whenever the
+    counters change or a new minute starts, and a keep-alive comment every
+    15 seconds otherwise.
+    """
+    # Authenticate with a short-lived session - the stream must not hold a DB connection
+    db = SessionLocal()
+    try:
+        user = await run_in_threadpool(get_current_user, token=token, db=db)
+    finally:
+        db.close()
+    if user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+
+    async def events():
+        last_state = None
+        idle = 0.0
+        interval = max(settings.LIVE_STREAM_INTERVAL_SECONDS, 0.2)
+        while not await request.is_disconnected():
+            snapshot = await run_in_threadpool(live_counters.snapshot, window)
+            state = (snapshot["version"], snapshot["generated_at"].replace(second=0, microsecond=0))
+            if state != last_state:
+                last_state = state
+                idle = 0.0
+                yield f"event: counters\ndata: {json.dumps(jsonable_encoder(snapshot), separators=(',', ':'))}\n\n"
+            elif idle >= 15:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(interval)
+            idle += interval
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,15 +1,20 @@
 """
 Entries API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, or_
+from sqlalchemy.exc import IntegrityError
 from typing import List
 
 from ..core.database import get_db
 from ..api.auth import get_current_user
 from ..models import Entry, User
-from ..schemas.entry import EntryCreate, EntryUpdate, EntryResponse
+from ..schemas.entry import EntryCreate, EntryUpdate, EntryResponse, BulkImportResponse
+from ..services.entry_import import entry_import, ImportFileError
+from ..services.quota_ledger import quota_ledger, QuotaExceededError
+from ..services.checkin_index import checkin_index
+from ..services.scanner_sync import scanner_sync
 from pydantic import BaseModel
 
 
@@ -33,7 +38,7 @@ class DashboardStats(BaseModel):
 
 
 @router.get("/my", response_model=List[EntryResponse])
-async def get_my_entries(
+def get_my_entries(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -42,73 +47,69 @@ async def get_my_entries(
     return entries
 
 
+def entry_stats_columns() -> list:
+    """
+    Aggregate columns for dashboard statistics (one SUM(CASE ...) per counter)
+
+    Zero-row groups (e.g. users without entries in an outer join) yield 0, not NULL.
+    """
+    def count_where(condition, label: str):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0).label(label)
+
+    return [
+        func.count(Entry.id).label("total_entries"),
+        count_where(or_(
+            Entry.pass_generated_exhibition_day1.is_(True),
+            Entry.pass_generated_exhibition_day2.is_(True),
+            Entry.pass_generated_interactive_sessions.is_(True),
+            Entry.pass_generated_plenary.is_(True)
+        ), "passes_generated"),
+        count_where(Entry.exhibition_day1.is_(True), "exhibition_day1_count"),
+        count_where(Entry.exhibition_day2.is_(True), "exhibition_day2_count"),
+        count_where(Entry.interactive_sessions.is_(True), "interactive_sessions_count"),
+        count_where(Entry.plenary.is_(True), "plenary_count")
+    ]
+
+
+def build_dashboard_stats(user: User, counts) -> dict:
+    """Combine aggregated entry counts with a user's quotas"""
+    return dict(
+        total_entries=counts.total_entries,
+        max_entries=user.max_entries,
+        remaining_quota=user.max_entries - counts.total_entries,
+        passes_generated=counts.passes_generated,
+        exhibition_day1_count=counts.exhibition_day1_count,
+        exhibition_day2_count=counts.exhibition_day2_count,
+        interactive_sessions_count=counts.interactive_sessions_count,
+        plenary_count=counts.plenary_count,
+        quota_ex_day1=user.quota_ex_day1,
+        quota_ex_day2=user.quota_ex_day2,
+        quota_interactive=user.quota_interactive,
+        quota_plenary=user.quota_plenary
+    )
+
+
 @router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats(
+def get_dashboard_stats(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get dashboard statistics for current user"""
-    # Get all user's entries
-    entries = db.query(Entry).filter(Entry.username == current_user.username).all()
+    # Count everything in a single aggregate query instead of loading all entries
+    counts = db.query(*entry_stats_columns()).filter(
+        Entry.username == current_user.username
+    ).one()
 
-    # Calculate statistics
-    total_entries = len(entries)
-    max_entries = current_user.max_entries
-    remaining_quota = max_entries - total_entries
-
-    # Count passes generated (any entry with at least one pass generated)
-    passes_generated = sum(1 for e in entries if (
-        e.pass_generated_exhibition_day1 or
-        e.pass_generated_exhibition_day2 or
-        e.pass_generated_interactive_sessions or
-        e.pass_generated_plenary
-    ))
-
-    # Count by pass type
-    exhibition_day1_count = sum(1 for e in entries if e.exhibition_day1)
-    exhibition_day2_count = sum(1 for e in entries if e.exhibition_day2)
-    interactive_sessions_count = sum(1 for e in entries if e.interactive_sessions)
-    plenary_count = sum(1 for e in entries if e.plenary)
-
-    return DashboardStats(
-        total_entries=total_entries,
-        max_entries=max_entries,
-        remaining_quota=remaining_quota,
-        passes_generated=passes_generated,
-        exhibition_day1_count=exhibition_day1_count,
-        exhibition_day2_count=exhibition_day2_count,
-        interactive_sessions_count=interactive_sessions_count,
-        plenary_count=plenary_count,
-        quota_ex_day1=current_user.quota_ex_day1,
-        quota_ex_day2=current_user.quota_ex_day2,
-        quota_interactive=current_user.quota_interactive,
-        quota_plenary=current_user.quota_plenary
-    )
+    return DashboardStats(**build_dashboard_stats(current_user, counts))
 
 
 @router.post("", response_model=EntryResponse, status_code=status.HTTP_201_CREATED)
-async def create_entry(
+def create_entry(
     entry: EntryCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create new entry"""
-    # Check if user has quota remaining
-    current_count = db.query(Entry).filter(Entry.username == current_user.username).count()
-    if current_count >= current_user.max_entries:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Entry quota exceeded. Maximum {current_user.max_entries} entries allowed."
-        )
-
-    # Check if ID number already exists
-    existing_entry = db.query(Entry).filter(Entry.id_number == entry.id_number).first()
-    if existing_entry:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Entry with ID number {entry.id_number} already exists"
-        )
-
     # Validate at least one pass is selected (exhibitor pass OR at least one individual pass)
     if not (entry.is_exhibitor_pass or any([entry.exhibition_day1, entry.exhibition_day2, entry.interactive_sessions, entry.plenary])):
         raise HTTPException(
@@ -138,50 +139,16 @@ async def create_entry(
             detail="You do not have permission to allocate Plenary passes"
         )
 
-    # Validate per-pass quota limits (CRITICAL: Prevent exceeding individual pass quotas)
-    if entry.exhibition_day1:
-        ex_day1_count = db.query(Entry).filter(
-            Entry.username == current_user.username,
-            Entry.exhibition_day1 == True
-        ).count()
-        if ex_day1_count >= current_user.quota_ex_day1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Exhibition Day 1 quota exceeded. You have allocated {ex_day1_count} passes out of {current_user.quota_ex_day1} allowed."
-            )
-
-    if entry.exhibition_day2:
-        ex_day2_count = db.query(Entry).filter(
-            Entry.username == current_user.username,
-            Entry.exhibition_day2 == True
-        ).count()
-        if ex_day2_count >= current_user.quota_ex_day2:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Exhibition Day 2 quota exceeded. You have allocated {ex_day2_count} passes out of {current_user.quota_ex_day2} allowed."
-            )
-
-    if entry.interactive_sessions:
-        interactive_count = db.query(Entry).filter(
-            Entry.username == current_user.username,
-            Entry.interactive_sessions == True
-        ).count()
-        if interactive_count >= current_user.quota_interactive:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Interactive Sessions quota exceeded. You have allocated {interactive_count} passes out of {current_user.quota_interactive} allowed."
-            )
-
-    if entry.plenary:
-        plenary_count = db.query(Entry).filter(
-            Entry.username == current_user.username,
-            Entry.plenary == True
-        ).count()
-        if plenary_count >= current_user.quota_plenary:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Plenary quota exceeded. You have allocated {plenary_count} passes out of {current_user.quota_plenary} allowed."
-            )
+    # Reserve entry + pass quotas (CRITICAL: single conditional UPDATE on the quota ledger,
+    # so concurrent registrations cannot both pass the check)
+    try:
+        quota_ledger.apply(db, current_user, quota_ledger.delta(after=entry))
+    except QuotaExceededError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
     # Create new entry
     db_entry = Entry(
@@ -200,14 +167,58 @@ async def create_entry(
     )
 
     db.add(db_entry)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Unique ID number - also releases the quota reserved above
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Entry with ID number {entry.id_number} already exists"
+        )
     db.refresh(db_entry)
 
     return db_entry
 
 
+@router.post("/bulk", response_model=BulkImportResponse)
+def bulk_create_entries(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create entries from a CSV or XLSX upload
+
+    Uses the same columns as the CSV template (Name, Email, Phone, ID_Type,
+    ID_Number, Exhibition_Day_1, Exhibition_Day_2, Interactive_Sessions, Plenary;
+    optional Exhibitor). Invalid or duplicate rows are reported per row; quotas
+    are checked for all valid rows together and nothing is created if they do not fit.
+    """
+    try:
+        return entry_import.import_entries(db, current_user, file.filename, file.file)
+    except ImportFileError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except QuotaExceededError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except IntegrityError:
+        # An ID number was registered by another request while importing
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Some ID numbers were registered concurrently, please upload the file again"
+        )
+
+
 @router.get("/{entry_id}", response_model=EntryResponse)
-async def get_entry(
+def get_entry(
     entry_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -232,14 +243,16 @@ async def get_entry(
 
 
 @router.put("/{entry_id}", response_model=EntryResponse)
-async def update_entry(
+def update_entry(
     entry_id: int,
     entry_update: EntryUpdate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update an existing entry"""
-    entry = db.query(Entry).filter(Entry.id == entry_id).first()
+    # Lock the row: the quota delta below is computed from it, so concurrent
+    # updates / a delete must wait and see this update's result
+    entry = db.query(Entry).filter(Entry.id == entry_id).with_for_update().first()
 
     if not entry:
         raise HTTPException(
@@ -280,71 +293,47 @@ async def update_entry(
             detail="You do not have permission to allocate Plenary passes"
         )
 
-    # Validate per-pass quota limits when adding passes (not when removing)
-    # Only check if pass is being ADDED (was False, now True)
-    if entry_update.exhibition_day1 is not None and entry_update.exhibition_day1 and not entry.exhibition_day1:
-        ex_day1_count = db.query(Entry).filter(
-            Entry.username == current_user.username,
-            Entry.exhibition_day1 == True
-        ).count()
-        if ex_day1_count >= current_user.quota_ex_day1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Exhibition Day 1 quota exceeded. You have allocated {ex_day1_count} passes out of {current_user.quota_ex_day1} allowed."
-            )
-
-    if entry_update.exhibition_day2 is not None and entry_update.exhibition_day2 and not entry.exhibition_day2:
-        ex_day2_count = db.query(Entry).filter(
-            Entry.username == current_user.username,
-            Entry.exhibition_day2 == True
-        ).count()
-        if ex_day2_count >= current_user.quota_ex_day2:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Exhibition Day 2 quota exceeded. You have allocated {ex_day2_count} passes out of {current_user.quota_ex_day2} allowed."
-            )
-
-    if entry_update.interactive_sessions is not None and entry_update.interactive_sessions and not entry.interactive_sessions:
-        interactive_count = db.query(Entry).filter(
-            Entry.username == current_user.username,
-            Entry.interactive_sessions == True
-        ).count()
-        if interactive_count >= current_user.quota_interactive:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Interactive Sessions quota exceeded. You have allocated {interactive_count} passes out of {current_user.quota_interactive} allowed."
-            )
-
-    if entry_update.plenary is not None and entry_update.plenary and not entry.plenary:
-        plenary_count = db.query(Entry).filter(
-            Entry.username == current_user.username,
-            Entry.plenary == True
-        ).count()
-        if plenary_count >= current_user.quota_plenary:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Plenary quota exceeded. You have allocated {plenary_count} passes out of {current_user.quota_plenary} allowed."
-            )
+    # Adjust the owner's quota ledger - only added passes are checked against quotas
+    update_data = entry_update.model_dump(exclude_unset=True)
+    owner = current_user if entry.username == current_user.username else db.get(User, entry.username)
+    allocated = {field: update_data.get(field, getattr(entry, field))
+                 for field in ("exhibition_day1", "exhibition_day2", "interactive_sessions", "plenary")}
+    try:
+        quota_ledger.apply(db, owner, quota_ledger.delta(before=entry, after=allocated))
+    except QuotaExceededError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
     # Update fields
-    update_data = entry_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(entry, field, value)
 
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Entry with ID number {entry_update.id_number} already exists"
+        )
     db.refresh(entry)
 
     return entry
 
 
 @router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_entry(
+def delete_entry(
     entry_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete an entry"""
-    entry = db.query(Entry).filter(Entry.id == entry_id).first()
+    # Lock the row: a concurrent delete waits, then finds nothing (404) and
+    # leaves the quota ledger alone
+    entry = db.query(Entry).filter(Entry.id == entry_id).with_for_update().first()
 
     if not entry:
         raise HTTPException(
@@ -359,7 +348,13 @@ async def delete_entry(
             detail="Access denied"
         )
 
+    owner = current_user if entry.username == current_user.username else db.get(User, entry.username)
+    quota_ledger.apply(db, owner, quota_ledger.delta(before=entry))
+    scanner_sync.revoke(db, [entry.id], "entry_deleted", current_user.username)
+
     db.delete(entry)
     db.commit()
+    # Gates on this worker reject the passes immediately (others on their next refresh)
+    checkin_index.evict([entry_id])
 
     return None
@@ -10,10 +10,12 @@ from pathlib import Path
 import os
 
 from ..core.database import get_db
-from ..api.auth import get_current_user
+from ..api.auth import get_current_user, get_current_admin
 from ..models import Entry, User
-from ..services.pass_generator import PassGenerator
-from ..services.email_service import email_service
+from ..services.pass_generator import pass_generator
+from ..services.template_cache import template_cache
+from ..services.attachment_cache import attachment_cache
+from ..services.email_outbox import email_outbox
 
 
 router = APIRouter(prefix="/passes", tags=["Passes"])
@@ -27,12 +29,13 @@ class PassGenerationRequest(BaseModel):
 class PassGenerationResponse(BaseModel):
     """Schema for pass generation response"""
     pass_files: List[str]
-    email_sent: bool
+    email_sent: bool  # Always False - emails are sent by the outbox workers (see entry.email_status)
+    email_queued: bool = False
     message: str
 
 
 @router.post("/generate/{entry_id}", response_model=PassGenerationResponse)
-async def generate_passes(
+def generate_passes(
     entry_id: int,
     request: PassGenerationRequest,
     current_user: User = Depends(get_current_user),
@@ -44,7 +47,7 @@ async def generate_passes(
     This endpoint will:
     1. Validate entry exists and user has access
     2. Generate QR code passes based on allocated pass types
-    3. Optionally send email with passes attached
+    3. Optionally queue an email with the passes attached (sent by the outbox workers)
     4. Update pass generation flags in database
     5. Return list of generated pass files
     """
@@ -66,25 +69,18 @@ async def generate_passes(
 
     # Check if entry has any passes allocated
     # For exhibitors, check is_exhibitor_pass; for visitors, check individual passes
-    has_passes = entry.is_exhibitor_pass or any([
-        entry.exhibition_day1,
-        entry.exhibition_day2,
-        entry.interactive_sessions,
-        entry.plenary
-    ])
-
-    if not has_passes:
+    if not entry.has_any_pass:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No passes allocated for this entry"
         )
 
-    # Initialize pass generator
-    pass_generator = PassGenerator()
-
     try:
         # Generate passes (includes QR passes + DND + Event Flow attachments)
-        all_files = pass_generator.generate_passes_for_entry(entry, current_user.username)
+        # Email gets the compressed Invitation/Event Flow variants
+        all_files = pass_generator.generate_passes_for_entry(
+            entry, current_user.username, attachment_variant="email"
+        )
 
         # Filter to get only QR pass files (not DND/Event Flow/Invitations)
         qr_pass_files = [
@@ -95,58 +91,25 @@ async def generate_passes(
         ]
 
         # Update pass generation flags
-        if entry.exhibition_day1:
-            entry.pass_generated_exhibition_day1 = True
-        if entry.exhibition_day2:
-            entry.pass_generated_exhibition_day2 = True
-        if entry.interactive_sessions:
-            entry.pass_generated_interactive_sessions = True
-        if entry.plenary:
-            entry.pass_generated_plenary = True
-
-        db.commit()
+        entry.mark_passes_generated()
 
         # Prepare response
         pass_file_names = [f.name for f in qr_pass_files]
-        email_sent = False
+        email_queued = False
         message = f"Generated {len(pass_file_names)} pass(es) successfully"
 
-        # Send email if requested
+        # Queue the email - the outbox workers render and send it (with retries)
         if request.send_email:
-            try:
-                # Determine which email template to use:
-                # - Exhibitors with ONLY exhibition passes -> exhibitor-specific template
-                # - Exhibitors with Interactive/Plenary -> comprehensive template (lists all passes)
-                # - Visitors -> comprehensive template
-                has_interactive_or_plenary = entry.interactive_sessions or entry.plenary
-
-                if entry.is_exhibitor and not has_interactive_or_plenary:
-                    # EXHIBITOR with ONLY exhibition passes: Use exhibitor-specific email template
-                    email_sent = email_service.send_exhibitor_bulk_email(
-                        recipient_email=entry.email,
-                        recipient_name=entry.name,
-                        pass_files=all_files
-                    )
-                else:
-                    # VISITOR or EXHIBITOR with Interactive/Plenary: Use comprehensive email template
-                    email_sent = email_service.send_pass_email(
-                        recipient_email=entry.email,
-                        recipient_name=entry.name,
-                        pass_files=all_files  # Send all files including DND/Event Flow
-                    )
-
-                if email_sent:
-                    message += f" and email sent to {entry.email}"
-                else:
-                    message += " but email sending failed"
-
-            except Exception as e:
-                # Don't fail the whole request if email fails
-                message += f" but email error: {str(e)}"
+            email_outbox.enqueue_passes(db, entry, current_user.username)
+            email_queued = True
+            message += f" and queued email to {entry.email}"
+
+        db.commit()
 
         return PassGenerationResponse(
             pass_files=pass_file_names,
-            email_sent=email_sent,
+            email_sent=False,
+            email_queued=email_queued,
             message=message
         )
 
@@ -160,7 +123,7 @@ async def generate_passes(
 
 
 @router.get("/check/{entry_id}")
-async def check_pass_status(
+def check_pass_status(
     entry_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -212,7 +175,7 @@ async def check_pass_status(
 
 
 @router.get("/download/{entry_id}/{filename}")
-async def download_pass(
+def download_pass(
     entry_id: int,
     filename: str,
     current_user: User = Depends(get_current_user),
@@ -257,3 +220,19 @@ async def download_pass(
         filename=filename,
         media_type="image/png"
     )
+
+
+@router.get("/cache-stats")
+def get_template_cache_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Get pass template, rendered pass and email attachment cache statistics (admin only)
+
+    Shows how many templates/attachments are held in memory and the hit/miss counters
+    """
+    return {
+        "templates": template_cache.stats(),
+        "renders": pass_generator.render_cache.stats(),
+        "attachments": attachment_cache.stats()
+    }
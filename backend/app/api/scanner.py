@@ -0,0 +1,151 @@
+"""
+Scanner API endpoints - sync protocol for offline gate scanners
+"""
+import gzip
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import datetime
+
+from ..core.config import settings
+from ..core.database import get_db
+from ..api.auth import get_current_scanner
+from ..models import User
+from ..services.scanner_sync import SyncCursorError, scanner_sync
+
+
+router = APIRouter(prefix="/scanner", tags=["Scanner"])
+
+# Sync responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+class SyncPass(BaseModel):
+    """Valid passes of one entry"""
+    entry_id: int
+    name: str
+    organization: str
+    sessions: List[str]
+    tokens: List[str]  # Exact QR payloads of the entry's passes
+
+
+class SyncCheckIn(BaseModel):
+    """Check-in already recorded (by any gate) - sent again when an earlier offline scan moves it"""
+    entry_id: int
+    session_type: str
+    checked_in_at: Optional[datetime] = None
+    gate_number: Optional[str] = None
+
+
+class ScannerSyncResponse(BaseModel):
+    """Schema for a sync delta"""
+    cursor: str  # Pass as ?since= on the next sync
+    has_more: bool
+    passes: List[SyncPass]  # New or changed entries (replace any stored tokens for the entry)
+    revoked: List[int]  # Entry IDs whose passes must be rejected
+    checked_in: List[SyncCheckIn]
+
+
+class OfflineScan(BaseModel):
+    """Schema for one check-in recorded while offline"""
+    scan_id: Optional[str] = None  # Device-side ID, echoed back in the results
+    qr_data: str
+    session_type: Optional[Literal["exhibition_day1", "exhibition_day2", "interactive_sessions", "plenary"]] = None
+    scanned_at: datetime  # Device clock (UTC if no offset is given)
+    gate_number: Optional[str] = None
+    gate_location: Optional[str] = None
+
+
+class ScannerBatchRequest(BaseModel):
+    """Schema for a batch of offline check-ins"""
+    device_id: str
+    scans: List[OfflineScan] = Field(..., min_length=1)
+
+
+class ScannerBatchResult(BaseModel):
+    """Schema for the result of one offline scan"""
+    scan_id: Optional[str] = None
+    status: str  # 'accepted', 'duplicate', 'revoked', 'not_found', 'invalid_qr', 'not_entitled', 'outside_hours'
+    message: str
+    entry_id: Optional[int] = None
+    session_type: Optional[str] = None
+    checked_in_at: Optional[datetime] = None  # Recorded (earliest) check-in time, UTC
+
+
+class ScannerBatchResponse(BaseModel):
+    """Schema for batch upload results"""
+    received: int
+    accepted: int
+    duplicates: int
+    rejected: int
+    results: List[ScannerBatchResult]
+
+
+def _get_active_device(db: Session, device_id: str, current_user: User):
+    """Resolve the calling device or reject deactivated devices"""
+    device = scanner_sync.get_device(db, device_id, current_user)
+    if device is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Scanner device '{device_id}' is deactivated"
+        )
+    return device
+
+
+@router.get("/sync", response_model=ScannerSyncResponse)
+def sync_scanner(
+    request: Request,
+    device_id: str = Query(..., max_length=100),
+    since: Optional[str] = Query(None, description="Cursor from the previous sync (omit for a full download)"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum rows of each kind per response"),
+    current_user: User = Depends(get_current_scanner),
+    db: Session = Depends(get_db)
+):
+    """
+    Download pass changes since the device's last sync (scanner/admin only)
+
+    Call repeatedly with the returned cursor while has_more is true. The body
+    is gzip-compressed when the client sends Accept-Encoding: gzip.
+    """
+    device = _get_active_device(db, device_id, current_user)
+    try:
+        delta = scanner_sync.sync(db, device, since=since, limit=limit)
+    except SyncCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    body = json.dumps(jsonable_encoder(delta), separators=(",", ":")).encode("utf-8")
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.post("/checkins/batch", response_model=ScannerBatchResponse)
+def upload_checkins(
+    batch: ScannerBatchRequest,
+    current_user: User = Depends(get_current_scanner),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload check-ins recorded offline (scanner/admin only)
+
+    Safe to retry - uploading the same scans again records nothing new.
+    Duplicate scans of a pass across gates keep the earliest scan.
+    """
+    if len(batch.scans) > settings.SCANNER_BATCH_MAX_SCANS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many scans, maximum {settings.SCANNER_BATCH_MAX_SCANS} per batch"
+        )
+
+    device = _get_active_device(db, batch.device_id, current_user)
+    return scanner_sync.upload_checkins(
+        db, device, current_user.username, [scan.model_dump() for scan in batch.scans]
+    )
@@ -5,7 +5,7 @@ Supports both .env file (local) and Streamlit secrets (cloud)
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
-from typing import List, Union, Any
+from typing import Dict, List, Union, Any
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -41,6 +41,14 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    USER_CACHE_TTL_SECONDS: int = 15  # Authenticated user lookups cached this long (0 = always query)
+    PASSWORD_HASH_WORKERS: int = 2  # Threads for bcrypt hashing / verification (~250ms CPU each)
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Waiting bcrypt calls beyond this get 503 + Retry-After
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 300  # Sliding window for failed login counts
+    LOGIN_MAX_FAILURES_PER_USER: int = 5  # Failed logins per client IP + username within the window
+    LOGIN_MAX_FAILURES_PER_IP: int = 30  # Failed logins per client IP (any username) within the window
+    LOGIN_MAX_FAILURES_PER_ACCOUNT: int = 20  # Failed logins per username from any IP within the window
+    TRUSTED_PROXIES: str = ""  # Comma-separated proxy IPs/CIDRs allowed to set X-Forwarded-For (empty = use the socket address; set it behind a load balancer, or all clients share its IP)
 
     # Email - Brevo (PRIMARY - formerly Sendinblue)
     BREVO_API_KEY: str = ""  # Brevo API key from https://app.brevo.com/settings/keys/api
@@ -65,6 +73,14 @@ class Settings(BaseSettings):
     NIC_EMAIL_PASSWORD: str = ""  # Your NIC email password (or app-specific password)
     USE_NIC_SMTP: bool = True  # Set to True to use NIC SMTP (Government Email)
 
+    # Encoded attachment cache for static Invitation / Event Flow images (shared by all providers)
+    ATTACHMENT_CACHE_MAX_BYTES: int = 67108864  # 64MB of base64 content
+
+    # SMTP connection pool (NIC SMTP + Gmail SMTP)
+    SMTP_POOL_SIZE: int = 4  # Max open connections per server/account
+    SMTP_POOL_MAX_AGE_SECONDS: int = 300  # Recycle connections older than this
+    SMTP_KEEPALIVE_SECONDS: int = 30  # NOOP-check connections idle longer than this
+
     # CORS - Using Any to avoid JSON parsing issues, validator handles conversion
     BACKEND_CORS_ORIGINS: Any = None
 
@@ -103,9 +119,73 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 5242880  # 5MB
     ALLOWED_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "pdf"]
 
+    # Bulk Entry Import (CSV / XLSX)
+    BULK_IMPORT_MAX_ROWS: int = 5000  # Rows accepted per upload
+    BULK_IMPORT_BATCH_SIZE: int = 500  # Rows per INSERT batch
+
     # Pass Generation
     PASS_OUTPUT_DIR: str = "../generated_passes"
     IMAGE_ASSETS_DIR: str = "../images"
+    PASS_RENDER_WORKERS: int = 0  # Process pool size for batch rendering (0 = CPU count)
+    PASS_RENDER_CACHE: bool = True  # Reuse rendered passes when template + QR payload are unchanged
+    QR_PAYLOAD_MODE: str = "signed"  # 'signed' (compact, verified offline at gates) or 'text' (human-readable)
+    QR_SIGNING_KEY: str = ""  # HMAC key for signed QR payloads (empty = JWT_SECRET_KEY)
+
+    # Email asset variants (compressed Invitation / Event Flow / DND images for email attachments)
+    USE_EMAIL_ASSET_VARIANTS: bool = True  # Attach compressed variants instead of full-size PNGs
+    OPTIMIZE_ASSETS_ON_STARTUP: bool = True  # Build missing/stale variants when the API starts
+    EMAIL_ASSET_FORMAT: str = "jpeg"  # 'png' (palette), 'jpeg' or 'webp'
+    EMAIL_ASSET_MAX_DIMENSION: int = 1600  # Longest side in pixels
+    EMAIL_ASSET_QUALITY: int = 85  # JPEG/WebP quality
+
+    # Bulk Email Jobs
+    BULK_EMAIL_CONCURRENCY: int = 4  # Emails sent in parallel per job
+    BULK_EMAIL_CHUNK_SIZE: int = 20  # Entries rendered per batch before sending
+    BULK_EMAIL_STALE_SECONDS: int = 120  # Job without heartbeat for this long is taken over by another worker
+
+    # Email Outbox (pass emails are queued by the API and sent by email workers)
+    EMAIL_OUTBOX_WORKERS: int = 4  # Concurrent senders per email_worker.py process
+    EMAIL_OUTBOX_EMBEDDED_WORKERS: int = 2  # Senders run inside each API process (0 = only email_worker.py sends)
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0  # How often idle workers look for due messages
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 6  # Sends tried before a message is marked failed
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30  # First retry delay, doubled after every failed attempt
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS: int = 3600  # Longest retry delay
+    EMAIL_OUTBOX_LOCK_SECONDS: int = 600  # Message 'sending' this long (crashed worker) is sent again - NIC SMTP takes ~90s
+    EMAIL_RATE_LIMITS: Dict[str, Dict[str, float]] = {  # Per provider: per_second/burst apply to EACH API/worker process (split the provider limit across processes); daily = sends per UTC day shared by all processes via the database (0 = unlimited)
+        "brevo": {"per_second": 5, "burst": 10, "daily": 0},
+        "mailjet": {"per_second": 2, "burst": 5, "daily": 0},
+        "gmail": {"per_second": 0.33, "burst": 3, "daily": 500},  # Gmail SMTP: 500 recipients/day
+        "nic": {"per_second": 0.17, "burst": 1, "daily": 0},
+        "mailbluster": {"per_second": 1, "burst": 5, "daily": 0}
+    }
+
+    # Email provider failover (every configured provider is used, healthiest first)
+    EMAIL_FAILOVER: bool = True  # Retry a failed send on the next provider
+    EMAIL_HEALTH_WINDOW: int = 50  # Recent sends per provider used for error rate / latency
+    EMAIL_HEALTH_WINDOW_SECONDS: int = 300  # ... and only sends this recent (a demoted provider gets traffic back)
+    EMAIL_CIRCUIT_FAILURE_THRESHOLD: int = 3  # Consecutive failures that open a provider's circuit
+    EMAIL_CIRCUIT_OPEN_SECONDS: int = 60  # Provider skipped this long, then one trial send
+    EMAIL_CIRCUIT_MAX_OPEN_SECONDS: int = 900  # Open period doubles after each failed trial, up to this
+
+    # Email provider HTTP clients (one keep-alive pool per provider and process)
+    EMAIL_HTTP_POOL_SIZE: int = 10  # Connections kept per provider - at least the concurrent senders (outbox + bulk jobs)
+    EMAIL_HTTP_CONNECT_TIMEOUT: float = 10.0  # Seconds to connect to a provider API
+    EMAIL_HTTP_READ_TIMEOUT: float = 60.0  # Seconds to wait for a provider response (large attachments)
+    EMAIL_HTTP_RETRIES: int = 3  # Retries on connection failures (and 502/503/504 for idempotent requests only)
+    EMAIL_HTTP_RETRY_BACKOFF_SECONDS: float = 0.5  # Backoff factor between retries
+
+    # Gate Check-in
+    EVENT_TIMEZONE: str = "Asia/Kolkata"  # Session dates/times in PassGenerator.SESSION_DETAILS are local
+    CHECKIN_ENFORCE_SCHEDULE: bool = True  # Reject scans outside the session's hours
+    CHECKIN_EARLY_ENTRY_MINUTES: int = 90  # Gates open this long before a session starts
+    CHECKIN_INDEX_REFRESH_SECONDS: int = 30  # How often the in-memory entry index pulls changes
+    SCANNER_SYNC_PAGE_SIZE: int = 2000  # Max entries / revocations / check-ins per sync response
+    SCANNER_SYNC_SETTLE_SECONDS: int = 5  # Entries changed more recently wait for the next sync
+    SCANNER_BATCH_MAX_SCANS: int = 1000  # Max offline check-ins per batch upload
+    LIVE_COUNTERS_BACKEND: str = "memory"  # 'memory' (per worker) or 'redis' (shared, uses redis_url)
+    LIVE_COUNTERS_WINDOW_MINUTES: int = 60  # Per-minute throughput history kept for the dashboard
+    LIVE_COUNTERS_RESYNC_SECONDS: int = 60  # In-memory counters re-read check_ins this often (other workers' scans; 0 = never)
+    LIVE_STREAM_INTERVAL_SECONDS: float = 1.0  # How often the SSE stream checks for changes
 
     # GitHub (Optional)
     GITHUB_PAT: str = ""
@@ -73,6 +73,25 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def server_timestamp_param(value):
+    """
+    Bind value for comparing with server-default timestamps (created_at / updated_at)
+
+    SQLite stores CURRENT_TIMESTAMP as 'YYYY-MM-DD HH:MM:SS' text, but binds
+    datetime parameters with microseconds, so equal timestamps would compare
+    as different strings. PostgreSQL compares real timestamps.
+
+    Args:
+        value: Timestamp read back from one of these columns
+
+    Returns:
+        Value to use in filters (e.g. keyset pagination cursors)
+    """
+    if value is not None and "sqlite" in SQLALCHEMY_DATABASE_URL:
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
 def init_db() -> None:
     """
     Initialize database - create all tables
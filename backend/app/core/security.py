@@ -4,6 +4,7 @@ Includes password hashing and JWT token management
 """
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+import hmac
 import jwt
 from jwt.exceptions import PyJWTError
 import bcrypt
@@ -157,7 +158,6 @@ def create_hmac_signature(data: str, secret: Optional[str] = None) -> str:
     Returns:
         HMAC-SHA256 signature hex string
     """
-    import hmac
     import hashlib
 
     key = secret or settings.JWT_SECRET_KEY
@@ -11,6 +11,13 @@ from .api.auth import router as auth_router
 from .api.entries import router as entries_router
 from .api.admin import router as admin_router
 from .api.passes import router as passes_router
+from .api.checkin import router as checkin_router
+from .api.scanner import router as scanner_router
+from .services.bulk_email_jobs import bulk_email_runner
+from .services.asset_optimizer import asset_optimizer
+from .services.checkin_index import checkin_index
+from .services.email_outbox import email_outbox
+from .services.pass_generator import pass_generator
 
 # Create FastAPI app
 app = FastAPI(
@@ -50,12 +57,30 @@ app.include_router(auth_router, prefix=settings.API_V1_PREFIX)
 app.include_router(entries_router, prefix=settings.API_V1_PREFIX)
 app.include_router(admin_router, prefix=settings.API_V1_PREFIX)
 app.include_router(passes_router, prefix=settings.API_V1_PREFIX)
+app.include_router(checkin_router, prefix=settings.API_V1_PREFIX)
+app.include_router(scanner_router, prefix=settings.API_V1_PREFIX)
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     """Initialize database tables on startup"""
     init_db()
+    # Resume bulk email jobs left unfinished by a previous worker
+    bulk_email_runner.start()
+    # Load the gate check-in index before the first scan arrives
+    checkin_index.start()
+    # Send queued pass emails from this process too (email_worker.py runs dedicated senders)
+    email_outbox.start(settings.EMAIL_OUTBOX_EMBEDDED_WORKERS)
+    # Build compressed email attachments in the background (no-op when up to date)
+    if settings.OPTIMIZE_ASSETS_ON_STARTUP:
+        import threading
+        threading.Thread(target=asset_optimizer.optimize_all, name="asset-optimizer", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the pass render worker processes"""
+    pass_generator.shutdown_render_pool()
 
 
 @app.get("/")
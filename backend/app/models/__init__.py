@@ -6,5 +6,11 @@ from .entry import Entry
 from .checkin import CheckIn
 from .scanner_device import ScannerDevice
 from .audit_log import AuditLog
+from .bulk_email_job import BulkEmailJob
+from .quota_ledger import QuotaLedger
+from .pass_revocation import PassRevocation
+from .email_outbox import EmailOutbox
+from .email_provider_usage import EmailProviderUsage
 
-__all__ = ["User", "Entry", "CheckIn", "ScannerDevice", "AuditLog"]
+__all__ = ["User", "Entry", "CheckIn", "ScannerDevice", "AuditLog", "BulkEmailJob", "QuotaLedger",
+           "PassRevocation", "EmailOutbox", "EmailProviderUsage"]
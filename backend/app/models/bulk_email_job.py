@@ -0,0 +1,49 @@
+"""
+BulkEmailJob model - Background pass email jobs started from the admin panel
+"""
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class BulkEmailJob(Base):
+    """
+    Bulk pass email job
+
+    State is persisted after every processed entry so a job can be
+    resumed by another worker after a restart:
+    - entry_ids: all entries in the job
+    - processed_ids: entries already handled (sent or failed)
+    - worker_id / heartbeat_at: which process owns the job and when it last reported
+    """
+    __tablename__ = "bulk_email_jobs"
+
+    id = Column(String(36), primary_key=True, index=True)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # 'queued', 'running', 'completed', 'failed'
+    created_by = Column(String(100), nullable=True)
+
+    entry_ids = Column(JSON, nullable=False, default=list)
+    processed_ids = Column(JSON, nullable=False, default=list)
+
+    total = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+
+    # Example: [{"entry_id": 12, "email": "a@b.com", "error": "Email sending failed"}]
+    failures = Column(JSON, nullable=False, default=list)
+    error = Column(String(1000), nullable=True)  # Job-level error (if the job itself failed)
+
+    worker_id = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<BulkEmailJob(id='{self.id}', status='{self.status}', sent={self.sent}/{self.total})>"
+
+    @property
+    def processed(self) -> int:
+        """Number of entries handled so far"""
+        return self.sent + self.failed
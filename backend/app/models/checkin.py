@@ -1,7 +1,7 @@
 """
 CheckIn model - Gate entry records
 """
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -18,6 +18,13 @@ class CheckIn(Base):
     - Verification status
     """
     __tablename__ = "check_ins"
+    __table_args__ = (
+        # One check-in per attendee per session - duplicate scans from other
+        # gates (online or uploaded later by offline scanners) cannot add rows
+        UniqueConstraint("entry_id", "session_type", name="uq_check_ins_entry_session"),
+        # Scanner sync delta downloads (keyset on updated_at, id)
+        Index("ix_check_ins_updated_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     entry_id = Column(Integer, ForeignKey("entries.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -40,6 +47,7 @@ class CheckIn(Base):
     
     verification_status = Column(String(50), default="verified")  # 'verified', 'manual_override', 'flagged'
     notes = Column(String(1000), nullable=True)  # Any special notes
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())  # Sync change marker (moved check-ins)
     
     # Relationships
     entry = relationship("Entry", back_populates="check_ins")
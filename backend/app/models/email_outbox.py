@@ -0,0 +1,45 @@
+"""
+EmailOutbox model - Pass emails waiting to be sent by the email workers
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class EmailOutbox(Base):
+    """
+    Queued pass email
+
+    The API only inserts a row; email workers claim due rows, render and send
+    the passes, and reschedule failures with exponential backoff:
+    - status: 'queued' -> 'sending' -> 'sent' (or back to 'queued' for a retry, 'failed' when out of attempts)
+    - next_attempt_at: when the message is due (retries are pushed into the future)
+    - locked_by / locked_at: claim token of the worker sending the message, refreshed while it sends
+      ('sending' rows with an old lock are retried, or failed when out of attempts)
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Workers poll for due messages
+        Index("ix_email_outbox_status_next", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entry_id = Column(Integer, ForeignKey("entries.id", ondelete="CASCADE"), nullable=False, index=True)
+    recipient = Column(String(255), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # 'queued', 'sending', 'sent', 'failed'
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=6)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(String(1000), nullable=True)
+    provider = Column(String(50), nullable=True)  # Provider that sent (or last tried) the message
+
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_by = Column(String(100), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<EmailOutbox(id={self.id}, entry_id={self.entry_id}, status='{self.status}', attempts={self.attempts})>"
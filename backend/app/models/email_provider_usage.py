@@ -0,0 +1,22 @@
+"""
+EmailProviderUsage model - Emails sent per provider and UTC day
+"""
+from sqlalchemy import Column, String, Integer, Date
+from ..core.database import Base
+
+
+class EmailProviderUsage(Base):
+    """
+    Daily send counter for providers with a daily cap (Gmail SMTP: 500/day)
+
+    Every API and email worker process reserves its sends from the same row
+    with a conditional UPDATE, so the cap holds across processes and restarts.
+    """
+    __tablename__ = "email_provider_usage"
+
+    provider = Column(String(50), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day
+    sent = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<EmailProviderUsage(provider='{self.provider}', day={self.day}, sent={self.sent})>"
@@ -1,7 +1,7 @@
 """
 Entry model - Attendee registrations
 """
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -18,6 +18,13 @@ class Entry(Base):
     - Pass generation tracking
     """
     __tablename__ = "entries"
+    __table_args__ = (
+        # Keyset pagination of the admin entry list (ORDER BY id) per organization / exhibitor flag
+        Index("ix_entries_username_id", "username", "id"),
+        Index("ix_entries_exhibitor_id", "is_exhibitor_pass", "id"),
+        # Scanner sync delta downloads (keyset on updated_at, id)
+        Index("ix_entries_updated_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     username = Column(String(100), ForeignKey("users.username", ondelete="CASCADE"), nullable=False, index=True)
@@ -45,6 +52,11 @@ class Entry(Base):
     pass_generated_exhibition_day2 = Column(Boolean, default=False)
     pass_generated_interactive_sessions = Column(Boolean, default=False)
     pass_generated_plenary = Column(Boolean, default=False)
+
+    # Pass email delivery (set by the email outbox workers)
+    email_status = Column(String(20), nullable=True)             # None (never emailed), 'queued', 'sent', 'failed'
+    email_status_at = Column(DateTime(timezone=True), nullable=True)
+    email_error = Column(String(500), nullable=True)             # Last delivery error
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -61,6 +73,23 @@ class Entry(Base):
         """Check if this is an exhibitor pass (from bulk upload)"""
         return self.is_exhibitor_pass
     
+    @property
+    def has_any_pass(self) -> bool:
+        """Check if any pass is allocated (exhibitor pass or individual passes)"""
+        return bool(self.is_exhibitor_pass or self.exhibition_day1 or self.exhibition_day2
+                    or self.interactive_sessions or self.plenary)
+
+    def mark_passes_generated(self) -> None:
+        """Set the pass generation flags for every allocated pass"""
+        if self.exhibition_day1:
+            self.pass_generated_exhibition_day1 = True
+        if self.exhibition_day2:
+            self.pass_generated_exhibition_day2 = True
+        if self.interactive_sessions:
+            self.pass_generated_interactive_sessions = True
+        if self.plenary:
+            self.pass_generated_plenary = True
+
     @property
     def needs_interactive_pass(self) -> bool:
         """Check if needs interactive sessions pass"""
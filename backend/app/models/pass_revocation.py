@@ -0,0 +1,30 @@
+"""
+PassRevocation model - Passes that gates must stop accepting
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class PassRevocation(Base):
+    """
+    Revoked pass (entry deleted after its passes were issued)
+
+    Deleted entries leave nothing behind in the entries table, so offline
+    scanners learn about them from this append-only log. Devices page through
+    it on a settled (revoked_at, id) cursor, like entries.
+    """
+    __tablename__ = "pass_revocations"
+    __table_args__ = (
+        # Scanner sync delta downloads (keyset on revoked_at, id)
+        Index("ix_pass_revocations_revoked_id", "revoked_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entry_id = Column(Integer, nullable=False, index=True)  # No FK - the entry is gone
+    reason = Column(String(255), nullable=True)             # 'entry_deleted', 'user_deleted'
+    revoked_by = Column(String(100), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<PassRevocation(id={self.id}, entry_id={self.entry_id}, reason='{self.reason}')>"
@@ -0,0 +1,31 @@
+"""
+QuotaLedger model - Running per-user counters of allocated entries and passes
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class QuotaLedger(Base):
+    """
+    Allocation counters for one user (organization)
+
+    Kept in step with the entries table inside the same transaction as every
+    entry insert / update / delete, so quota checks are a single conditional
+    UPDATE instead of one COUNT(*) per pass type. Rows are created lazily from
+    the actual entry counts the first time a user allocates a pass.
+    """
+    __tablename__ = "quota_ledgers"
+
+    username = Column(String(100), ForeignKey("users.username", ondelete="CASCADE"), primary_key=True)
+
+    entries_used = Column(Integer, nullable=False, default=0)         # vs users.max_entries
+    ex_day1_used = Column(Integer, nullable=False, default=0)         # vs users.quota_ex_day1
+    ex_day2_used = Column(Integer, nullable=False, default=0)         # vs users.quota_ex_day2
+    interactive_used = Column(Integer, nullable=False, default=0)     # vs users.quota_interactive
+    plenary_used = Column(Integer, nullable=False, default=0)         # vs users.quota_plenary
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<QuotaLedger(username='{self.username}', entries_used={self.entries_used})>"
@@ -100,6 +100,11 @@ class EntryResponse(BaseModel):
     pass_generated_exhibition_day2: bool
     pass_generated_interactive_sessions: bool
     pass_generated_plenary: bool
+
+    # Pass email delivery
+    email_status: Optional[str] = None
+    email_status_at: Optional[datetime] = None
+    email_error: Optional[str] = None
     
     created_at: datetime
     updated_at: datetime
@@ -112,3 +117,20 @@ class EntryListResponse(BaseModel):
     """Schema for paginated entry list"""
     total: int
     entries: List[EntryResponse]
+    next_cursor: Optional[int] = None  # Pass as ?cursor= to get the next page (None = last page)
+
+
+class BulkImportRowResult(BaseModel):
+    """Outcome of one row of a bulk entry upload"""
+    row: int  # Spreadsheet row number (header is row 1)
+    status: str  # 'created' or 'failed'
+    id_number: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkImportResponse(BaseModel):
+    """Schema for bulk entry upload report"""
+    total_rows: int
+    created: int
+    failed: int
+    results: List[BulkImportRowResult]
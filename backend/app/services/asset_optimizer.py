@@ -0,0 +1,142 @@
+"""
+Email asset optimizer - builds size-reduced variants of Invitation / Event Flow / DND images
+Originals (2000px PNGs, 0.5-2.3 MB each) are kept for downloads; emails attach the
+compressed "email" variants stored next to them in an email/ subdirectory
+"""
+from pathlib import Path
+from typing import List, Optional
+
+from PIL import Image
+
+from ..core.config import settings
+
+
+class AssetOptimizer:
+    """Service for producing and selecting email-sized asset variants"""
+
+    # Asset directories (under images/) whose files are attached to emails or shown in web apps
+    ASSET_DIRS = ("Invitation", "EF", "DND")
+
+    # Subdirectory (next to the originals) holding the derived variants
+    VARIANT_DIR = "email"
+
+    FORMAT_EXTENSIONS = {
+        "png": ".png",
+        "jpeg": ".jpg",
+        "webp": ".webp"
+    }
+
+    def __init__(self):
+        self.images_dir = Path(settings.IMAGE_ASSETS_DIR)
+        if not self.images_dir.is_absolute():
+            # Relative to backend directory
+            base_dir = Path(__file__).parent.parent.parent.parent
+            self.images_dir = base_dir / settings.IMAGE_ASSETS_DIR.lstrip("../")
+
+    @property
+    def format(self) -> str:
+        """Configured output format for email variants"""
+        fmt = settings.EMAIL_ASSET_FORMAT.lower()
+        if fmt == "jpg":
+            fmt = "jpeg"
+        if fmt not in self.FORMAT_EXTENSIONS:
+            raise ValueError(f"EMAIL_ASSET_FORMAT must be one of {list(self.FORMAT_EXTENSIONS)}")
+        return fmt
+
+    def variant_path(self, original: Path) -> Path:
+        """Path of the email variant for an original asset"""
+        original = Path(original)
+        return original.parent / self.VARIANT_DIR / f"{original.stem}{self.FORMAT_EXTENSIONS[self.format]}"
+
+    def _is_current(self, original: Path, variant: Path) -> bool:
+        """Check if a variant exists and is newer than its original"""
+        return variant.exists() and variant.stat().st_mtime_ns >= original.stat().st_mtime_ns
+
+    def email_variant(self, original: Path) -> Path:
+        """
+        Get the file to attach to an email for an asset
+
+        Returns the email variant when enabled and up to date, otherwise the original.
+        """
+        if not settings.USE_EMAIL_ASSET_VARIANTS:
+            return original
+        variant = self.variant_path(original)
+        if self._is_current(original, variant):
+            return variant
+        return original
+
+    def optimize(self, original: Path, force: bool = False) -> Optional[Path]:
+        """
+        Build the email variant for one asset
+
+        Args:
+            original: Path to the original image
+            force: Rebuild even if the variant is up to date
+
+        Returns:
+            Path of the variant, or None if compression did not make it smaller
+        """
+        original = Path(original)
+        variant = self.variant_path(original)
+        if not force and self._is_current(original, variant):
+            return variant
+
+        max_dimension = settings.EMAIL_ASSET_MAX_DIMENSION
+        quality = settings.EMAIL_ASSET_QUALITY
+
+        with Image.open(original) as img:
+            img = img.convert("RGB")
+            img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+            variant.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = variant.with_name(f".{variant.name}.tmp")
+
+            if self.format == "png":
+                # Palette quantization - invitation/schedule artwork has few distinct colours
+                img.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(
+                    tmp_path, "PNG", optimize=True
+                )
+            elif self.format == "jpeg":
+                img.save(tmp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+            else:
+                img.save(tmp_path, "WEBP", quality=quality, method=6)
+
+        original_size = original.stat().st_size
+        variant_size = tmp_path.stat().st_size
+        if variant_size >= original_size:
+            tmp_path.unlink()
+            if variant.exists():
+                variant.unlink()
+            print(f"   ⏭️  {original.name}: variant not smaller ({variant_size:,} >= {original_size:,} bytes), keeping original")
+            return None
+
+        tmp_path.replace(variant)
+        print(f"   ✅ {original.name}: {original_size:,} -> {variant_size:,} bytes ({variant.name})")
+        return variant
+
+    def optimize_all(self, force: bool = False) -> List[Path]:
+        """
+        Build email variants for every asset in ASSET_DIRS
+
+        Returns:
+            List of variant paths that are available for emails
+        """
+        print(f"🗜️  Optimizing email assets ({self.format}, max {settings.EMAIL_ASSET_MAX_DIMENSION}px)...")
+        variants = []
+        for dir_name in self.ASSET_DIRS:
+            asset_dir = self.images_dir / dir_name
+            if not asset_dir.exists():
+                continue
+            for original in sorted(asset_dir.glob("*.png")):
+                try:
+                    variant = self.optimize(original, force=force)
+                    if variant:
+                        variants.append(variant)
+                except Exception as e:
+                    print(f"   ❌ {original.name}: {e}")
+        print(f"✅ {len(variants)} email asset variant(s) ready")
+        return variants
+
+
+# Create singleton instance
+asset_optimizer = AssetOptimizer()
@@ -0,0 +1,162 @@
+"""
+Attachment encoding cache - base64 encodes static email attachments once
+Invitation / Event Flow images are identical for thousands of recipients, so their
+encoded form is kept in memory (LRU, bounded by bytes) and shared by all email providers
+"""
+import base64
+import mimetypes
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.mime.base import MIMEBase
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from ..core.config import settings
+
+
+@dataclass(frozen=True)
+class EncodedAttachment:
+    """A file with its base64 content, ready for any email provider"""
+    filename: str
+    content_type: str
+    size: int
+    base64_content: str
+
+    def mime_part(self) -> MIMEBase:
+        """Build a MIME attachment part without re-encoding the file"""
+        maintype, subtype = self.content_type.split('/', 1)
+        part = MIMEBase(maintype, subtype)
+        # Wrap at 76 characters as required for base64 MIME bodies
+        content = self.base64_content
+        part.set_payload('\n'.join(content[i:i + 76] for i in range(0, len(content), 76)))
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.add_header('Content-Disposition', f'attachment; filename={self.filename}')
+        return part
+
+
+def _default_static_roots() -> List[Path]:
+    """Directories holding immutable assets (same resolution as PassGenerator.images_dir)"""
+    images_dir = Path(settings.IMAGE_ASSETS_DIR)
+    if not images_dir.is_absolute():
+        base_dir = Path(__file__).parent.parent.parent.parent
+        images_dir = base_dir / settings.IMAGE_ASSETS_DIR.lstrip("../")
+    return [images_dir.resolve()]
+
+
+class AttachmentCache:
+    """
+    LRU cache of encoded attachments keyed by (path, mtime, size)
+
+    Only files under the static asset directories are cached - generated passes
+    are unique per recipient and are encoded on every call.
+    """
+
+    def __init__(self, max_bytes: int = None, static_roots: List[Path] = None):
+        """Initialize cache"""
+        self.max_bytes = max_bytes or settings.ATTACHMENT_CACHE_MAX_BYTES
+        self.static_roots = static_roots or _default_static_roots()
+        self._entries: "OrderedDict[Tuple[str, int, int], EncodedAttachment]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _is_static(self, path: Path) -> bool:
+        """Check if a file lives under one of the static asset directories"""
+        return any(path.is_relative_to(root) for root in self.static_roots)
+
+    @staticmethod
+    def _encode(path: Path, size: int) -> EncodedAttachment:
+        """Read and base64-encode a file"""
+        with open(path, 'rb') as f:
+            content = base64.b64encode(f.read()).decode('utf-8')
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        return EncodedAttachment(
+            filename=path.name,
+            content_type=content_type,
+            size=size,
+            base64_content=content
+        )
+
+    def get(self, file_path) -> Optional[EncodedAttachment]:
+        """
+        Get the encoded form of a file
+
+        Args:
+            file_path: Path (or str) of the file to attach
+
+        Returns:
+            EncodedAttachment, or None if the file does not exist
+        """
+        path = Path(file_path).resolve()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        if not self._is_static(path):
+            return self._encode(path, stat.st_size)
+
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        encoded = self._encode(path, stat.st_size)
+        entry_bytes = len(encoded.base64_content)
+
+        with self._lock:
+            self.misses += 1
+            if entry_bytes > self.max_bytes or key in self._entries:
+                return encoded
+
+            # Drop stale versions of the same file (replaced on disk)
+            for stale_key in [k for k in self._entries if k[0] == key[0]]:
+                self._bytes -= len(self._entries.pop(stale_key).base64_content)
+
+            self._entries[key] = encoded
+            self._bytes += entry_bytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.base64_content)
+                self.evictions += 1
+
+        return encoded
+
+    def get_many(self, file_paths) -> List[EncodedAttachment]:
+        """Encode a list of files, skipping (and logging) missing ones"""
+        encoded = []
+        for file_path in file_paths or []:
+            attachment = self.get(file_path)
+            if attachment is None:
+                print(f"Warning: Attachment file not found: {file_path}")
+                continue
+            encoded.append(attachment)
+        return encoded
+
+    def clear(self) -> None:
+        """Drop all cached attachments"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Get cache counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+# Create singleton instance
+attachment_cache = AttachmentCache()
@@ -5,17 +5,21 @@ Uses official sib-api-v3-sdk library
 """
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
-import base64
 import time
 from pathlib import Path
 from typing import List, Optional
 
 from ..core.config import settings
+from .attachment_cache import attachment_cache
+from .email_router import BatchRecipient, PLACEHOLDER
+from .http_pool import email_http_retry, http_sessions
 
 
 class BrevoService:
     """Service for sending emails via Brevo API v3"""
 
+    MAX_BATCH_SIZE = 1000  # messageVersions per transactional email request
+
     def __init__(self):
         """Initialize Brevo API service using official sib-api-v3-sdk library"""
         self.api_key = settings.BREVO_API_KEY
@@ -27,11 +31,12 @@ class BrevoService:
         # Configure API client
         self.configuration = sib_api_v3_sdk.Configuration()
         self.configuration.api_key['api-key'] = self.api_key
+        self.configuration.connection_pool_maxsize = max(settings.EMAIL_HTTP_POOL_SIZE, 1)
 
-        # Initialize API instance
-        self.api_instance = sib_api_v3_sdk.TransactionalEmailsApi(
-            sib_api_v3_sdk.ApiClient(self.configuration)
-        )
+        # Initialize API instance - its urllib3 pool keeps connections alive for the whole process
+        api_client = sib_api_v3_sdk.ApiClient(self.configuration)
+        api_client.rest_client.pool_manager.connection_pool_kw["retries"] = email_http_retry()
+        self.api_instance = sib_api_v3_sdk.TransactionalEmailsApi(api_client)
 
     def send_email(self, to_email: str, subject: str, html_content: str,
                    text_content: str = "", attachments: List[str] = None) -> bool:
@@ -64,27 +69,12 @@ class BrevoService:
             attachment_start = time.time()
             brevo_attachments = []
 
-            if attachments:
-                for file_path in attachments:
-                    if Path(file_path).exists():
-                        try:
-                            # Read and encode file to base64
-                            with open(file_path, 'rb') as f:
-                                file_data = f.read()
-                                encoded_string = base64.b64encode(file_data)
-                                base64_content = encoded_string.decode('utf-8')
-
-                            file_name = Path(file_path).name
-
-                            # Add to attachments list
-                            brevo_attachments.append({
-                                "content": base64_content,
-                                "name": file_name
-                            })
-
-                        except Exception as e:
-                            print(f"⚠️  Failed to attach {file_path}: {e}")
-                            continue
+            # Static images come pre-encoded from the shared attachment cache
+            for attachment in attachment_cache.get_many(attachments):
+                brevo_attachments.append({
+                    "content": attachment.base64_content,
+                    "name": attachment.filename
+                })
 
             attachment_time = time.time() - attachment_start
 
@@ -99,7 +89,9 @@ class BrevoService:
 
             # Send email
             send_start = time.time()
-            api_response = self.api_instance.send_transac_email(send_smtp_email)
+            api_response = self.api_instance.send_transac_email(
+                send_smtp_email, _request_timeout=http_sessions.timeout
+            )
             send_time = time.time() - send_start
 
             total_time = time.time() - start_time
@@ -124,6 +116,66 @@ class BrevoService:
             traceback.print_exc()
             return False
 
+    def send_batch(self, recipients: List[BatchRecipient], subject: str, html_content: str,
+                   text_content: str = "", attachments: List[str] = None) -> List[Optional[str]]:
+        """
+        Send one message per recipient in a single Brevo request (messageVersions)
+
+        The subject, body and attachments are sent once for the whole batch;
+        {{key}} placeholders are filled per recipient from its params.
+        Brevo accepts or rejects the request as a whole, so every recipient
+        gets the same outcome.
+
+        Args:
+            recipients: At most MAX_BATCH_SIZE recipients
+            subject: Email subject with {{key}} placeholders
+            html_content: HTML email body with {{key}} placeholders
+            text_content: Plain text email body (optional, not used by Brevo)
+            attachments: List of file paths attached to every message
+
+        Returns:
+            Error per recipient, in input order (None = sent)
+        """
+        if len(recipients) > self.MAX_BATCH_SIZE:
+            raise ValueError(f"Brevo accepts at most {self.MAX_BATCH_SIZE} message versions per request")
+
+        brevo_attachments = [
+            {"content": attachment.base64_content, "name": attachment.filename}
+            for attachment in attachment_cache.get_many(attachments)
+        ]
+
+        send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+            sender={"name": self.sender_name, "email": self.sender_email},
+            subject=self._template(subject),
+            html_content=self._template(html_content),
+            attachment=brevo_attachments if brevo_attachments else None,
+            message_versions=[
+                sib_api_v3_sdk.SendSmtpEmailMessageVersions(
+                    to=[sib_api_v3_sdk.SendSmtpEmailTo1(email=recipient.email, name=recipient.name or None)],
+                    params=recipient.values
+                )
+                for recipient in recipients
+            ]
+        )
+
+        start_time = time.time()
+        try:
+            self.api_instance.send_transac_email(
+                send_smtp_email, _request_timeout=http_sessions.timeout
+            )
+        except ApiException as e:
+            error = f"Brevo API error {getattr(e, 'status', 'Unknown')}: {getattr(e, 'body', None) or e}"
+            print(f"❌ Brevo batch of {len(recipients)} failed: {error}")
+            return [error] * len(recipients)
+
+        print(f"✅ Brevo batch sent to {len(recipients)} recipients (took {time.time() - start_time:.1f}s)")
+        return [None] * len(recipients)
+
+    @staticmethod
+    def _template(text: str) -> str:
+        """Translate {{key}} placeholders to Brevo template params"""
+        return PLACEHOLDER.sub(lambda m: "{{ params.%s }}" % m.group(1), text)
+
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -0,0 +1,345 @@
+"""
+Bulk email job runner - renders passes and emails them in the background
+Job progress is persisted to the bulk_email_jobs table so a job survives a worker restart
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models import BulkEmailJob, Entry
+from .email_outbox import email_outbox
+from .email_service import email_service
+from .pass_generator import pass_generator, PassEntrySnapshot
+
+
+class JobOwnershipLost(Exception):
+    """Another worker took over the job (this worker's heartbeat went stale)"""
+
+
+class BulkEmailJobRunner:
+    """Runs bulk email jobs in background threads with bounded send concurrency"""
+
+    def __init__(self):
+        """Initialize runner for this process"""
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._active: Set[str] = set()
+        self._lock = threading.Lock()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def enqueue(self, db: Session, entry_ids: List[int], created_by: str) -> BulkEmailJob:
+        """
+        Create a job and start processing it in the background
+
+        Args:
+            db: Database session
+            entry_ids: Entries to render and email
+            created_by: Username of the admin starting the job
+
+        Returns:
+            The persisted BulkEmailJob
+        """
+        # Remove duplicates but keep the requested order
+        unique_ids = list(dict.fromkeys(entry_ids))
+
+        job = BulkEmailJob(
+            id=uuid.uuid4().hex,
+            status="queued",
+            created_by=created_by,
+            entry_ids=unique_ids,
+            processed_ids=[],
+            total=len(unique_ids),
+            sent=0,
+            failed=0,
+            failures=[],
+            worker_id=self.worker_id,
+            heartbeat_at=datetime.utcnow()
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self._start(job.id)
+        print(f"📬 Bulk email job {job.id} queued ({job.total} entries)")
+        return job
+
+    def start(self) -> None:
+        """Start the watchdog that resumes orphaned jobs (call once on app startup)"""
+        if self._watchdog and self._watchdog.is_alive():
+            return
+        self._watchdog = threading.Thread(target=self._watch, name="bulk-email-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def resume_pending_jobs(self) -> int:
+        """
+        Claim and resume unfinished jobs whose owner stopped reporting
+
+        Returns:
+            Number of jobs resumed by this process
+        """
+        db = SessionLocal()
+        resumed = 0
+        try:
+            jobs = db.query(BulkEmailJob.id).filter(
+                BulkEmailJob.status.in_(("queued", "running"))
+            ).all()
+            for (job_id,) in jobs:
+                with self._lock:
+                    if job_id in self._active:
+                        continue
+                if self._claim(db, job_id):
+                    print(f"🔁 Resuming bulk email job {job_id}")
+                    self._start(job_id)
+                    resumed += 1
+        finally:
+            db.close()
+        return resumed
+
+    def describe(self, job: BulkEmailJob) -> dict:
+        """Build progress details (counts, throughput, ETA) for a job"""
+        processed = job.processed
+        remaining = max(job.total - processed, 0)
+
+        throughput = None
+        eta_seconds = None
+        if job.started_at and processed:
+            end = job.finished_at or datetime.utcnow()
+            elapsed = (end.replace(tzinfo=None) - job.started_at.replace(tzinfo=None)).total_seconds()
+            if elapsed > 0:
+                throughput = round(processed / elapsed * 60, 2)  # entries per minute
+                if job.status in ("queued", "running"):
+                    eta_seconds = int(remaining / (processed / elapsed))
+
+        return {
+            "job_id": job.id,
+            "status": job.status,
+            "total": job.total,
+            "processed": processed,
+            "sent": job.sent,
+            "failed": job.failed,
+            "remaining": remaining,
+            "throughput_per_minute": throughput,
+            "eta_seconds": eta_seconds,
+            "failures": job.failures or [],
+            "error": job.error,
+            "created_by": job.created_by,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at
+        }
+
+    def _watch(self) -> None:
+        """Periodically pick up jobs orphaned by crashed or restarted workers"""
+        interval = max(settings.BULK_EMAIL_STALE_SECONDS // 2, 5)
+        while True:
+            try:
+                self.resume_pending_jobs()
+            except Exception as e:
+                print(f"⚠️ Bulk email watchdog error: {e}")
+            time.sleep(interval)
+
+    def _claim(self, db: Session, job_id: str) -> bool:
+        """Take ownership of a job if it is unowned or its owner's heartbeat is stale"""
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.BULK_EMAIL_STALE_SECONDS)
+        result = db.execute(
+            update(BulkEmailJob)
+            .where(
+                BulkEmailJob.id == job_id,
+                BulkEmailJob.status.in_(("queued", "running")),
+                or_(
+                    BulkEmailJob.worker_id.is_(None),
+                    BulkEmailJob.heartbeat_at.is_(None),
+                    BulkEmailJob.heartbeat_at < stale_before
+                )
+            )
+            .values(worker_id=self.worker_id, heartbeat_at=datetime.utcnow())
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    def _start(self, job_id: str) -> None:
+        """Run a job in a background thread"""
+        with self._lock:
+            if job_id in self._active:
+                return
+            self._active.add(job_id)
+        thread = threading.Thread(target=self._run, args=(job_id,), name=f"bulk-email-{job_id[:8]}", daemon=True)
+        thread.start()
+
+    def _touch(self, db: Session, job_id: str) -> bool:
+        """Refresh the heartbeat if this worker still owns the job (conditional UPDATE, caller commits)"""
+        result = db.execute(
+            update(BulkEmailJob)
+            .where(BulkEmailJob.id == job_id, BulkEmailJob.worker_id == self.worker_id)
+            .values(heartbeat_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def _ensure_owner(self, db: Session, job_id: str) -> None:
+        """
+        Check ownership in the current transaction (the row stays locked until commit)
+
+        Raises:
+            JobOwnershipLost: If another worker claimed the job - nothing is written
+        """
+        if not self._touch(db, job_id):
+            db.rollback()
+            raise JobOwnershipLost(job_id)
+
+    def _heartbeat(self, job_id: str, stop: threading.Event) -> None:
+        """Keep the job's heartbeat fresh while it renders and sends (NIC SMTP takes ~90s per email)"""
+        interval = max(settings.BULK_EMAIL_STALE_SECONDS / 4, 1)
+        while not stop.wait(interval):
+            db = SessionLocal()
+            try:
+                owned = self._touch(db, job_id)
+                db.commit()
+            except Exception as e:
+                print(f"⚠️ Bulk email job {job_id} heartbeat failed: {e}")
+                continue
+            finally:
+                db.close()
+            if not owned:
+                print(f"⚠️ Bulk email job {job_id} was taken over by another worker")
+                return
+
+    def _record(self, db: Session, job: BulkEmailJob,
+                outcomes: List[Tuple[int, Optional[str], Optional[str]]]) -> None:
+        """
+        Persist the outcomes of one chunk in one commit (only while this worker owns the job)
+
+        Args:
+            outcomes: (entry_id, email, error) per entry - error None = sent
+        """
+        failures = [
+            {"entry_id": entry_id, "email": email, "error": error}
+            for entry_id, email, error in outcomes if error
+        ]
+        # Assign new lists so SQLAlchemy detects the JSON change
+        job.processed_ids = list(job.processed_ids or []) + [entry_id for entry_id, _, _ in outcomes]
+        if failures:
+            job.failures = list(job.failures or []) + failures
+        job.failed += len(failures)
+        job.sent += len(outcomes) - len(failures)
+        self._ensure_owner(db, job.id)
+        db.commit()
+
+    def _run(self, job_id: str) -> None:
+        """Process all unhandled entries of a job"""
+        db = SessionLocal()
+        job = None
+        stop_heartbeat = threading.Event()
+        try:
+            job = db.get(BulkEmailJob, job_id)
+            if job is None or job.status not in ("queued", "running"):
+                return
+
+            job.status = "running"
+            job.started_at = job.started_at or datetime.utcnow()
+            self._ensure_owner(db, job_id)
+            db.commit()
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(job_id, stop_heartbeat),
+                name=f"bulk-email-heartbeat-{job_id[:8]}", daemon=True
+            )
+            heartbeat.start()
+
+            done = set(job.processed_ids or [])
+            pending = [entry_id for entry_id in job.entry_ids if entry_id not in done]
+            username = job.created_by or "admin"
+            chunk_size = max(settings.BULK_EMAIL_CHUNK_SIZE, 1)
+
+            print(f"🚀 Bulk email job {job_id}: {len(pending)} of {job.total} entries pending")
+
+            with ThreadPoolExecutor(max_workers=max(settings.BULK_EMAIL_CONCURRENCY, 1)) as executor:
+                for start in range(0, len(pending), chunk_size):
+                    chunk_ids = pending[start:start + chunk_size]
+                    # Stop before rendering/sending anything if another worker took the job over
+                    self._ensure_owner(db, job_id)
+                    db.commit()
+                    entries = {
+                        e.id: e for e in db.query(Entry).filter(Entry.id.in_(chunk_ids)).all()
+                    }
+                    outcomes = []
+                    now = datetime.utcnow()
+
+                    snapshots = []
+                    for entry_id in chunk_ids:
+                        entry = entries.get(entry_id)
+                        if entry is None:
+                            # Deleted after the job was queued
+                            outcomes.append((entry_id, None, "Entry not found"))
+                        elif not entry.has_any_pass:
+                            error = "No passes allocated for this entry"
+                            email_outbox.mark_entry(db, entry_id, "failed", error, now)
+                            outcomes.append((entry_id, entry.email, error))
+                        else:
+                            snapshots.append(PassEntrySnapshot.from_entry(entry))
+
+                    # Render the chunk on the process pool, then send with bounded concurrency
+                    renders = pass_generator.generate_batch(snapshots, username, attachment_variant="email")
+
+                    futures = {}
+                    for snapshot, render in zip(snapshots, renders):
+                        if not render.success:
+                            error = f"Pass generation failed: {render.error}"
+                            email_outbox.mark_entry(db, snapshot.id, "failed", error, now)
+                            outcomes.append((snapshot.id, snapshot.email, error))
+                            continue
+                        entries[snapshot.id].mark_passes_generated()
+                        future = executor.submit(email_service.deliver_passes, snapshot, render.files)
+                        futures[future] = snapshot
+
+                    for future in as_completed(futures):
+                        snapshot = futures[future]
+                        try:
+                            result = future.result()
+                            error = None if result.ok else (result.error or "Email sending failed")
+                        except Exception as e:
+                            error = f"Email error: {e}"
+                        if error is None:
+                            email_outbox.mark_entry(db, snapshot.id, "sent", None, datetime.utcnow())
+                        else:
+                            # Retried with backoff by the outbox workers (entry shows 'queued')
+                            email_outbox.enqueue_passes(db, entries[snapshot.id], username)
+                            error = f"{error} - queued for retry"
+                        outcomes.append((snapshot.id, snapshot.email, error))
+
+                    # One commit per chunk for progress, entry status and retries
+                    self._record(db, job, outcomes)
+
+            job.status = "completed"
+            job.finished_at = datetime.utcnow()
+            self._ensure_owner(db, job_id)
+            db.commit()
+            print(f"✅ Bulk email job {job_id} completed: {job.sent} sent, {job.failed} failed")
+
+        except JobOwnershipLost:
+            print(f"⏹️ Bulk email job {job_id} stopped - another worker owns it now")
+        except Exception as e:
+            print(f"❌ Bulk email job {job_id} failed: {e}")
+            db.rollback()
+            if job is not None and self._touch(db, job_id):
+                job.status = "failed"
+                job.error = str(e)[:1000]
+                job.finished_at = datetime.utcnow()
+                db.commit()
+        finally:
+            stop_heartbeat.set()
+            db.close()
+            with self._lock:
+                self._active.discard(job_id)
+
+
+# Create singleton instance
+bulk_email_runner = BulkEmailJobRunner()
@@ -0,0 +1,463 @@
+"""
+Check-in index - in-memory lookup of entries for gate scanning
+Resolves a scanned QR payload (signed or human-readable) to an entry, checks
+pass entitlement and session hours without touching the database; only the
+check-in INSERT hits the DB
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import exists, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal, server_timestamp_param
+from ..models import CheckIn, Entry, PassRevocation, ScannerDevice, User
+from .live_counters import live_counters
+from .pass_generator import PassGenerator
+from .qr_payload import InvalidPayloadError, qr_payload
+
+# Sessions a gate can check attendees into
+SESSION_TYPES = ("exhibition_day1", "exhibition_day2", "interactive_sessions", "plenary")
+
+# Human-readable QR "Session:" line -> sessions the pass admits to
+SESSION_BY_NAME = {
+    details["name"]: frozenset(PassGenerator.PASS_SESSIONS[key])
+    for key, details in PassGenerator.SESSION_DETAILS.items()
+}
+
+
+@dataclass(frozen=True)
+class IndexedEntry:
+    """The fields of an entry needed to validate a scan"""
+    id: int
+    name: str
+    organization: str
+    sessions: FrozenSet[str]  # Sessions this entry may enter
+
+    @classmethod
+    def from_row(cls, row) -> "IndexedEntry":
+        """Build from an (Entry columns + organization) row"""
+        sessions = set()
+        if row.is_exhibitor_pass:
+            sessions.update(("exhibition_day1", "exhibition_day2"))
+        for session_type in SESSION_TYPES:
+            if getattr(row, session_type):
+                sessions.add(session_type)
+        return cls(id=row.id, name=row.name, organization=row.organization or "", sessions=frozenset(sessions))
+
+
+@dataclass
+class ScanOutcome:
+    """Result of verifying and recording one scan"""
+    status: str  # 'accepted', 'duplicate', 'not_found', 'invalid_qr', 'not_entitled', 'outside_hours'
+    message: str
+    entry: Optional[IndexedEntry] = None
+    session_type: Optional[str] = None
+    checked_in_at: Optional[datetime] = None
+
+    @property
+    def valid(self) -> bool:
+        return self.status == "accepted"
+
+
+def normalize_id_number(id_number: str) -> str:
+    """ID number without the hyphens/spaces added for display in QR codes"""
+    return "".join(id_number.split()).replace("-", "").upper()
+
+
+class CheckInIndex:
+    """
+    Process-wide index of entries (by ID number) and recorded check-ins
+
+    - Loaded once (on startup or first scan) with two column-only queries
+    - Refreshed incrementally (entries.updated_at and pass_revocations.revoked_at
+      watermarks) in the background; revoked (deleted) entries never resolve again
+    - Signed payloads are looked up by entry ID, human-readable ones by ID number
+    - A scan for an unknown entry falls back to one indexed DB lookup,
+      so entries created after the last refresh are never rejected
+    - Duplicate detection is in memory first; the INSERT itself is conditional
+      (INSERT ... SELECT WHERE NOT EXISTS) so scans on other workers are caught too
+    """
+
+    def __init__(self):
+        """Initialize empty index"""
+        self._entries: Dict[str, IndexedEntry] = {}
+        self._by_id: Dict[int, Tuple[str, IndexedEntry]] = {}
+        self._checked_in: Dict[Tuple[int, str], datetime] = {}
+        self._devices: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._watermark: Optional[datetime] = None
+        self._revoked: Set[int] = set()
+        self._revoked_watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._refresher: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _entry_query(db: Session):
+        """Column-only query of everything the index needs"""
+        return db.query(
+            Entry.id, Entry.name, Entry.id_number, Entry.updated_at, Entry.is_exhibitor_pass,
+            Entry.exhibition_day1, Entry.exhibition_day2, Entry.interactive_sessions, Entry.plenary,
+            User.organization
+        ).join(User, User.username == Entry.username)
+
+    def _add_rows(self, rows) -> None:
+        """Insert / replace entries in the index"""
+        with self._lock:
+            for row in rows:
+                if row.id in self._revoked:
+                    continue
+                key = normalize_id_number(row.id_number)
+                indexed = IndexedEntry.from_row(row)
+                previous = self._by_id.get(row.id)
+                if previous and previous[0] != key:
+                    # ID number was edited - the old one must no longer resolve
+                    self._entries.pop(previous[0], None)
+                self._entries[key] = indexed
+                self._by_id[row.id] = (key, indexed)
+                if row.updated_at and (self._watermark is None or row.updated_at > self._watermark):
+                    self._watermark = row.updated_at
+
+    def _revoke_rows(self, rows) -> None:
+        """Drop revoked entries (pass_revocations rows) and keep them out of the index"""
+        with self._lock:
+            for entry_id, revoked_at in rows:
+                self._drop(entry_id)
+                if revoked_at and (self._revoked_watermark is None or revoked_at > self._revoked_watermark):
+                    self._revoked_watermark = revoked_at
+
+    def load(self) -> int:
+        """
+        (Re)build the whole index from the database
+
+        Returns:
+            Number of entries indexed
+        """
+        start = time.time()
+        db = SessionLocal()
+        try:
+            revocations = db.query(PassRevocation.entry_id, PassRevocation.revoked_at).all()
+            rows = self._entry_query(db).all()
+            checkins = db.query(CheckIn.entry_id, CheckIn.session_type, CheckIn.check_in_time).all()
+            devices = db.query(ScannerDevice.device_id, ScannerDevice.gate_number, ScannerDevice.gate_location).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._entries = {}
+            self._by_id = {}
+            self._watermark = None
+            self._revoked = set()
+            self._revoked_watermark = None
+            self._checked_in = {}
+            for entry_id, session_type, check_in_time in checkins:
+                key = (entry_id, session_type)
+                if key not in self._checked_in or (check_in_time and check_in_time < self._checked_in[key]):
+                    self._checked_in[key] = check_in_time
+            self._devices = {device_id: (gate, location) for device_id, gate, location in devices}
+        self._revoke_rows(revocations)
+        self._add_rows(rows)
+        self._loaded = True
+
+        print(f"🗂️  Check-in index loaded: {len(rows)} entries, {len(checkins)} check-ins ({time.time() - start:.2f}s)")
+        return len(rows)
+
+    def ensure_loaded(self) -> None:
+        """Load the index on first use"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self.load()
+
+    def refresh(self) -> int:
+        """
+        Pull entries changed and passes revoked since the last load/refresh
+
+        Revocations are applied after the entries, so an entry read just
+        before it was deleted does not stay in the index.
+
+        Returns:
+            Number of entries updated in the index
+        """
+        db = SessionLocal()
+        try:
+            query = self._entry_query(db)
+            if self._watermark is not None:
+                query = query.filter(Entry.updated_at >= server_timestamp_param(self._watermark))
+            rows = query.all()
+            revocations = db.query(PassRevocation.entry_id, PassRevocation.revoked_at)
+            if self._revoked_watermark is not None:
+                revocations = revocations.filter(
+                    PassRevocation.revoked_at >= server_timestamp_param(self._revoked_watermark)
+                )
+            revocations = revocations.all()
+        finally:
+            db.close()
+        self._add_rows(rows)
+        self._revoke_rows(revocations)
+        return len(rows)
+
+    def start(self) -> None:
+        """Load the index and keep it fresh in a background thread (call once on app startup)"""
+        if self._refresher and self._refresher.is_alive():
+            return
+        self._refresher = threading.Thread(target=self._refresh_loop, name="checkin-index", daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        """Initial load, then periodic incremental refreshes"""
+        while True:
+            try:
+                if self._loaded:
+                    self.refresh()
+                else:
+                    self.ensure_loaded()
+            except Exception as e:
+                print(f"⚠️ Check-in index refresh error: {e}")
+            time.sleep(max(settings.CHECKIN_INDEX_REFRESH_SECONDS, 1))
+
+    def _lookup(self, id_number: str) -> Optional[IndexedEntry]:
+        """Find an entry in memory, falling back to the database for new entries"""
+        key = normalize_id_number(id_number)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        db = SessionLocal()
+        try:
+            # id_number is stored without display hyphens; try both forms
+            rows = self._entry_query(db).filter(Entry.id_number.in_({id_number, key})).all()
+        finally:
+            db.close()
+        self._add_rows(rows)
+        return self._entries.get(key)
+
+    def _lookup_id(self, entry_id: int) -> Optional[IndexedEntry]:
+        """Find an entry by primary key in memory, falling back to the database"""
+        if entry_id in self._revoked:
+            return None
+        indexed = self._by_id.get(entry_id)
+        if indexed is not None:
+            return indexed[1]
+
+        db = SessionLocal()
+        try:
+            rows = self._entry_query(db).filter(Entry.id == entry_id).all()
+        finally:
+            db.close()
+        self._add_rows(rows)
+        indexed = self._by_id.get(entry_id)
+        return indexed[1] if indexed else None
+
+    def _forget(self, entry_id: int) -> None:
+        """Drop an entry that no longer exists"""
+        with self._lock:
+            self._drop(entry_id)
+
+    def _drop(self, entry_id: int) -> None:
+        """Remove an entry and reject its passes from now on (lock held)"""
+        self._revoked.add(entry_id)
+        indexed = self._by_id.pop(entry_id, None)
+        if indexed:
+            self._entries.pop(indexed[0], None)
+
+    def evict(self, entry_ids: Iterable[int]) -> None:
+        """Drop deleted entries right away (call after the delete commits; other workers catch up on refresh)"""
+        with self._lock:
+            for entry_id in entry_ids:
+                self._drop(entry_id)
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def parse_qr(qr_data: str) -> Dict[str, str]:
+        """Parse the 'Key: value' lines of a pass QR code"""
+        fields = {}
+        for line in qr_data.splitlines():
+            key, sep, value = line.partition(":")
+            if sep:
+                fields[key.strip().lower()] = value.strip()
+        return fields
+
+    @staticmethod
+    def _resolve_session(pass_sessions: FrozenSet[str], requested: Optional[str],
+                         now: datetime) -> Optional[str]:
+        """Work out which session the attendee is entering"""
+        if requested:
+            return requested
+        if len(pass_sessions) > 1:
+            # Exhibitor pass (both exhibition days) - pick today's day
+            for session_type in sorted(pass_sessions):
+                if now.date() == PassGenerator.session_window(session_type)[0].date():
+                    return session_type
+            return min(pass_sessions)
+        return next(iter(pass_sessions), None)
+
+    def device_gate(self, device_id: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Gate number and location registered for a scanner device"""
+        return self._devices.get(device_id, (None, None)) if device_id else (None, None)
+
+    def verify(self, qr_data: str, session_type: Optional[str] = None,
+               now: Optional[datetime] = None) -> ScanOutcome:
+        """
+        Check a scanned pass without recording anything (no duplicate check)
+
+        Args:
+            qr_data: Raw text read from the QR code (signed payload or human-readable text)
+            session_type: Session the gate admits to (default: session printed on the pass)
+            now: Scan time (aware; default: current time)
+
+        Returns:
+            ScanOutcome with status 'accepted' if the pass admits to the session now
+        """
+        self.ensure_loaded()
+        now = now or datetime.now(ZoneInfo(settings.EVENT_TIMEZONE))
+
+        payload = None
+        if qr_payload.is_signed(qr_data):
+            try:
+                payload = qr_payload.decode(qr_data)
+            except InvalidPayloadError:
+                return ScanOutcome("invalid_qr", "Pass could not be verified")
+            entry = self._lookup_id(payload.entry_id)
+            pass_sessions = payload.sessions
+        else:
+            fields = self.parse_qr(qr_data)
+            id_number = fields.get("id number")
+            if not id_number:
+                return ScanOutcome("invalid_qr", "Not a Swavlamban 2025 pass")
+            entry = self._lookup(id_number)
+            pass_sessions = SESSION_BY_NAME.get(fields.get("session", ""), frozenset())
+
+        if entry is None or entry.id in self._revoked:
+            return ScanOutcome("not_found", "No registration found for this pass")
+
+        session = self._resolve_session(pass_sessions, session_type, now)
+        if session not in SESSION_TYPES:
+            return ScanOutcome("invalid_qr", "Pass does not name a valid session", entry)
+
+        session_name = PassGenerator.SESSION_DETAILS[session]["name"]
+        if session not in entry.sessions:
+            return ScanOutcome("not_entitled", f"No pass for {session_name}", entry, session)
+
+        if settings.CHECKIN_ENFORCE_SCHEDULE:
+            if payload is not None and not payload.is_valid_at(now):
+                return ScanOutcome("outside_hours", "Pass is not valid at this time", entry, session)
+            opens, closes = PassGenerator.session_window(session)
+            if not opens <= now <= closes:
+                return ScanOutcome(
+                    "outside_hours",
+                    f"{session_name} entry is open {opens:%d %b %H:%M} - {closes:%H:%M}",
+                    entry, session
+                )
+
+        return ScanOutcome("accepted", f"Welcome to {session_name}", entry, session)
+
+    def scan(self, db: Session, qr_data: str, session_type: Optional[str] = None,
+             gate_number: Optional[str] = None, gate_location: Optional[str] = None,
+             device_id: Optional[str] = None, operator: Optional[str] = None,
+             now: Optional[datetime] = None) -> ScanOutcome:
+        """
+        Verify a scanned pass and record the check-in
+
+        Args:
+            db: Database session (used only for the check-in INSERT)
+            qr_data: Raw text read from the QR code (signed payload or human-readable text)
+            session_type: Session the gate admits to (default: session printed on the pass)
+            gate_number / gate_location: Gate details (default: from the scanner device)
+            device_id: Scanner device ID
+            operator: Username of the scanning operator
+            now: Scan time (for testing)
+
+        Returns:
+            ScanOutcome - rejected scans are outcomes, not exceptions
+        """
+        now = now or datetime.now(ZoneInfo(settings.EVENT_TIMEZONE))
+        outcome = self.verify(qr_data, session_type, now)
+        if not outcome.valid:
+            return outcome
+        entry, session = outcome.entry, outcome.session_type
+        session_name = PassGenerator.SESSION_DETAILS[session]["name"]
+
+        key = (entry.id, session)
+        first_seen = self._checked_in.get(key)
+        if first_seen is not None:
+            return ScanOutcome("duplicate", f"Already checked in to {session_name}", entry, session, first_seen)
+
+        if device_id and not (gate_number or gate_location):
+            gate_number, gate_location = self.device_gate(device_id)
+
+        # Single round trip: insert unless another gate/worker recorded it already
+        checked_in_at = now.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+        row = {
+            "entry_id": entry.id,
+            "session_type": session,
+            "session_name": session_name,
+            "check_in_time": checked_in_at,
+            "gate_number": gate_number,
+            "gate_location": gate_location,
+            "scanner_device_id": device_id,
+            "scanner_operator": operator,
+            "verification_status": "verified"
+        }
+        # Typed literals so PostgreSQL can infer parameter types (including NULLs)
+        values = select(
+            *[literal(value, type_=CheckIn.__table__.c[column].type) for column, value in row.items()]
+        ).where(~exists().where(CheckIn.entry_id == entry.id, CheckIn.session_type == session))
+        try:
+            result = db.execute(insert(CheckIn).from_select(list(row), values))
+            db.commit()
+            inserted = result.rowcount == 1
+        except IntegrityError:
+            # Concurrent scan of the same pass (unique entry/session) or entry deleted since it was indexed
+            db.rollback()
+            inserted = False
+
+        if not inserted:
+            first_seen = db.query(CheckIn.check_in_time).filter(
+                CheckIn.entry_id == entry.id, CheckIn.session_type == session
+            ).scalar()
+            if first_seen is None:
+                self._forget(entry.id)
+                return ScanOutcome("not_found", "No registration found for this pass")
+            self.mark_checked_in(entry.id, session, first_seen)
+            return ScanOutcome("duplicate", f"Already checked in to {session_name}", entry, session, first_seen)
+
+        self.mark_checked_in(entry.id, session, checked_in_at)
+        live_counters.record(session, gate_number, checked_in_at)
+        return ScanOutcome("accepted", f"Welcome to {session_name}", entry, session, checked_in_at)
+
+    def mark_checked_in(self, entry_id: int, session_type: str, checked_in_at: Optional[datetime]) -> None:
+        """Record a check-in stored elsewhere (e.g. uploaded by an offline scanner)"""
+        with self._lock:
+            self._checked_in[(entry_id, session_type)] = checked_in_at
+
+    def stats(self) -> dict:
+        """Get index counters"""
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "entries": len(self._entries),
+                "checked_in": len(self._checked_in),
+                "revoked": len(self._revoked),
+                "devices": len(self._devices),
+                "watermark": self._watermark
+            }
+
+
+# Create singleton instance
+checkin_index = CheckInIndex()
@@ -0,0 +1,373 @@
+"""
+Email outbox - pass emails are queued by the API and sent by worker threads
+Messages are persisted in the email_outbox table, claimed with conditional
+UPDATEs (safe with several worker processes) and retried with exponential backoff
+"""
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models import EmailOutbox, Entry
+from .email_service import email_service
+from .pass_generator import pass_generator, PassEntrySnapshot
+
+
+class EmailOutboxService:
+    """Queues pass emails and runs the workers that deliver them"""
+
+    def __init__(self):
+        """Initialize outbox for this process (workers are started separately)"""
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._claims: Dict[int, str] = {}  # Message id -> claim token, for messages being sent
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Enqueue
+    # ------------------------------------------------------------------
+
+    def enqueue_passes(self, db: Session, entry: Entry, created_by: str) -> EmailOutbox:
+        """
+        Queue the pass email for an entry - the caller commits
+
+        An entry that already has an unsent message keeps it (due now), so
+        pressing "send" repeatedly does not mail the attendee several times.
+
+        Args:
+            db: Database session
+            entry: Entry whose passes are emailed
+            created_by: Username requesting the email (passes are rendered for this user)
+
+        Returns:
+            The queued EmailOutbox row
+        """
+        now = datetime.utcnow()
+        message = db.query(EmailOutbox).filter(
+            EmailOutbox.entry_id == entry.id,
+            EmailOutbox.status.in_(("queued", "sending"))
+        ).first()
+
+        if message is None:
+            message = EmailOutbox(
+                entry_id=entry.id,
+                recipient=entry.email,
+                status="queued",
+                attempts=0,
+                max_attempts=max(settings.EMAIL_OUTBOX_MAX_ATTEMPTS, 1),
+                next_attempt_at=now,
+                created_by=created_by
+            )
+            db.add(message)
+        elif message.status == "queued":
+            message.next_attempt_at = now
+            message.recipient = entry.email
+
+        entry.email_status = "queued"
+        entry.email_status_at = now
+        entry.email_error = None
+        db.flush()
+        return message
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def start(self, workers: int) -> None:
+        """
+        Start the dispatcher thread with a pool of senders
+
+        Args:
+            workers: Concurrent senders (0 = do nothing)
+        """
+        if workers <= 0 or (self._dispatcher and self._dispatcher.is_alive()):
+            return
+        self._stop.clear()
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, args=(workers,), name="email-outbox", daemon=True
+        )
+        self._dispatcher.start()
+        print(f"📮 Email outbox worker started ({workers} senders, {self.worker_id})")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming messages and wait for the dispatcher (messages being sent finish first)"""
+        self._stop.set()
+        if self._dispatcher:
+            self._dispatcher.join(timeout)
+
+    def _dispatch(self, workers: int) -> None:
+        """Claim due messages whenever a sender is free, and keep the claims of messages being sent fresh"""
+        heartbeat_interval = max(settings.EMAIL_OUTBOX_LOCK_SECONDS / 4, 1)
+        last_heartbeat = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="email-sender") as executor:
+            while not self._stop.is_set():
+                if time.monotonic() - last_heartbeat >= heartbeat_interval:
+                    self._heartbeat()
+                    last_heartbeat = time.monotonic()
+
+                with self._lock:
+                    free = workers - len(self._claims)
+                claimed = []
+                if free > 0:
+                    try:
+                        claimed = self.claim(free)
+                    except Exception as e:
+                        print(f"⚠️ Email outbox poll failed: {e}")
+                for message_id, token in claimed:
+                    with self._lock:
+                        self._claims[message_id] = token
+                    executor.submit(self._deliver_and_release, message_id, token)
+                if len(claimed) < free or free <= 0:
+                    self._stop.wait(min(settings.EMAIL_OUTBOX_POLL_SECONDS, heartbeat_interval))
+
+    def _deliver_and_release(self, message_id: int, token: str) -> None:
+        """Deliver one message and free its sender slot"""
+        try:
+            self.deliver(message_id, token)
+        except Exception as e:
+            print(f"❌ Email outbox message {message_id} crashed: {e}")
+        finally:
+            with self._lock:
+                self._claims.pop(message_id, None)
+
+    def _heartbeat(self) -> None:
+        """Refresh locked_at of the messages this process is sending, so they do not look stale"""
+        with self._lock:
+            tokens = list(self._claims.values())
+        if not tokens:
+            return
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.status == "sending", EmailOutbox.locked_by.in_(tokens))
+                .values(locked_at=datetime.utcnow())
+            )
+            db.commit()
+        except Exception as e:
+            print(f"⚠️ Email outbox heartbeat failed: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _stale_filter(now: datetime):
+        """'sending' messages whose worker stopped refreshing the lock"""
+        stale_before = now - timedelta(seconds=settings.EMAIL_OUTBOX_LOCK_SECONDS)
+        return and_(EmailOutbox.status == "sending", EmailOutbox.locked_at < stale_before)
+
+    @classmethod
+    def _due_filter(cls, now: datetime):
+        """Queued messages that are due, and stale 'sending' messages with attempts left"""
+        return or_(
+            and_(EmailOutbox.status == "queued", EmailOutbox.next_attempt_at <= now),
+            and_(cls._stale_filter(now), EmailOutbox.attempts < EmailOutbox.max_attempts)
+        )
+
+    @classmethod
+    def _exhausted_filter(cls, now: datetime):
+        """Stale 'sending' messages that already used their last attempt"""
+        return and_(cls._stale_filter(now), EmailOutbox.attempts >= EmailOutbox.max_attempts)
+
+    def _fail_exhausted(self, db: Session, now: datetime) -> None:
+        """Mark stale messages without attempts left as failed instead of sending them again"""
+        error = "Worker stopped while sending - no attempts left"
+        stale = db.query(EmailOutbox.id, EmailOutbox.entry_id).filter(self._exhausted_filter(now)).all()
+        for message_id, entry_id in stale:
+            result = db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == message_id, self._exhausted_filter(now))
+                .values(status="failed", last_error=error, locked_by=None, locked_at=None)
+            )
+            if result.rowcount == 1:
+                self.mark_entry(db, entry_id, "failed", error, now)
+                print(f"❌ Outbox message {message_id} failed: {error}")
+            db.commit()
+
+    def claim(self, limit: int) -> List[Tuple[int, str]]:
+        """
+        Take ownership of up to limit due messages
+
+        Each message is claimed with a conditional UPDATE and gets its own
+        claim token in locked_by, so a message is sent by exactly one worker
+        even with several worker processes - and a worker whose claim went
+        stale and was taken over cannot record an outcome for it.
+
+        Returns:
+            (message id, claim token) of the claimed messages
+        """
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            self._fail_exhausted(db, now)
+            candidates = db.query(EmailOutbox.id).filter(self._due_filter(now)).order_by(
+                EmailOutbox.next_attempt_at, EmailOutbox.id
+            ).limit(limit).all()
+
+            claimed = []
+            for (message_id,) in candidates:
+                token = f"{self.worker_id}:{uuid.uuid4().hex[:12]}"
+                result = db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id == message_id, self._due_filter(now))
+                    .values(status="sending", locked_by=token, locked_at=now,
+                            attempts=EmailOutbox.attempts + 1)
+                )
+                db.commit()
+                if result.rowcount == 1:
+                    claimed.append((message_id, token))
+            return claimed
+        finally:
+            db.close()
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Backoff before the next attempt: base * 2^(attempts-1), capped, with +-20% jitter"""
+        delay = min(settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0),
+                    settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS)
+        return delay * random.uniform(0.8, 1.2)
+
+    def deliver(self, message_id: int, token: str) -> bool:
+        """
+        Render and send one claimed message, then record the outcome
+
+        No database connection is held while sending (NIC SMTP takes ~90s);
+        the dispatcher refreshes the claim meanwhile.
+
+        Args:
+            message_id: Id of a message claimed by this worker
+            token: Claim token returned by claim()
+
+        Returns:
+            True if the email was sent
+        """
+        db = SessionLocal()
+        try:
+            message = db.get(EmailOutbox, message_id)
+            if message is None or message.status != "sending" or message.locked_by != token:
+                return False
+            entry = db.get(Entry, message.entry_id)
+            snapshot = PassEntrySnapshot.from_entry(entry) if entry is not None else None
+            username = message.created_by or (entry.username if entry is not None else None)
+            attempts, max_attempts = message.attempts, message.max_attempts
+            recipient = message.recipient
+        finally:
+            db.close()
+
+        error = None
+        provider = None
+        if snapshot is None:
+            error = "Entry not found"
+        elif not snapshot.has_any_pass:
+            error = "No passes allocated for this entry"
+        else:
+            try:
+                files = pass_generator.generate_passes_for_entry(snapshot, username, attachment_variant="email")
+                # Paced per provider and failed over between providers by the email service
+                result = email_service.deliver_passes(snapshot, files)
+                provider = result.provider
+                if not result.ok:
+                    error = result.error or "Email sending failed"
+            except Exception as e:
+                error = f"Email error: {e}"
+
+        # Permanent failures (entry gone, nothing to send) are not retried
+        retry = error is not None and snapshot is not None and snapshot.has_any_pass and attempts < max_attempts
+        if not self._record(message_id, token, snapshot.id if snapshot else None, provider, error, retry, attempts):
+            print(f"⚠️ Outbox message {message_id} was taken over by another worker - outcome not recorded")
+            return error is None
+
+        if error is None:
+            print(f"📨 Outbox message {message_id} sent to {recipient} via {provider}")
+        elif retry:
+            print(f"🔁 Outbox message {message_id} attempt {attempts} failed ({error}), will retry")
+        else:
+            print(f"❌ Outbox message {message_id} failed after {attempts} attempt(s): {error}")
+        return error is None
+
+    def _record(self, message_id: int, token: str, entry_id: Optional[int], provider: Optional[str],
+                error: Optional[str], retry: bool, attempts: int) -> bool:
+        """
+        Mark a message sent, reschedule it, or give up - and mirror the status on the entry
+
+        Returns:
+            False if the claim token no longer matches (nothing recorded)
+        """
+        now = datetime.utcnow()
+        values = {"provider": provider, "locked_by": None, "locked_at": None}
+        if error is None:
+            values.update(status="sent", sent_at=now, last_error=None)
+        elif retry:
+            values.update(status="queued", last_error=error[:1000],
+                          next_attempt_at=now + timedelta(seconds=self.retry_delay(attempts)))
+        else:
+            values.update(status="failed", last_error=error[:1000])
+
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == message_id, EmailOutbox.locked_by == token)
+                .values(**values)
+            )
+            if result.rowcount != 1:
+                db.rollback()
+                return False
+            if entry_id is not None:
+                self.mark_entry(db, entry_id, values["status"], error, now)
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    @staticmethod
+    def mark_entry(db: Session, entry_id: int, status: str, error: Optional[str], now: datetime) -> None:
+        """Mirror a message status on its entry - the caller commits"""
+        # Keep updated_at unchanged - delivery status is not a pass change for scanner sync
+        db.execute(
+            update(Entry)
+            .where(Entry.id == entry_id)
+            .values(
+                email_status=status,
+                email_status_at=now,
+                email_error=None if error is None else error[:500],
+                updated_at=Entry.updated_at
+            )
+        )
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def stats(self, db: Session) -> dict:
+        """Message counts by status, the oldest due message and this process's workers"""
+        counts = dict(db.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all())
+        oldest_due = db.query(func.min(EmailOutbox.next_attempt_at)).filter(
+            EmailOutbox.status == "queued"
+        ).scalar()
+        with self._lock:
+            in_flight = len(self._claims)
+        return {
+            "queued": counts.get("queued", 0),
+            "sending": counts.get("sending", 0),
+            "sent": counts.get("sent", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_queued_at": oldest_due,
+            "worker_id": self.worker_id,
+            "worker_running": bool(self._dispatcher and self._dispatcher.is_alive()),
+            "in_flight": in_flight
+        }
+
+
+# Create singleton instance
+email_outbox = EmailOutboxService()
@@ -0,0 +1,360 @@
+"""
+Email router - health-based routing over all configured email providers
+Tracks rolling error rate and latency per provider, opens a circuit breaker
+after repeated failures and fails over to the next provider within a send
+"""
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from .attachment_cache import attachment_cache
+from .rate_limiter import ProviderRateLimiter
+
+
+@dataclass
+class SendResult:
+    """Outcome of one routed send"""
+    ok: bool
+    provider: Optional[str] = None  # Provider that sent (or last failed) the message
+    error: Optional[str] = None
+    attempts: int = 0  # Providers tried
+
+
+@dataclass
+class BatchRecipient:
+    """One recipient of a batch send - params fill {{key}} placeholders in the subject and bodies"""
+    email: str
+    name: str = ""
+    params: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def values(self) -> Dict[str, str]:
+        """Placeholder values ({{name}} defaults to the recipient name)"""
+        return {"name": self.name, **self.params}
+
+
+# Provider-neutral placeholder - providers translate it to their own template language
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def render_placeholders(template: str, values: Dict[str, str]) -> str:
+    """Fill {{key}} placeholders (unknown keys become empty)"""
+    return PLACEHOLDER.sub(lambda m: str(values.get(m.group(1), "")), template or "")
+
+
+class ProviderRoute:
+    """
+    One email provider with its health and circuit breaker
+
+    Circuit states:
+    - closed: provider is used normally
+    - open: skipped until open_until (after EMAIL_CIRCUIT_FAILURE_THRESHOLD consecutive failures)
+    - half_open: open period over - the next send is a trial; success closes the
+      circuit, failure re-opens it for twice as long (max EMAIL_CIRCUIT_MAX_OPEN_SECONDS)
+    """
+
+    def __init__(self, key: str, name: str, provider, uses_smtp: bool, priority: int):
+        self.key = key
+        self.name = name
+        self.provider = provider
+        self.uses_smtp = uses_smtp  # Takes file paths (False = base64 attachments, MailBluster)
+        self.priority = priority  # Position in the configured priority order
+        self._results = deque(maxlen=max(settings.EMAIL_HEALTH_WINDOW, 1))  # (monotonic time, ok, latency seconds)
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.open_seconds = 0.0
+        self.trial_in_progress = False
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'"""
+        if not self.open_seconds:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half_open"
+
+    def _recent(self) -> List[tuple]:
+        """Results from the last EMAIL_HEALTH_WINDOW_SECONDS (old failures stop counting against a provider)"""
+        since = time.monotonic() - settings.EMAIL_HEALTH_WINDOW_SECONDS
+        with self._lock:
+            return [(ok, latency) for at, ok, latency in self._results if at >= since]
+
+    @property
+    def error_rate(self) -> float:
+        """Failed share of the recent sends"""
+        recent = self._recent()
+        if not recent:
+            return 0.0
+        return sum(1 for ok, _ in recent if not ok) / len(recent)
+
+    @property
+    def avg_latency(self) -> Optional[float]:
+        """Mean seconds per recent successful send"""
+        latencies = [latency for ok, latency in self._recent() if ok]
+        return sum(latencies) / len(latencies) if latencies else None
+
+    def acquire(self) -> bool:
+        """Reserve a send (False while the circuit is open or another trial send is running)"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_progress:
+                self.trial_in_progress = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back an acquired send that was not attempted"""
+        with self._lock:
+            self.trial_in_progress = False
+
+    def record(self, ok: bool, latency: float, error: Optional[str] = None) -> None:
+        """Record a send result and update the circuit breaker"""
+        with self._lock:
+            self._results.append((time.monotonic(), ok, latency))
+            self.trial_in_progress = False
+            if ok:
+                self.sent += 1
+                self.consecutive_failures = 0
+                if self.open_seconds:
+                    print(f"✅ Email provider {self.name} recovered - circuit closed")
+                self.open_seconds = 0.0
+                return
+
+            self.failed += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+            if self.open_seconds:
+                # Trial send failed - back off further
+                self.open_seconds = min(self.open_seconds * 2, settings.EMAIL_CIRCUIT_MAX_OPEN_SECONDS)
+            elif self.consecutive_failures >= settings.EMAIL_CIRCUIT_FAILURE_THRESHOLD:
+                self.open_seconds = settings.EMAIL_CIRCUIT_OPEN_SECONDS
+            else:
+                return
+            self.open_until = time.monotonic() + self.open_seconds
+            print(f"⚠️ Email provider {self.name} circuit open for {self.open_seconds:.0f}s "
+                  f"({self.consecutive_failures} consecutive failures)")
+
+    def send(self, to_email: str, subject: str, html_body: str, body: str,
+             attachments: List[Path]) -> bool:
+        """Send through this provider's client"""
+        if self.uses_smtp:
+            # SMTP-style providers (Brevo, Mailjet, NIC SMTP, Gmail SMTP) take file paths directly
+            return self.provider.send_email(
+                to_email=to_email,
+                subject=subject,
+                html_content=html_body,
+                text_content=body,
+                attachments=attachments
+            )
+        # API-based providers (MailBluster) use base64 encoded attachments
+        encoded = [
+            {
+                "filename": attachment.filename,
+                "content": attachment.base64_content,
+                "type": attachment.content_type
+            }
+            for attachment in attachment_cache.get_many(attachments)
+        ]
+        return self.provider.send_transactional_email(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_body,
+            text_content=body,
+            attachments=encoded,
+            from_name="Swavlamban 2025 Team"
+        )
+
+    @property
+    def batch_size(self) -> int:
+        """Recipients per batch request (0 = provider has no batch API)"""
+        return getattr(self.provider, "MAX_BATCH_SIZE", 0)
+
+    def send_batch(self, recipients: List[BatchRecipient], subject: str, html_body: str,
+                   body: str, attachments: List[Path]) -> List[Optional[str]]:
+        """Send one batch request - error per recipient (None = sent)"""
+        return self.provider.send_batch(
+            recipients=recipients,
+            subject=subject,
+            html_content=html_body,
+            text_content=body,
+            attachments=attachments
+        )
+
+    def stats(self) -> dict:
+        """Health details for operators"""
+        latency = self.avg_latency
+        return {
+            "provider": self.key,
+            "name": self.name,
+            "priority": self.priority,
+            "state": self.state,
+            "sent": self.sent,
+            "failed": self.failed,
+            "error_rate": round(self.error_rate, 3),
+            "avg_latency_seconds": round(latency, 2) if latency is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "open_for_seconds": max(round(self.open_until - time.monotonic()), 0) if self.state == "open" else 0,
+            "last_error": self.last_error
+        }
+
+
+class EmailRouter:
+    """Routes each message to the healthiest provider and fails over on errors"""
+
+    def __init__(self, routes: List[ProviderRoute]):
+        """
+        Args:
+            routes: Configured providers in priority order
+        """
+        self.routes = routes
+        self.limiter = ProviderRateLimiter()
+
+    def _reserve(self, route: ProviderRoute, count: int = 1) -> bool:
+        """Take the circuit breaker slot and wait for rate limit tokens (False = skip this provider)"""
+        if not route.acquire():
+            return False
+        if not self.limiter.acquire(route.key, count):
+            route.release()
+            print(f"⏸️ Email provider {route.name} reached its daily cap - skipping")
+            return False
+        return True
+
+    def candidates(self) -> List[ProviderRoute]:
+        """
+        Providers to try, healthiest first
+
+        Closed circuits are ranked by recent error rate (in 10% steps, so a
+        single failure does not reorder providers), then by configured
+        priority. Providers whose trial send is due come after them.
+        """
+        closed = [r for r in self.routes if r.state == "closed"]
+        half_open = [r for r in self.routes if r.state == "half_open"]
+        closed.sort(key=lambda r: (round(r.error_rate, 1), r.priority))
+        half_open.sort(key=lambda r: r.priority)
+        return closed + half_open
+
+    def send(self, to_email: str, subject: str, html_body: str, body: str,
+             attachments: List[Path]) -> SendResult:
+        """
+        Send a message, failing over to the next provider on errors
+
+        Args:
+            to_email: Recipient
+            subject: Subject line
+            html_body: HTML body
+            body: Plain text body
+            attachments: Files to attach
+
+        Returns:
+            SendResult (ok, provider used, last error)
+        """
+        if not self.routes:
+            return SendResult(ok=False, error="No email provider configured")
+
+        result = SendResult(ok=False, error="All email providers are unavailable (circuit open)")
+        routes = self.candidates()
+        if not settings.EMAIL_FAILOVER:
+            routes = routes[:1]
+
+        for route in routes:
+            if not self._reserve(route):
+                continue
+            result.attempts += 1
+            result.provider = route.key
+            start = time.monotonic()
+            try:
+                ok = route.send(to_email, subject, html_body, body, attachments)
+                error = None if ok else f"{route.name} rejected the message"
+            except Exception as e:
+                ok, error = False, f"{route.name} error: {e}"
+            route.record(ok, time.monotonic() - start, error)
+            if not ok:
+                # Undelivered - do not let failures use up the shared daily cap
+                self.limiter.release(route.key)
+
+            if ok:
+                result.ok, result.error = True, None
+                return result
+            result.error = error
+            print(f"❌ Email via {route.name} failed for {to_email}: {error}")
+        return result
+
+    def send_batch(self, recipients: List[BatchRecipient], subject: str, html_body: str, body: str,
+                   attachments: List[Path]) -> List[SendResult]:
+        """
+        Send the same message to many recipients with the providers' batch APIs
+
+        Recipients are grouped into the healthiest batch-capable provider's
+        maximum batch size, with the attachments shared by the whole batch.
+        Recipients whose batch (or own message) failed are then sent one by
+        one with send(), which fails over to every other provider.
+
+        Args:
+            recipients: Recipients with their placeholder values
+            subject: Subject with {{key}} placeholders
+            html_body: HTML body with {{key}} placeholders
+            body: Plain text body with {{key}} placeholders
+            attachments: Files attached to every message
+
+        Returns:
+            One SendResult per recipient, in input order
+        """
+        results: List[Optional[SendResult]] = [None] * len(recipients)
+        pending = list(range(len(recipients)))
+
+        for route in self.candidates():
+            size = route.batch_size
+            if not size or not pending:
+                continue
+            failed = []
+            for start in range(0, len(pending), size):
+                chunk = pending[start:start + size]
+                if not self._reserve(route, len(chunk)):
+                    failed.extend(chunk)
+                    continue
+                started = time.monotonic()
+                try:
+                    errors = route.send_batch([recipients[i] for i in chunk], subject, html_body, body, attachments)
+                except Exception as e:
+                    errors = [f"{route.name} error: {e}"] * len(chunk)
+                # Rejected addresses are not a provider problem - only a fully failed request counts against it
+                ok = any(error is None for error in errors)
+                route.record(ok, time.monotonic() - started, None if ok else errors[0])
+                self.limiter.release(route.key, sum(1 for error in errors if error))
+
+                for index, error in zip(chunk, errors):
+                    if error is None:
+                        results[index] = SendResult(ok=True, provider=route.key, attempts=1)
+                    else:
+                        failed.append(index)
+                print(f"📦 Batch via {route.name}: {len(chunk) - sum(1 for e in errors if e)}/{len(chunk)} sent")
+            pending = failed
+            # One batch provider per send - stragglers fail over message by message
+            break
+
+        for index in pending:
+            recipient = recipients[index]
+            values = recipient.values
+            results[index] = self.send(
+                recipient.email,
+                render_placeholders(subject, values),
+                render_placeholders(html_body, values),
+                render_placeholders(body, values),
+                attachments
+            )
+        return results
+
+    def stats(self) -> List[dict]:
+        """Health and rate limit metrics of every configured provider"""
+        limits = self.limiter.stats([route.key for route in self.routes])
+        return [{**route.stats(), "rate_limit": limits[route.key]} for route in self.routes]
@@ -1,16 +1,18 @@
 """
-Email service - Auto-detects and uses configured email provider
-Supports: Mailjet API (FAST), NIC SMTP, Gmail SMTP, MailBluster
+Email service - Sends through every configured email provider with failover
+Supports: Brevo API, Mailjet API (FAST), NIC SMTP, Gmail SMTP, MailBluster
 """
-import base64
+import threading
 from pathlib import Path
 from typing import List, Optional
 
 from ..core.config import settings
+from .email_router import BatchRecipient, EmailRouter, ProviderRoute, SendResult
+from .email_templates import PassSet, pass_email_templates
 
 
 class EmailService:
-    """Unified email service - automatically uses configured provider"""
+    """Unified email service - routes each message to the healthiest configured provider"""
     
     # Email templates for different pass types
     EMAIL_TEMPLATES = {
@@ -151,488 +153,155 @@ Indian Navy | Innovation & Self-Reliance"""
     
     def __init__(self):
         """Initialize email service based on configuration"""
-        self.provider = None
+        self.router: Optional[EmailRouter] = None
         self._initialized = False
+        self._init_lock = threading.Lock()  # Bulk jobs send from several threads
 
     def _ensure_provider_initialized(self):
         """Lazy initialization - called when email service is first used"""
         if self._initialized:
             return
 
-        print("🔄 Initializing email provider...")
+        with self._init_lock:
+            if not self._initialized:
+                self._initialize_provider()
 
-        # Determine which email provider to use (Priority order)
-        # 1. Brevo API (PRIMARY - formerly Sendinblue) ⚡
-        if settings.USE_BREVO and settings.BREVO_API_KEY:
-            from .brevo_service import BrevoService
-            self.provider = BrevoService()
-            self.provider_name = "Brevo API"
-            self.uses_smtp = True  # Treats file paths like SMTP (not base64 encoding)
-            print("✅ Using Brevo API (PRIMARY - fast transactional email)")
-        # 2. Mailjet API (STANDBY - fallback if Brevo fails) ⚡
-        elif settings.MAILJET_API_KEY and settings.MAILJET_API_SECRET:
-            from .mailjet_service import MailjetService
-            self.provider = MailjetService()
-            self.provider_name = "Mailjet API"
-            self.uses_smtp = True  # Treats file paths like SMTP (not base64 encoding)
-            print("✅ Using Mailjet API (STANDBY - ~10s per email)")
-        # 3. Gmail SMTP (Final fallback - personal email)
-        elif settings.USE_GMAIL_SMTP and settings.GMAIL_ADDRESS:
-            from .gmail_smtp_service import GmailSMTPService
-            self.provider = GmailSMTPService()
-            self.provider_name = "Gmail SMTP"
-            self.uses_smtp = True
-            print(f"✅ Using Gmail SMTP: {settings.GMAIL_ADDRESS} (Final fallback)")
-        # 4. NIC SMTP (Government email - Official Navy correspondence - SLOW)
-        elif settings.USE_NIC_SMTP and settings.NIC_EMAIL_ADDRESS:
-            from .nic_smtp_service import NICSmtpService
-            self.provider = NICSmtpService()
-            self.provider_name = "NIC SMTP (Navy Email)"
-            self.uses_smtp = True
-            print(f"✅ Using NIC SMTP: {settings.NIC_EMAIL_ADDRESS} (SLOW - ~90s per email)")
-        # 4. MailBluster (API-based)
-        elif settings.MAILBLUSTER_API_KEY:
-            from .mailbluster_service import MailBlusterService
-            self.provider = MailBlusterService()
-            self.provider_name = "MailBluster"
-            self.uses_smtp = False
-            print("✅ Using MailBluster API")
-        # Fallback
-        else:
-            print("⚠️ Warning: No email service configured!")
-            self.provider_name = "None"
-            self.uses_smtp = False
+    def _initialize_provider(self):
+        """Set up every configured provider, in priority order"""
+        print("🔄 Initializing email providers...")
 
+        routes = []
+        for key, name, factory, uses_smtp in self._configured_providers():
+            try:
+                routes.append(ProviderRoute(key, name, factory(), uses_smtp, priority=len(routes)))
+                print(f"✅ Email provider available: {name}")
+            except Exception as e:
+                print(f"⚠️ Email provider {name} could not be initialized: {e}")
+
+        if not routes:
+            print("⚠️ Warning: No email service configured!")
+        self.router = EmailRouter(routes)
         self._initialized = True
-    
-    def send_pass_email(self, recipient_email: str, recipient_name: str,
-                       pass_files: List[Path], pass_type: str = None) -> bool:
-        """Send pass email with attachments using configured provider"""
 
-        # Ensure provider is initialized (lazy initialization after secrets are loaded)
+    @staticmethod
+    def _configured_providers() -> List[tuple]:
+        """(key, name, factory, takes file paths) for each configured provider, in priority order"""
+        providers = []
+        # 1. Brevo API (PRIMARY - formerly Sendinblue) ⚡
+        if settings.USE_BREVO and settings.BREVO_API_KEY:
+            def brevo():
+                from .brevo_service import BrevoService
+                return BrevoService()
+            providers.append(("brevo", "Brevo API", brevo, True))
+        # 2. Mailjet API (STANDBY - ~10s per email) ⚡
+        if settings.MAILJET_API_KEY and settings.MAILJET_API_SECRET:
+            def mailjet():
+                from .mailjet_service import MailjetService
+                return MailjetService()
+            providers.append(("mailjet", "Mailjet API", mailjet, True))
+        # 3. Gmail SMTP (personal email)
+        if settings.USE_GMAIL_SMTP and settings.GMAIL_ADDRESS:
+            def gmail():
+                from .gmail_smtp_service import GmailSMTPService
+                return GmailSMTPService()
+            providers.append(("gmail", "Gmail SMTP", gmail, True))
+        # 4. NIC SMTP (Government email - Official Navy correspondence - SLOW, ~90s per email)
+        if settings.USE_NIC_SMTP and settings.NIC_EMAIL_ADDRESS:
+            def nic():
+                from .nic_smtp_service import NICSmtpService
+                return NICSmtpService()
+            providers.append(("nic", "NIC SMTP (Navy Email)", nic, True))
+        # 5. MailBluster (API-based, base64 attachments)
+        if settings.MAILBLUSTER_API_KEY:
+            def mailbluster():
+                from .mailbluster_service import MailBlusterService
+                return MailBlusterService()
+            providers.append(("mailbluster", "MailBluster", mailbluster, False))
+        return providers
+
+    def provider_stats(self) -> List[dict]:
+        """Health and circuit breaker state of every configured provider"""
         self._ensure_provider_initialized()
+        return self.router.stats()
 
-        # Detect which passes are being sent from filenames
-        pass_types_detected = []
-        has_invitations = False
-
-        for pass_file in pass_files:
-            filename = pass_file.name.lower()
-
-            # Check for invitation images
-            if "inv-" in filename or "invitation" in filename:
-                has_invitations = True
-
-            # Check for QR code passes ONLY (exclude invitation images)
-            # Pass files are named: name_id_passtype.png (e.g., abhishek_1_exhibition_day1_visitor.png)
-            # Invitation files start with "Inv-" and should NOT be counted as passes
-
-            # Skip invitation files from pass type detection
-            if filename.startswith("Inv-") or filename.startswith("inv-"):
-                continue
-
-            if "exhibition_day1" in filename or "ep-25" in filename:
-                if "exhibition_day1" not in pass_types_detected:
-                    pass_types_detected.append("exhibition_day1")
-            elif "exhibition_day2" in filename or "ep-26" in filename:
-                if "exhibition_day2" not in pass_types_detected:
-                    pass_types_detected.append("exhibition_day2")
-            elif "interactive" in filename:
-                if "interactive_sessions" not in pass_types_detected:
-                    pass_types_detected.append("interactive_sessions")
-            elif "plenary" in filename:
-                if "plenary" not in pass_types_detected:
-                    pass_types_detected.append("plenary")
-
-        # Build comprehensive email based on ALL passes being sent
-        # Determine singular/plural for better UX
-        pass_count = len(pass_types_detected)
-        pass_word = "pass" if pass_count == 1 else "passes"
-        subject = f"Swavlamban 2025 - Your Event {pass_word.title()}"
-
-        # Build pass details section with line gaps
-        pass_details = []
-
-        if "exhibition_day1" in pass_types_detected:
-            pass_details.append("""📅 EXHIBITION DAY 1 (25 November 2025)
-- Time: 1100 - 1730 hrs
-- Venue: Exhibition Hall, Manekshaw Centre
-- Access: Exhibition viewing, Industry booths
-""")
-
-        if "exhibition_day2" in pass_types_detected:
-            pass_details.append("""📅 EXHIBITION DAY 2 (26 November 2025)
-- Time: 1000 - 1730 hrs
-- Venue: Exhibition Hall, Manekshaw Centre
-- Access: Exhibition viewing, Industry booths
-""")
-
-        if "plenary" in pass_types_detected:
-            pass_details.append("""🎤 PLENARY SESSION (25 November 2025)
-- Time: 1500 - 1700 hrs
-- Venue: Zorawar Hall, Manekshaw Centre
-- Highlights: Chief Guest Address, Book/MoU Releases
-""")
-
-        if "interactive_sessions" in pass_types_detected:
-            pass_details.append("""💡 INTERACTIVE SESSIONS (26 November 2025)
-- Session I: Future & Emerging Technologies (1030-1130 hrs)
-- Session II: Boosting iDEX Ecosystem (1200-1330 hrs)
-- Venue: Zorawar Hall, Manekshaw Centre
-""")
-
-        # Check if user has Plenary but NOT Exhibition Day 1
-        # Add special note about Exhibition Day 1 access
-        has_plenary = "plenary" in pass_types_detected
-        has_exhibition_day1 = "exhibition_day1" in pass_types_detected
-
-        # Check if user has Interactive but NOT Exhibition Day 2
-        has_interactive = "interactive_sessions" in pass_types_detected
-        has_exhibition_day2 = "exhibition_day2" in pass_types_detected
-
-        exhibition_bonus_note = ""
-        if has_plenary and not has_exhibition_day1:
-            exhibition_bonus_note += """
-📝 BONUS ACCESS - EXHIBITION DAY 1:
-Your Plenary pass also grants you access to the Exhibition Hall on 25 November 2025 (1430-1730 hrs). Feel free to explore the industry booths and innovation displays!
-
-"""
-        if has_interactive and not has_exhibition_day2:
-            exhibition_bonus_note += """
-📝 BONUS ACCESS - EXHIBITION DAY 2:
-Your Interactive Sessions pass also grants you access to the Exhibition Hall on 26 November 2025 (1000-1730 hrs). Feel free to explore the industry booths and innovation displays!
-
-"""
-
-        # Create comprehensive email body
-        # Capitalize first letter of each word in name (Title Case)
-        formatted_name = recipient_name.title()
-
-        body = f"""Dear {formatted_name},
-
-Your {pass_word} for Swavlamban 2025 {'has' if pass_count == 1 else 'have'} been generated successfully!
-
-{'='*60}
-YOUR {'PASS' if pass_count == 1 else 'PASSES'}:
-{'='*60}
-
-{chr(10).join(pass_details)}
-{exhibition_bonus_note}{'='*60}
-ATTACHMENTS:
-{'='*60}
-
-✅ Event {pass_word.title()} with QR Code (for entry gate scanning){f"{chr(10)}✅ Invitation Images" if has_invitations else ""}
-
-{'='*60}
-IMPORTANT INFORMATION:
-{'='*60}
-
-• PRINT or SHOW the QR code {pass_word} at entry gates
-• Arrive 15 minutes before session start time
-• Valid photo ID required for entry
-• Security clearance mandatory for all sessions
-
-📍 VENUE LOCATION & NAVIGATION:
-Manekshaw Centre
-Address: H4QW+2MW, Khyber Lines, Delhi Cantonment, New Delhi, Delhi 110010
-🗺️ Open in Google Maps: https://www.google.com/maps/dir/?api=1&destination=28.586103304500742,77.14529897550334
-
-📲 EVENT INFORMATION PAGE:
-For complete event details, visit our dedicated information page:
-https://swavlamban2025-info.streamlit.app/
-
-Available information:
-• Venue map & directions (with GPS navigation)
-• Complete event schedule
-• Guidelines (DOs & DON'Ts)
-• FAQs & important contacts
-
-For support or queries, contact:
-📞 011-26771528
-📧 niio-tdac@navy.gov.in
-
-Best regards,
-Team Swavlamban 2025
-Indian Navy | Innovation & Self-Reliance"""
-
-        html_body = body.replace('\n', '<br>')
-
-        print(f"📧 Sending email via {self.provider_name}...")
-        print(f"   Passes detected: {', '.join(pass_types_detected)}")
-        print(f"   Total attachments: {len(pass_files)} (QR passes only)")
-
-        # Use configured email provider
-        if self.provider:
-            try:
-                # SMTP providers (NIC SMTP, Gmail SMTP) use file paths directly
-                if self.uses_smtp:
-                    success = self.provider.send_email(
-                        to_email=recipient_email,
-                        subject=subject,
-                        html_content=html_body,
-                        text_content=body,
-                        attachments=pass_files  # Pass file paths directly
-                    )
-                else:
-                    # API-based providers (MailBluster) use base64 encoded attachments
-                    attachments = []
-                    for pass_file in pass_files:
-                        if not pass_file.exists():
-                            print(f"Warning: Pass file not found: {pass_file}")
-                            continue
-
-                        with open(pass_file, "rb") as f:
-                            file_data = base64.b64encode(f.read()).decode()
-
-                        attachments.append({
-                            "filename": pass_file.name,
-                            "content": file_data,
-                            "type": "image/png"
-                        })
-
-                    success = self.provider.send_transactional_email(
-                        to_email=recipient_email,
-                        subject=subject,
-                        html_content=html_body,
-                        text_content=body,
-                        attachments=attachments,
-                        from_name="Swavlamban 2025 Team"
-                    )
-
-                if success:
-                    print(f"✅ Email sent successfully to {recipient_email} via {self.provider_name}")
-                else:
-                    print(f"❌ Email failed via {self.provider_name}")
-                return success
-
-            except Exception as e:
-                print(f"❌ Email error ({self.provider_name}): {e}")
-                return False
+    def _send(self, recipient_email: str, subject: str, body: str, pass_files: List[Path],
+              html_body: Optional[str] = None) -> SendResult:
+        """Send a composed message through the router (fails over between providers)"""
+        # Ensure providers are initialized (lazy initialization after secrets are loaded)
+        self._ensure_provider_initialized()
+        if html_body is None:
+            html_body = body.replace('\n', '<br>')
 
-        # Fallback to Mailjet (legacy)
+        print(f"📧 Sending email to {recipient_email}: {subject} ({len(pass_files)} attachment(s))")
+        result = self.router.send(recipient_email, subject, html_body, body, pass_files)
+        if result.ok:
+            print(f"✅ Email sent successfully to {recipient_email} via {result.provider}")
         else:
-            # Prepare attachments for Mailjet
-            attachments = []
-            for pass_file in pass_files:
-                if not pass_file.exists():
-                    print(f"Warning: Pass file not found: {pass_file}")
-                    continue
-
-                with open(pass_file, "rb") as f:
-                    file_data = base64.b64encode(f.read()).decode()
-
-                attachments.append({
-                    "ContentType": "image/png",
-                    "Filename": pass_file.name,
-                    "Base64Content": file_data
-                })
-
-            # Prepare email data
-            data = {
-                'Messages': [{
-                    "From": {
-                        "Email": settings.EMAIL_SENDER,
-                        "Name": "Swavlamban 2025 Team"
-                    },
-                    "To": [{
-                        "Email": recipient_email,
-                        "Name": recipient_name
-                    }],
-                    "Subject": subject,
-                    "TextPart": body,
-                    "HTMLPart": html_body,
-                    "Attachments": attachments
-                }]
-            }
-
-            try:
-                result = self.mailjet.send.create(data=data)
-                if result.status_code == 200:
-                    print(f"✅ Email sent successfully to {recipient_email} via Mailjet")
-                    return True
-                else:
-                    print(f"❌ Email failed: {result.status_code} - {result.json()}")
-                    return False
-            except Exception as e:
-                print(f"❌ Email error (Mailjet): {e}")
-                return False
+            print(f"❌ Email to {recipient_email} failed: {result.error}")
+        return result
 
-    def send_exhibitor_bulk_email(self, recipient_email: str, recipient_name: str,
-                                   pass_files: List[Path]) -> bool:
+    def send_batch(self, recipients: List[BatchRecipient], subject: str, body: str,
+                   attachments: Optional[List[Path]] = None,
+                   html_body: Optional[str] = None) -> List[SendResult]:
         """
-        Send exhibitor passes email - specifically for bulk exhibitor upload
-        This is a dedicated function for exhibitors to avoid modifying visitor email logic
-
-        Expected attachments:
-        - Multiple QR passes (EP-25n26.png template with unique QR codes, one per attendee)
-        - 1 Exhibitor invitation card (Inv-Exhibitors.png)
+        Send the same message to many recipients (announcements, schedule updates)
+
+        Recipients are grouped into Brevo (1000) / Mailjet (50) batch requests,
+        so the attachments are uploaded once per batch instead of once per
+        recipient. Recipients the batch could not deliver - and everything when
+        no batch-capable provider is healthy - are sent one by one with failover.
+
+        Args:
+            recipients: Recipients with values for the {{key}} placeholders ({{name}} is always set)
+            subject: Subject line with {{key}} placeholders
+            body: Plain text body with {{key}} placeholders
+            attachments: Files attached to every message (shared, not per recipient)
+            html_body: HTML body (default: body with line breaks)
+
+        Returns:
+            One SendResult per recipient, in input order
         """
-        # Ensure provider is initialized
         self._ensure_provider_initialized()
+        if not recipients:
+            return []
+        if html_body is None:
+            html_body = body.replace('\n', '<br>')
+
+        print(f"📧 Sending batch email to {len(recipients)} recipients: {subject} "
+              f"({len(attachments or [])} shared attachment(s))")
+        results = self.router.send_batch(recipients, subject, html_body, body, list(attachments or []))
+        sent = sum(1 for result in results if result.ok)
+        print(f"✅ Batch email: {sent} sent, {len(results) - sent} failed")
+        return results
+
+    def deliver_passes(self, entry, pass_files: List[Path]) -> SendResult:
+        """
+        Send the generated passes for an entry using its precompiled email (see email_templates)
 
-        # Count QR passes and check for invitation
-        qr_passes = []
-        has_invitation = False
-
-        for pass_file in pass_files:
-            filename = pass_file.name.lower()
-            if filename.startswith("inv-") or "invitation" in filename:
-                has_invitation = True
-            else:
-                qr_passes.append(pass_file.name)
-
-        num_attendees = len(qr_passes)
-        pass_word = "pass" if num_attendees == 1 else "passes"
-
-        # Format name to Title Case
-        formatted_name = recipient_name.title()
-
-        # Create exhibitor-specific email
-        subject = f"Your Exhibitor {pass_word.title()} for Swavlamban 2025"
-
-        body = f"""Dear {formatted_name},
-
-{'='*60}
-YOUR EXHIBITOR PASSES:
-{'='*60}
-
-🏛️ EXHIBITOR PASS (Both Days)
-• Day 1: 25 November 2025 (Tuesday) - 1000-1730 hrs
-• Day 2: 26 November 2025 (Wednesday) - 1000-1730 hrs
-• Venue: Exhibition Hall, Manekshaw Centre
-
-STALL SETUP:
-• Venue available for stall setup on AM 24 Nov 25
-• Dimensions: 3m X 2.5m
-
-{'='*60}
-ATTACHMENTS:
-{'='*60}
-
-✅ Your Exhibitor Passes (with QR codes)
-✅ Invitation Cards
-
-{'='*60}
-IMPORTANT REMINDERS:
-{'='*60}
-
-🎫 Bring your QR pass (printed or on mobile)
-🪪 Valid Government ID required
-👔 Formal dress code
-⏰ Arrive early to avoid entry delays
-
-{'='*60}
-CONTACT SUPPORT:
-{'='*60}
-
-📞 Phone: 011-26771528
-📧 Email: niio-tdac@navy.gov.in
-🕐 Hours: 0900-1730 hrs (Mon-Fri)
-
-Best regards,
-Team Swavlamban 2025
-Indian Navy | Innovation & Self-Reliance"""
-
-        html_body = body.replace('\n', '<br>')
-
-        print(f"📧 Sending exhibitor email via {self.provider_name}...")
-        print(f"   Exhibitor: {recipient_name}")
-        print(f"   Attendees: {num_attendees}")
-        print(f"   Total attachments: {len(pass_files)}")
+        Args:
+            entry: Entry model (or any object with email, name and pass flags)
+            pass_files: All files to attach (QR passes + Invitations/Event Flows)
 
-        # Use configured email provider
-        if self.provider:
-            try:
-                # SMTP providers (NIC SMTP, Gmail SMTP) use file paths directly
-                if self.uses_smtp:
-                    success = self.provider.send_email(
-                        to_email=recipient_email,
-                        subject=subject,
-                        html_content=html_body,
-                        text_content=body,
-                        attachments=pass_files
-                    )
-                else:
-                    # API-based providers (MailBluster) use base64 encoded attachments
-                    attachments = []
-                    for pass_file in pass_files:
-                        if not pass_file.exists():
-                            print(f"Warning: Pass file not found: {pass_file}")
-                            continue
-
-                        with open(pass_file, "rb") as f:
-                            file_data = base64.b64encode(f.read()).decode()
-
-                        attachments.append({
-                            "filename": pass_file.name,
-                            "content": file_data,
-                            "type": "image/png"
-                        })
-
-                    success = self.provider.send_transactional_email(
-                        to_email=recipient_email,
-                        subject=subject,
-                        html_content=html_body,
-                        text_content=body,
-                        attachments=attachments,
-                        from_name="Swavlamban 2025 Team"
-                    )
-
-                if success:
-                    print(f"✅ Exhibitor email sent successfully to {recipient_email}")
-                else:
-                    print(f"❌ Exhibitor email failed")
-                return success
+        Returns:
+            SendResult with the provider that sent the email (or the last error)
+        """
+        subject, body, html_body = pass_email_templates.render(entry)
+        return self._send(entry.email, subject, body, pass_files, html_body=html_body)
 
-            except Exception as e:
-                print(f"❌ Exhibitor email error: {e}")
-                return False
+    def send_passes_for_entry(self, entry, pass_files: List[Path]) -> bool:
+        """Send the generated passes for an entry (see deliver_passes) - True if sent"""
+        return self.deliver_passes(entry, pass_files).ok
 
-        # Fallback to Mailjet (legacy)
-        else:
-            attachments = []
-            for pass_file in pass_files:
-                if not pass_file.exists():
-                    print(f"Warning: Pass file not found: {pass_file}")
-                    continue
-
-                with open(pass_file, "rb") as f:
-                    file_data = base64.b64encode(f.read()).decode()
-
-                attachments.append({
-                    "ContentType": "image/png",
-                    "Filename": pass_file.name,
-                    "Base64Content": file_data
-                })
-
-            data = {
-                'Messages': [{
-                    "From": {
-                        "Email": settings.EMAIL_SENDER,
-                        "Name": "Swavlamban 2025 Team"
-                    },
-                    "To": [{
-                        "Email": recipient_email,
-                        "Name": recipient_name
-                    }],
-                    "Subject": subject,
-                    "TextPart": body,
-                    "HTMLPart": html_body,
-                    "Attachments": attachments
-                }]
-            }
+    def send_pass_email(self, recipient_email: str, recipient_name: str,
+                        pass_files: List[Path], pass_set: PassSet) -> bool:
+        """Send the pass email for a pass set (e.g. PassSet.from_entry(entry)) to any address"""
+        subject, body, html_body = pass_email_templates.get(pass_set).render(recipient_name)
+        return self._send(recipient_email, subject, body, pass_files, html_body=html_body).ok
 
-            try:
-                result = self.mailjet.send.create(data=data)
-                if result.status_code == 200:
-                    print(f"✅ Exhibitor email sent to {recipient_email} via Mailjet")
-                    return True
-                else:
-                    print(f"❌ Exhibitor email failed: {result.status_code}")
-                    return False
-            except Exception as e:
-                print(f"❌ Exhibitor email error (Mailjet): {e}")
-                return False
+    def send_exhibitor_bulk_email(self, recipient_email: str, recipient_name: str,
+                                  pass_files: List[Path]) -> bool:
+        """Send the exhibitor passes email with attachments"""
+        return self.send_pass_email(recipient_email, recipient_name, pass_files, PassSet(exhibitor=True))
 
 
 # Create singleton instance
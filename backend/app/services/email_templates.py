@@ -0,0 +1,299 @@
+"""
+Pass email templates - subject, text and HTML bodies compiled once per pass set
+There are only a handful of pass combinations, so every body is built when
+the module is imported and a send only fills in the recipient name
+"""
+import html
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, Tuple
+
+# Placeholder for the recipient name in compiled bodies
+NAME = "{{name}}"
+
+RULE = "=" * 60
+
+
+@dataclass(frozen=True)
+class PassSet:
+    """
+    Passes an entry receives, taken from its allocation flags
+
+    Exhibitors get one combined pass for both exhibition days, so their
+    day flags are ignored (always False here).
+    """
+    exhibitor: bool = False
+    exhibition_day1: bool = False
+    exhibition_day2: bool = False
+    interactive_sessions: bool = False
+    plenary: bool = False
+
+    @classmethod
+    def from_entry(cls, entry) -> "PassSet":
+        """Build the pass set of an Entry (or PassEntrySnapshot)"""
+        exhibitor = bool(entry.is_exhibitor)
+        return cls(
+            exhibitor=exhibitor,
+            exhibition_day1=bool(entry.exhibition_day1) and not exhibitor,
+            exhibition_day2=bool(entry.exhibition_day2) and not exhibitor,
+            interactive_sessions=bool(entry.interactive_sessions),
+            plenary=bool(entry.plenary)
+        )
+
+    @property
+    def pass_count(self) -> int:
+        """QR passes generated for this set"""
+        return sum([self.exhibitor, self.exhibition_day1, self.exhibition_day2,
+                    self.interactive_sessions, self.plenary])
+
+    @property
+    def exhibitor_only(self) -> bool:
+        """Exhibitor without session passes (gets the exhibitor template)"""
+        return self.exhibitor and not (self.interactive_sessions or self.plenary)
+
+
+@dataclass(frozen=True)
+class CompiledEmail:
+    """Subject and bodies split around the name placeholder"""
+    subject: str
+    text_parts: Tuple[str, ...]
+    html_parts: Tuple[str, ...]
+
+    @classmethod
+    def compile(cls, subject: str, text: str) -> "CompiledEmail":
+        """Compile a plain text body (with {{name}}) and derive its HTML version"""
+        html_body = html.escape(text, quote=False).replace("\n", "<br>")
+        return cls(subject, tuple(text.split(NAME)), tuple(html_body.split(NAME)))
+
+    def render(self, recipient_name: str) -> Tuple[str, str, str]:
+        """
+        Fill in the recipient name (Title Case)
+
+        Returns:
+            (subject, plain text body, HTML body)
+        """
+        name = recipient_name.title()
+        return (
+            self.subject,
+            name.join(self.text_parts),
+            html.escape(name, quote=False).join(self.html_parts)
+        )
+
+
+class PassEmailTemplates:
+    """Compiled pass emails for every pass set"""
+
+    def __init__(self):
+        """Compile all pass set combinations"""
+        sets = [PassSet(False, *flags) for flags in product((False, True), repeat=4)]
+        sets += [PassSet(True, False, False, interactive, plenary)
+                 for interactive, plenary in product((False, True), repeat=2)]
+        self._compiled: Dict[PassSet, CompiledEmail] = {
+            pass_set: self._compile(pass_set) for pass_set in sets if pass_set.pass_count
+        }
+
+    def get(self, pass_set: PassSet) -> CompiledEmail:
+        """
+        Compiled email for a pass set
+
+        Raises:
+            ValueError: If the pass set has no passes
+        """
+        compiled = self._compiled.get(pass_set)
+        if compiled is None:
+            raise ValueError("No passes allocated - nothing to email")
+        return compiled
+
+    def render(self, entry) -> Tuple[str, str, str]:
+        """
+        Pass email for an entry
+
+        - Exhibitors with ONLY exhibition passes -> exhibitor-specific template
+        - Exhibitors with Interactive/Plenary -> comprehensive template (lists all passes)
+        - Visitors -> comprehensive template
+
+        Args:
+            entry: Entry model (or any object with name, is_exhibitor and pass flags)
+
+        Returns:
+            (subject, plain text body, HTML body)
+        """
+        return self.get(PassSet.from_entry(entry)).render(entry.name)
+
+    def _compile(self, pass_set: PassSet) -> CompiledEmail:
+        """Build the email for one pass set"""
+        if pass_set.exhibitor_only:
+            return CompiledEmail.compile(*self._exhibitor_email())
+        return CompiledEmail.compile(*self._pass_email(pass_set))
+
+    @staticmethod
+    def _pass_email(pass_set: PassSet) -> Tuple[str, str]:
+        """Comprehensive pass email (lists every pass being sent)"""
+        # Determine singular/plural for better UX
+        single = pass_set.pass_count == 1
+        pass_word = "pass" if single else "passes"
+        subject = f"Swavlamban 2025 - Your Event {pass_word.title()}"
+
+        # Build pass details section with line gaps
+        pass_details = []
+
+        if pass_set.exhibitor:
+            pass_details.append("""🏛️ EXHIBITOR PASS (Both Days)
+- Dates: 25-26 November 2025 - 1000-1730 hrs
+- Venue: Exhibition Hall, Manekshaw Centre
+- Stall setup: AM 24 Nov 25 (3m X 2.5m)
+""")
+
+        if pass_set.exhibition_day1:
+            pass_details.append("""📅 EXHIBITION DAY 1 (25 November 2025)
+- Time: 1100 - 1730 hrs
+- Venue: Exhibition Hall, Manekshaw Centre
+- Access: Exhibition viewing, Industry booths
+""")
+
+        if pass_set.exhibition_day2:
+            pass_details.append("""📅 EXHIBITION DAY 2 (26 November 2025)
+- Time: 1000 - 1730 hrs
+- Venue: Exhibition Hall, Manekshaw Centre
+- Access: Exhibition viewing, Industry booths
+""")
+
+        if pass_set.plenary:
+            pass_details.append("""🎤 PLENARY SESSION (25 November 2025)
+- Time: 1500 - 1700 hrs
+- Venue: Zorawar Hall, Manekshaw Centre
+- Highlights: Chief Guest Address, Book/MoU Releases
+""")
+
+        if pass_set.interactive_sessions:
+            pass_details.append("""💡 INTERACTIVE SESSIONS (26 November 2025)
+- Session I: Future & Emerging Technologies (1030-1130 hrs)
+- Session II: Boosting iDEX Ecosystem (1200-1330 hrs)
+- Venue: Zorawar Hall, Manekshaw Centre
+""")
+
+        # Plenary / Interactive passes also open the Exhibition Hall on their day
+        # (exhibitors already have both days)
+        exhibition_bonus_note = ""
+        if pass_set.plenary and not (pass_set.exhibition_day1 or pass_set.exhibitor):
+            exhibition_bonus_note += """
+📝 BONUS ACCESS - EXHIBITION DAY 1:
+Your Plenary pass also grants you access to the Exhibition Hall on 25 November 2025 (1430-1730 hrs). Feel free to explore the industry booths and innovation displays!
+
+"""
+        if pass_set.interactive_sessions and not (pass_set.exhibition_day2 or pass_set.exhibitor):
+            exhibition_bonus_note += """
+📝 BONUS ACCESS - EXHIBITION DAY 2:
+Your Interactive Sessions pass also grants you access to the Exhibition Hall on 26 November 2025 (1000-1730 hrs). Feel free to explore the industry booths and innovation displays!
+
+"""
+
+        # Every pass set comes with its invitation card (see PassGenerator.get_additional_attachments)
+        body = f"""Dear {NAME},
+
+Your {pass_word} for Swavlamban 2025 {'has' if single else 'have'} been generated successfully!
+
+{RULE}
+YOUR {'PASS' if single else 'PASSES'}:
+{RULE}
+
+{chr(10).join(pass_details)}
+{exhibition_bonus_note}{RULE}
+ATTACHMENTS:
+{RULE}
+
+✅ Event {pass_word.title()} with QR Code (for entry gate scanning)
+✅ Invitation Images
+
+{RULE}
+IMPORTANT INFORMATION:
+{RULE}
+
+• PRINT or SHOW the QR code {pass_word} at entry gates
+• Arrive 15 minutes before session start time
+• Valid photo ID required for entry
+• Security clearance mandatory for all sessions
+
+📍 VENUE LOCATION & NAVIGATION:
+Manekshaw Centre
+Address: H4QW+2MW, Khyber Lines, Delhi Cantonment, New Delhi, Delhi 110010
+🗺️ Open in Google Maps: https://www.google.com/maps/dir/?api=1&destination=28.586103304500742,77.14529897550334
+
+📲 EVENT INFORMATION PAGE:
+For complete event details, visit our dedicated information page:
+https://swavlamban2025-info.streamlit.app/
+
+Available information:
+• Venue map & directions (with GPS navigation)
+• Complete event schedule
+• Guidelines (DOs & DON'Ts)
+• FAQs & important contacts
+
+For support or queries, contact:
+📞 011-26771528
+📧 niio-tdac@navy.gov.in
+
+Best regards,
+Team Swavlamban 2025
+Indian Navy | Innovation & Self-Reliance"""
+
+        return subject, body
+
+    @staticmethod
+    def _exhibitor_email() -> Tuple[str, str]:
+        """
+        Exhibitor passes email - dedicated template for bulk-uploaded exhibitors
+
+        Attachments: the exhibitor QR pass (EP-25n26.png) and the exhibitor
+        invitation card (Inv-Exhibitors.png).
+        """
+        subject = "Your Exhibitor Pass for Swavlamban 2025"
+
+        body = f"""Dear {NAME},
+
+{RULE}
+YOUR EXHIBITOR PASSES:
+{RULE}
+
+🏛️ EXHIBITOR PASS (Both Days)
+• Day 1: 25 November 2025 (Tuesday) - 1000-1730 hrs
+• Day 2: 26 November 2025 (Wednesday) - 1000-1730 hrs
+• Venue: Exhibition Hall, Manekshaw Centre
+
+STALL SETUP:
+• Venue available for stall setup on AM 24 Nov 25
+• Dimensions: 3m X 2.5m
+
+{RULE}
+ATTACHMENTS:
+{RULE}
+
+✅ Your Exhibitor Passes (with QR codes)
+✅ Invitation Cards
+
+{RULE}
+IMPORTANT REMINDERS:
+{RULE}
+
+🎫 Bring your QR pass (printed or on mobile)
+🪪 Valid Government ID required
+👔 Formal dress code
+⏰ Arrive early to avoid entry delays
+
+{RULE}
+CONTACT SUPPORT:
+{RULE}
+
+📞 Phone: 011-26771528
+📧 Email: niio-tdac@navy.gov.in
+🕐 Hours: 0900-1730 hrs (Mon-Fri)
+
+Best regards,
+Team Swavlamban 2025
+Indian Navy | Innovation & Self-Reliance"""
+
+        return subject, body
+
+
+# Create singleton instance
+pass_email_templates = PassEmailTemplates()
@@ -0,0 +1,206 @@
+"""
+Entry export service - streams entries / check-ins as CSV or XLSX
+Rows are read through a server-side cursor (yield_per) and written out in
+chunks, so the full result set is never held in memory
+"""
+import csv
+import io
+import tempfile
+from typing import Iterator, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+from ..core.database import SessionLocal
+from ..models import CheckIn, Entry, User
+
+
+class ExportFormatError(Exception):
+    """Raised when an export format is not available"""
+
+
+# Rows fetched per round trip from the database cursor
+FETCH_SIZE = 1000
+
+# Rows buffered before a CSV chunk is sent to the client
+CSV_CHUNK_ROWS = 500
+
+PASS_LABELS = (
+    ("exhibition_day1", "Ex-1"),
+    ("exhibition_day2", "Ex-2"),
+    ("interactive_sessions", "Interactive"),
+    ("plenary", "Plenary")
+)
+
+
+class EntryExportService:
+    """Builds streaming CSV / XLSX exports for the admin panel"""
+
+    MEDIA_TYPES = {
+        "csv": "text/csv; charset=utf-8",
+        "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    }
+
+    @staticmethod
+    def _format_time(value) -> str:
+        """Timestamp as text for spreadsheets"""
+        return value.strftime("%Y-%m-%d %H:%M:%S") if value else ""
+
+    def entry_header(self, include_pass_status: bool, include_checkins: bool) -> List[str]:
+        """Column headers for the entries export (same base columns as the old client-side CSV)"""
+        header = ["ID", "Name", "Organization", "Username", "Email", "Phone", "ID Type",
+                  "Entry Type", "Passes", "Created"]
+        if include_pass_status:
+            header.append("Passes Generated")
+        if include_checkins:
+            header.extend(["Check-ins", "Last Check-in"])
+        return header
+
+    def entry_rows(self, filtered: Query, include_pass_status: bool,
+                   include_checkins: bool) -> Iterator[list]:
+        """
+        Stream export rows for an (already filtered) Entry query
+
+        The query is re-bound to a dedicated session, because the response body
+        is produced after the request's own session has been closed.
+        """
+        db = SessionLocal()
+        try:
+            query = filtered.with_session(db).join(
+                User, User.username == Entry.username
+            ).add_columns(User.organization)
+
+            if include_checkins:
+                checkins = db.query(
+                    CheckIn.entry_id.label("entry_id"),
+                    func.count(CheckIn.id).label("checkin_count"),
+                    func.max(CheckIn.check_in_time).label("last_checkin")
+                ).group_by(CheckIn.entry_id).subquery()
+                query = query.outerjoin(checkins, checkins.c.entry_id == Entry.id).add_columns(
+                    checkins.c.checkin_count, checkins.c.last_checkin
+                )
+
+            for row in query.order_by(Entry.id).yield_per(FETCH_SIZE):
+                entry = row[0]
+                passes = [label for flag, label in PASS_LABELS if getattr(entry, flag)]
+                values = [
+                    entry.id,
+                    entry.name,
+                    row.organization or "N/A",
+                    entry.username,
+                    entry.email,
+                    entry.phone,
+                    entry.id_type,
+                    "Exhibitor" if entry.is_exhibitor_pass else "Visitor",
+                    ", ".join(passes),
+                    self._format_time(entry.created_at)
+                ]
+                if include_pass_status:
+                    generated = [label for flag, label in PASS_LABELS
+                                 if getattr(entry, f"pass_generated_{flag}")]
+                    values.append(", ".join(generated))
+                if include_checkins:
+                    values.extend([row.checkin_count or 0, self._format_time(row.last_checkin)])
+                yield values
+        finally:
+            db.close()
+
+    def checkin_header(self) -> List[str]:
+        """Column headers for the check-ins export"""
+        return ["Check-in ID", "Time", "Session", "Session Name", "Gate", "Location",
+                "Entry ID", "Name", "Organization", "Scanner Device", "Operator", "Status"]
+
+    def checkin_rows(self, session_type: Optional[str] = None) -> Iterator[list]:
+        """Stream export rows for check-ins (oldest first)"""
+        db = SessionLocal()
+        try:
+            query = db.query(
+                CheckIn, Entry.name, User.organization
+            ).join(Entry, Entry.id == CheckIn.entry_id).join(User, User.username == Entry.username)
+            if session_type:
+                query = query.filter(CheckIn.session_type == session_type)
+
+            for checkin, name, organization in query.order_by(CheckIn.id).yield_per(FETCH_SIZE):
+                yield [
+                    checkin.id,
+                    self._format_time(checkin.check_in_time),
+                    checkin.session_type,
+                    checkin.session_name or "",
+                    checkin.gate_number or "",
+                    checkin.gate_location or "",
+                    checkin.entry_id,
+                    name,
+                    organization or "N/A",
+                    checkin.scanner_device_id or "",
+                    checkin.scanner_operator or "",
+                    checkin.verification_status or ""
+                ]
+        finally:
+            db.close()
+
+    def stream(self, export_format: str, header: List[str], rows: Iterator[list],
+               sheet_title: str = "Export") -> Iterator[bytes]:
+        """
+        Encode rows as CSV or XLSX
+
+        Raises:
+            ExportFormatError: unknown format, or XLSX without openpyxl
+        """
+        if export_format == "csv":
+            return self._stream_csv(header, rows)
+        if export_format == "xlsx":
+            return self._stream_xlsx(header, rows, sheet_title)
+        raise ExportFormatError(f"Unsupported export format: {export_format}")
+
+    @staticmethod
+    def _stream_csv(header: List[str], rows: Iterator[list]) -> Iterator[bytes]:
+        """Yield CSV in chunks of CSV_CHUNK_ROWS rows"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # BOM so Excel opens the file as UTF-8
+        buffer.write("\ufeff")
+        writer.writerow(header)
+
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if count % CSV_CHUNK_ROWS == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _stream_xlsx(header: List[str], rows: Iterator[list], sheet_title: str) -> Iterator[bytes]:
+        """
+        Build an XLSX with openpyxl's write-only mode and stream the file
+
+        XLSX is a zip archive and cannot be sent before it is complete, so rows go
+        into a temporary file (constant memory) which is then streamed in chunks.
+        """
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ExportFormatError("XLSX export is not available (openpyxl not installed), please use CSV")
+
+        def generate() -> Iterator[bytes]:
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet(title=sheet_title)
+            sheet.append(header)
+            for row in rows:
+                sheet.append(row)
+
+            with tempfile.TemporaryFile() as tmp:
+                workbook.save(tmp)
+                tmp.seek(0)
+                while True:
+                    chunk = tmp.read(64 * 1024)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        return generate()
+
+
+# Create singleton instance
+entry_export = EntryExportService()
@@ -0,0 +1,255 @@
+"""
+Entry import service - bulk registration from CSV / XLSX uploads
+Rows are validated with EntryCreate, duplicates are found with one IN query,
+quotas are reserved once for the whole batch and rows are inserted in batches
+"""
+import csv
+import io
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models import Entry, User
+from ..schemas.entry import EntryCreate
+from .quota_ledger import quota_ledger
+
+
+class ImportFileError(Exception):
+    """Raised when an upload cannot be read at all (bad format, too many rows)"""
+
+
+# Normalized header -> EntryCreate field (accepts the CSV template headers and field names)
+HEADER_ALIASES = {
+    "name": "name",
+    "email": "email",
+    "phone": "phone",
+    "id_type": "id_type",
+    "id_number": "id_number",
+    "exhibition_day_1": "exhibition_day1",
+    "exhibition_day1": "exhibition_day1",
+    "exhibition_day_2": "exhibition_day2",
+    "exhibition_day2": "exhibition_day2",
+    "interactive_sessions": "interactive_sessions",
+    "plenary": "plenary",
+    "exhibitor": "is_exhibitor_pass",
+    "is_exhibitor_pass": "is_exhibitor_pass"
+}
+
+PASS_FIELDS = ("exhibition_day1", "exhibition_day2", "interactive_sessions", "plenary")
+
+PASS_NAMES = {
+    "exhibition_day1": "Exhibition Day 1",
+    "exhibition_day2": "Exhibition Day 2",
+    "interactive_sessions": "Interactive Sessions",
+    "plenary": "Plenary"
+}
+
+TRUE_VALUES = {"yes", "y", "true", "1"}
+
+
+class EntryImportService:
+    """Parses, validates and inserts bulk entry uploads"""
+
+    @staticmethod
+    def _normalize_header(header) -> Optional[str]:
+        """Map a column header to an EntryCreate field"""
+        key = str(header or "").strip().strip('"').lower().replace(" ", "_")
+        return HEADER_ALIASES.get(key)
+
+    @staticmethod
+    def _clean(value) -> str:
+        """Cell value as trimmed text ('nan' and empty cells become '')"""
+        if value is None:
+            return ""
+        text = str(value).strip()
+        if text.endswith(".0") and text[:-2].isdigit():
+            # Numeric cells from spreadsheets (phone / Aadhaar numbers)
+            text = text[:-2]
+        return "" if text.lower() == "nan" else text
+
+    def _iter_csv(self, stream: BinaryIO) -> Iterator[List[str]]:
+        """Stream rows from a CSV upload"""
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.reader(text)
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ImportFileError(f"Could not read CSV file: {e}")
+        finally:
+            text.detach()
+
+    def _iter_xlsx(self, stream: BinaryIO) -> Iterator[List]:
+        """Stream rows from the first sheet of an XLSX upload"""
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFileError("XLSX upload is not available (openpyxl not installed), please upload CSV")
+
+        try:
+            workbook = load_workbook(stream, read_only=True, data_only=True)
+        except Exception as e:
+            raise ImportFileError(f"Could not read XLSX file: {e}")
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+
+    def parse(self, filename: str, stream: BinaryIO) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """
+        Read an upload into field dicts
+
+        Args:
+            filename: Original filename (.csv or .xlsx)
+            stream: Binary file object
+
+        Yields:
+            (spreadsheet row number, {field: value}) - header is row 1, blank rows are skipped
+        """
+        name = (filename or "").lower()
+        if name.endswith(".xlsx"):
+            rows = self._iter_xlsx(stream)
+        elif name.endswith(".csv"):
+            rows = self._iter_csv(stream)
+        else:
+            raise ImportFileError("Unsupported file type, upload a .csv or .xlsx file")
+
+        fields = None
+        for row_number, row in enumerate(rows, start=1):
+            if fields is None:
+                fields = [self._normalize_header(h) for h in row]
+                missing = {"name", "email", "phone", "id_type", "id_number"} - set(fields)
+                if missing:
+                    raise ImportFileError(f"Missing column(s): {', '.join(sorted(missing))}")
+                continue
+
+            values = {}
+            for field, cell in zip(fields, row):
+                if field:
+                    values[field] = self._clean(cell)
+            if any(values.values()):
+                yield row_number, values
+
+    @staticmethod
+    def _to_entry_data(values: Dict[str, str]) -> dict:
+        """Convert raw cell text to EntryCreate input"""
+        data = {field: values.get(field, "") for field in ("name", "email", "phone", "id_type", "id_number")}
+
+        # Same phone format as single entries from the web form
+        digits = "".join(ch for ch in data["phone"] if ch.isdigit())
+        if len(digits) == 10:
+            data["phone"] = f"+91-{digits}"
+
+        for field in (*PASS_FIELDS, "is_exhibitor_pass"):
+            data[field] = values.get(field, "").lower() in TRUE_VALUES
+        return data
+
+    def validate_row(self, values: Dict[str, str], user: User) -> Tuple[Optional[EntryCreate], Optional[str]]:
+        """Validate one row (schema, pass selection, pass permissions)"""
+        try:
+            entry = EntryCreate(**self._to_entry_data(values))
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            return None, errors
+
+        if not (entry.is_exhibitor_pass or any(getattr(entry, f) for f in PASS_FIELDS)):
+            return None, "At least one pass must be selected"
+
+        for field in PASS_FIELDS:
+            if getattr(entry, field) and not (user.allowed_passes or {}).get(field, False):
+                return None, f"You do not have permission to allocate {PASS_NAMES[field]} passes"
+
+        return entry, None
+
+    def import_entries(self, db: Session, user: User, filename: str, stream: BinaryIO) -> dict:
+        """
+        Validate and insert all rows of an upload
+
+        Invalid and duplicate rows are reported and skipped. Quotas are checked
+        once for all valid rows together - if they do not fit, nothing is inserted.
+
+        Args:
+            db: Database session
+            user: Owner of the new entries
+            filename: Original filename (.csv or .xlsx)
+            stream: Binary file object
+
+        Returns:
+            Dict matching BulkImportResponse
+
+        Raises:
+            ImportFileError: unreadable file or too many rows
+            QuotaExceededError: valid rows exceed the user's quotas
+        """
+        results = []
+        valid: List[Tuple[int, EntryCreate]] = []
+        seen_ids = set()
+
+        for row_number, values in self.parse(filename, stream):
+            if len(results) + len(valid) >= settings.BULK_IMPORT_MAX_ROWS:
+                raise ImportFileError(f"Too many rows, maximum {settings.BULK_IMPORT_MAX_ROWS} per upload")
+
+            entry, error = self.validate_row(values, user)
+            if entry is not None and entry.id_number in seen_ids:
+                entry, error = None, f"Duplicate ID number {entry.id_number} in file"
+            if entry is None:
+                results.append({"row": row_number, "status": "failed",
+                                "id_number": values.get("id_number") or None, "error": error})
+                continue
+            seen_ids.add(entry.id_number)
+            valid.append((row_number, entry))
+
+        # One IN query for ID numbers that are already registered
+        if valid:
+            existing = {
+                id_number for (id_number,) in db.query(Entry.id_number).filter(
+                    Entry.id_number.in_([entry.id_number for _, entry in valid])
+                ).all()
+            }
+            accepted = []
+            for row_number, entry in valid:
+                if entry.id_number in existing:
+                    results.append({"row": row_number, "status": "failed", "id_number": entry.id_number,
+                                    "error": f"Entry with ID number {entry.id_number} already exists"})
+                else:
+                    accepted.append((row_number, entry))
+            valid = accepted
+
+        if valid:
+            # Reserve quota for the whole batch in one ledger update
+            total = {}
+            for _, entry in valid:
+                for counter, d in quota_ledger.delta(after=entry).items():
+                    total[counter] = total.get(counter, 0) + d
+            quota_ledger.apply(db, user, total)
+
+            mappings = [
+                dict(entry.model_dump(), username=user.username)
+                for _, entry in valid
+            ]
+            batch_size = max(settings.BULK_IMPORT_BATCH_SIZE, 1)
+            for start in range(0, len(mappings), batch_size):
+                db.bulk_insert_mappings(Entry, mappings[start:start + batch_size])
+            db.commit()
+
+            for row_number, entry in valid:
+                results.append({"row": row_number, "status": "created",
+                                "id_number": entry.id_number, "error": None})
+
+        results.sort(key=lambda r: r["row"])
+        created = sum(1 for r in results if r["status"] == "created")
+        print(f"📥 Bulk import by {user.username}: {created} created, {len(results) - created} failed")
+
+        return {
+            "total_rows": len(results),
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        }
+
+
+# Create singleton instance
+entry_import = EntryImportService()
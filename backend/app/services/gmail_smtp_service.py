@@ -2,16 +2,14 @@
 Gmail SMTP Integration Service
 Free email sending using Gmail SMTP (no third-party service required)
 """
-import smtplib
 import base64
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from pathlib import Path
 from typing import List, Optional
 
 from ..core.config import settings
+from .attachment_cache import attachment_cache
+from .smtp_pool import get_smtp_pool
 
 
 class GmailSMTPService:
@@ -24,6 +22,13 @@ class GmailSMTPService:
         self.sender_email = settings.GMAIL_ADDRESS
         self.sender_password = settings.GMAIL_APP_PASSWORD
 
+        # Shared connection pool (STARTTLS on port 587) - login once per connection
+        self.pool = get_smtp_pool(
+            self.smtp_server, self.smtp_port,
+            self.sender_email, self.sender_password,
+            use_ssl=False
+        )
+
     def send_email(self, to_email: str, subject: str, html_content: str,
                    text_content: str = "", attachments: List[str] = None) -> bool:
         """
@@ -54,25 +59,12 @@ class GmailSMTPService:
             part2 = MIMEText(html_content, 'html')
             msg.attach(part2)
 
-            # Add attachments
-            if attachments:
-                for file_path in attachments:
-                    if Path(file_path).exists():
-                        with open(file_path, 'rb') as f:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(f.read())
-                            encoders.encode_base64(part)
-                            part.add_header(
-                                'Content-Disposition',
-                                f'attachment; filename={Path(file_path).name}'
-                            )
-                            msg.attach(part)
-
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()  # Secure connection
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+            # Add attachments (static images come pre-encoded from the cache)
+            for attachment in attachment_cache.get_many(attachments):
+                msg.attach(attachment.mime_part())
+
+            # Send email over a pooled connection
+            self.pool.send_message(msg)
 
             print(f"✅ Email sent successfully to {to_email}")
             return True
@@ -86,7 +78,7 @@ class GmailSMTPService:
                        attachments: List[str] = None) -> dict:
         """
         Send bulk emails to multiple recipients
-        Uses PERSISTENT CONNECTION for faster bulk sending
+        Uses the shared connection pool (no login per email)
 
         Args:
             recipients: List of email addresses
@@ -101,50 +93,37 @@ class GmailSMTPService:
         results = {"success": 0, "failed": 0}
 
         try:
-            # OPTIMIZATION: Reuse single SMTP connection for all emails
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                print(f"✅ Connected to Gmail SMTP for bulk sending ({len(recipients)} emails)")
-
-                for email in recipients:
-                    try:
-                        # Create message for this recipient
-                        msg = MIMEMultipart('alternative')
-                        msg['From'] = f"Swavlamban 2025 <{self.sender_email}>"
-                        msg['To'] = email
-                        msg['Subject'] = subject
-
-                        # Add text and HTML parts
-                        if text_content:
-                            part1 = MIMEText(text_content, 'plain')
-                            msg.attach(part1)
-
-                        part2 = MIMEText(html_content, 'html')
-                        msg.attach(part2)
-
-                        # Add attachments
-                        if attachments:
-                            for file_path in attachments:
-                                if Path(file_path).exists():
-                                    with open(file_path, 'rb') as f:
-                                        part = MIMEBase('application', 'octet-stream')
-                                        part.set_payload(f.read())
-                                        encoders.encode_base64(part)
-                                        part.add_header(
-                                            'Content-Disposition',
-                                            f'attachment; filename={Path(file_path).name}'
-                                        )
-                                        msg.attach(part)
-
-                        # Send using persistent connection
-                        server.send_message(msg)
-                        results["success"] += 1
-                        print(f"✅ Sent to {email}")
-
-                    except Exception as e:
-                        results["failed"] += 1
-                        print(f"❌ Failed to send to {email}: {e}")
+            encoded_attachments = attachment_cache.get_many(attachments)
+            print(f"📤 Gmail SMTP bulk sending ({len(recipients)} emails)")
+
+            for email in recipients:
+                try:
+                    # Create message for this recipient
+                    msg = MIMEMultipart('alternative')
+                    msg['From'] = f"Swavlamban 2025 <{self.sender_email}>"
+                    msg['To'] = email
+                    msg['Subject'] = subject
+
+                    # Add text and HTML parts
+                    if text_content:
+                        part1 = MIMEText(text_content, 'plain')
+                        msg.attach(part1)
+
+                    part2 = MIMEText(html_content, 'html')
+                    msg.attach(part2)
+
+                    # Add attachments (encoded once for all recipients)
+                    for attachment in encoded_attachments:
+                        msg.attach(attachment.mime_part())
+
+                    # Send over a pooled connection
+                    self.pool.send_message(msg)
+                    results["success"] += 1
+                    print(f"✅ Sent to {email}")
+
+                except Exception as e:
+                    results["failed"] += 1
+                    print(f"❌ Failed to send to {email}: {e}")
 
         except Exception as e:
             print(f"❌ Bulk email connection failed: {e}")
@@ -0,0 +1,77 @@
+"""
+HTTP connection pools for the email provider APIs
+One keep-alive requests.Session per provider and process, shared by every
+send path, so a send does not pay a new TCP + TLS handshake
+"""
+import threading
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..core.config import settings
+
+
+def email_http_retry() -> Retry:
+    """
+    Retry policy for provider API calls
+
+    Connection failures are retried for every request (nothing reached the
+    provider). Read errors and 502/503/504 responses are only retried for
+    idempotent methods - a POST that may have been accepted is never
+    repeated, so an email is not sent twice.
+    """
+    retries = max(settings.EMAIL_HTTP_RETRIES, 0)
+    return Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=settings.EMAIL_HTTP_RETRY_BACKOFF_SECONDS,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False
+    )
+
+
+class HTTPSessionPool:
+    """Long-lived pooled sessions, one per provider"""
+
+    def __init__(self):
+        """Sessions are created on first use (after secrets are loaded)"""
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout in seconds for provider API calls"""
+        return settings.EMAIL_HTTP_CONNECT_TIMEOUT, settings.EMAIL_HTTP_READ_TIMEOUT
+
+    def session(self, provider: str) -> requests.Session:
+        """
+        Get the shared session for a provider
+
+        Args:
+            provider: Provider key ('mailjet', 'mailbluster', ...)
+
+        Returns:
+            requests.Session with a keep-alive pool of EMAIL_HTTP_POOL_SIZE connections
+        """
+        with self._lock:
+            session = self._sessions.get(provider)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=max(settings.EMAIL_HTTP_POOL_SIZE, 1),
+                    max_retries=email_http_retry()
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[provider] = session
+            return session
+
+
+# Create singleton instance
+http_sessions = HTTPSessionPool()
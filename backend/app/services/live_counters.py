@@ -0,0 +1,340 @@
+"""
+Live check-in counters - occupancy and throughput per session, gate and minute
+Counters are incremented on every recorded check-in and seeded once from the
+database, so dashboards never run GROUP BY queries against check_ins
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models import CheckIn
+
+# Gate label for check-ins without a gate number
+NO_GATE = "unassigned"
+
+# (session_type, gate_number) -> count
+Counts = Dict[Tuple[str, str], int]
+
+
+def _minute(value: datetime) -> int:
+    """Naive UTC datetime -> minutes since the Unix epoch"""
+    return int((value - datetime(1970, 1, 1)).total_seconds()) // 60
+
+
+class MemoryCounterStore:
+    """Process-local counters (one API worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Counts = {}
+        self._minutes: Dict[int, Counts] = {}
+        self._version = 0
+        # Increments made while a reseed reads the database: (key, minute, count, check-in time)
+        self._journal: Optional[List[Tuple[Tuple[str, str], int, int, datetime]]] = None
+
+    def _add(self, key: Tuple[str, str], minute: int, count: int) -> None:
+        """Add to the total and minute bucket (lock held)"""
+        self._totals[key] = self._totals.get(key, 0) + count
+        bucket = self._minutes.setdefault(minute, {})
+        bucket[key] = bucket.get(key, 0) + count
+
+    def increment(self, session_type: str, gate: str, minute: int, count: int = 1,
+                  checked_in_at: Optional[datetime] = None) -> None:
+        """Add check-ins to the total and minute bucket"""
+        key = (session_type, gate)
+        with self._lock:
+            self._add(key, minute, count)
+            if self._journal is not None and checked_in_at is not None:
+                self._journal.append((key, minute, count, checked_in_at))
+            self._version += 1
+
+    def begin_replace(self) -> None:
+        """Start recording increments - call before reading the database for replace()"""
+        with self._lock:
+            self._journal = []
+
+    def replace(self, totals: Counts, minutes: Dict[int, Counts],
+                read_at: Optional[datetime] = None) -> None:
+        """
+        Replace all counters (seeding from the database)
+
+        Increments recorded since begin_replace() for check-ins timed after
+        read_at are re-applied - their rows were inserted after the queries
+        ran, so the database result cannot contain them. Earlier ones are
+        either in the result or picked up by the next reseed.
+        """
+        totals = dict(totals)
+        minutes = {minute: dict(bucket) for minute, bucket in minutes.items()}
+        with self._lock:
+            self._totals, self._minutes = totals, minutes
+            for key, minute, count, checked_in_at in self._journal or []:
+                if read_at is not None and checked_in_at > read_at:
+                    self._add(key, minute, count)
+            self._journal = None
+            self._version += 1
+
+    def read(self, since_minute: int) -> Tuple[Counts, Dict[int, Counts], int]:
+        """Totals, minute buckets from since_minute on, and the change version"""
+        with self._lock:
+            for minute in [m for m in self._minutes if m < since_minute - 1]:
+                del self._minutes[minute]
+            minutes = {m: dict(b) for m, b in self._minutes.items() if m >= since_minute}
+            return dict(self._totals), minutes, self._version
+
+    def needs_seed(self) -> bool:
+        """Memory counters are seeded by every worker"""
+        return True
+
+
+class RedisCounterStore:
+    """
+    Counters shared by all API workers in Redis
+
+    Totals live in one hash, each minute in its own hash that expires after
+    the dashboard window; a version key changes on every increment.
+    """
+
+    PREFIX = "swavlamban:live:"
+
+    def __init__(self, url: str, window_minutes: int):
+        import redis  # Optional - only needed when LIVE_COUNTERS_BACKEND=redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=2)
+        self.client.ping()
+        self.ttl = (window_minutes + 5) * 60
+
+    @staticmethod
+    def _field(session_type: str, gate: str) -> str:
+        return f"{session_type}|{gate}"
+
+    @staticmethod
+    def _parse(data: dict) -> Counts:
+        counts = {}
+        for field, value in data.items():
+            session_type, _, gate = field.decode().partition("|")
+            counts[(session_type, gate)] = int(value)
+        return counts
+
+    def increment(self, session_type: str, gate: str, minute: int, count: int = 1,
+                  checked_in_at: Optional[datetime] = None) -> None:
+        """Add check-ins to the total and minute bucket (one round trip)"""
+        field = self._field(session_type, gate)
+        minute_key = f"{self.PREFIX}minute:{minute}"
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(f"{self.PREFIX}totals", field, count)
+        pipe.hincrby(minute_key, field, count)
+        pipe.expire(minute_key, self.ttl)
+        pipe.incr(f"{self.PREFIX}version")
+        pipe.execute()
+
+    def begin_replace(self) -> None:
+        """Nothing to record - Redis is only seeded once, before workers count"""
+
+    def replace(self, totals: Counts, minutes: Dict[int, Counts],
+                read_at: Optional[datetime] = None) -> None:
+        """Replace all counters (seeding from the database)"""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(f"{self.PREFIX}totals")
+        if totals:
+            pipe.hset(f"{self.PREFIX}totals", mapping={self._field(*k): v for k, v in totals.items()})
+        for minute, bucket in minutes.items():
+            minute_key = f"{self.PREFIX}minute:{minute}"
+            pipe.delete(minute_key)
+            pipe.hset(minute_key, mapping={self._field(*k): v for k, v in bucket.items()})
+            pipe.expire(minute_key, self.ttl)
+        pipe.incr(f"{self.PREFIX}version")
+        pipe.execute()
+
+    def read(self, since_minute: int) -> Tuple[Counts, Dict[int, Counts], int]:
+        """Totals, minute buckets from since_minute on, and the change version"""
+        now_minute = _minute(datetime.utcnow())
+        minute_range = list(range(since_minute, now_minute + 1))
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(f"{self.PREFIX}totals")
+        pipe.get(f"{self.PREFIX}version")
+        for minute in minute_range:
+            pipe.hgetall(f"{self.PREFIX}minute:{minute}")
+        totals, version, *buckets = pipe.execute()
+        minutes = {m: self._parse(b) for m, b in zip(minute_range, buckets) if b}
+        return self._parse(totals), minutes, int(version or 0)
+
+    def needs_seed(self) -> bool:
+        """Seed only once for all workers (until the counters are reset)"""
+        return bool(self.client.set(f"{self.PREFIX}seeded", 1, nx=True))
+
+
+class LiveCounterService:
+    """Check-in counters for the control-room dashboard"""
+
+    def __init__(self):
+        """Initialize (the store is created on first use)"""
+        self._store = None
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        self._seeded_at = 0.0
+        self._resyncing = False
+
+    @property
+    def store(self):
+        """Counter store selected by LIVE_COUNTERS_BACKEND (falls back to memory)"""
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = self._create_store()
+        return self._store
+
+    @staticmethod
+    def _create_store():
+        """Create the configured store"""
+        if settings.LIVE_COUNTERS_BACKEND == "redis":
+            try:
+                store = RedisCounterStore(settings.redis_url, settings.LIVE_COUNTERS_WINDOW_MINUTES)
+                print(f"📊 Live counters: Redis ({settings.REDIS_HOST}:{settings.REDIS_PORT})")
+                return store
+            except Exception as e:
+                print(f"⚠️ Live counters: Redis unavailable ({e}), using in-memory counters")
+        return MemoryCounterStore()
+
+    def seed(self, force: bool = False) -> None:
+        """
+        Load counters from check_ins (one GROUP BY plus the rows in the window)
+
+        Args:
+            force: Reseed even if the shared (Redis) counters are already seeded
+        """
+        store = self.store
+        if not (force or store.needs_seed()):
+            return
+
+        # Check-ins counted while the queries run are added on top of the result
+        # if they are timed after the queries finished (see MemoryCounterStore.replace)
+        store.begin_replace()
+        since = datetime.utcnow() - timedelta(minutes=settings.LIVE_COUNTERS_WINDOW_MINUTES)
+        db = SessionLocal()
+        try:
+            grouped = db.query(
+                CheckIn.session_type, CheckIn.gate_number, func.count(CheckIn.id)
+            ).group_by(CheckIn.session_type, CheckIn.gate_number).all()
+            recent = db.query(
+                CheckIn.session_type, CheckIn.gate_number, CheckIn.check_in_time
+            ).filter(CheckIn.check_in_time >= since).all()
+        finally:
+            db.close()
+        read_at = datetime.utcnow()
+
+        totals: Counts = {}
+        for session_type, gate, count in grouped:
+            key = (session_type, gate or NO_GATE)
+            totals[key] = totals.get(key, 0) + count
+        minutes: Dict[int, Counts] = {}
+        for session_type, gate, check_in_time in recent:
+            if check_in_time.tzinfo is not None:
+                check_in_time = check_in_time.astimezone(timezone.utc).replace(tzinfo=None)
+            bucket = minutes.setdefault(_minute(check_in_time), {})
+            key = (session_type, gate or NO_GATE)
+            bucket[key] = bucket.get(key, 0) + 1
+
+        store.replace(totals, minutes, read_at)
+        self._seeded_at = time.time()
+
+    def record(self, session_type: str, gate_number: Optional[str],
+               checked_in_at: Optional[datetime] = None, count: int = 1) -> None:
+        """
+        Count a recorded check-in (never raises - counters must not break scanning)
+
+        Args:
+            session_type: Session checked in to
+            gate_number: Gate (None = unassigned)
+            checked_in_at: Naive UTC check-in time (default: now)
+            count: Number of check-ins
+        """
+        try:
+            self._ensure_seeded()
+            checked_in_at = checked_in_at or datetime.utcnow()
+            self.store.increment(session_type, gate_number or NO_GATE,
+                                 _minute(checked_in_at), count, checked_in_at)
+        except Exception as e:
+            print(f"⚠️ Live counter update failed: {e}")
+
+    def _ensure_seeded(self) -> None:
+        """
+        Seed on first use; in-memory counters are re-seeded periodically to pick up other workers
+
+        The periodic resync runs in a background thread, so /checkin/scan
+        never waits for the GROUP BY.
+        """
+        if not self._seeded_at:
+            with self._seed_lock:
+                if not self._seeded_at:
+                    self.seed()
+                    self._seeded_at = self._seeded_at or time.time()
+        elif (isinstance(self.store, MemoryCounterStore) and settings.LIVE_COUNTERS_RESYNC_SECONDS
+              and time.time() - self._seeded_at > settings.LIVE_COUNTERS_RESYNC_SECONDS):
+            with self._seed_lock:
+                if self._resyncing:
+                    return
+                self._resyncing = True
+                self._seeded_at = time.time()
+            threading.Thread(target=self._resync, name="live-counters-resync", daemon=True).start()
+
+    def _resync(self) -> None:
+        """Re-read the in-memory counters from check_ins (background thread)"""
+        try:
+            self.seed(force=True)
+        except Exception as e:
+            print(f"⚠️ Live counter resync failed: {e}")
+        finally:
+            with self._seed_lock:
+                self._resyncing = False
+
+    def snapshot(self, window_minutes: Optional[int] = None) -> dict:
+        """
+        Current counters for the dashboard
+
+        Args:
+            window_minutes: Minutes of per-minute history (default / maximum LIVE_COUNTERS_WINDOW_MINUTES)
+
+        Returns:
+            Dict matching LiveCountersResponse
+        """
+        self._ensure_seeded()
+        window = min(window_minutes or settings.LIVE_COUNTERS_WINDOW_MINUTES, settings.LIVE_COUNTERS_WINDOW_MINUTES)
+        now = datetime.utcnow()
+        now_minute = _minute(now)
+        totals, minutes, version = self.store.read(now_minute - window + 1)
+
+        by_session: Dict[str, int] = {}
+        for (session_type, _), count in totals.items():
+            by_session[session_type] = by_session.get(session_type, 0) + count
+
+        last_5: Counts = {}
+        for minute, bucket in minutes.items():
+            if minute > now_minute - 5:
+                for key, count in bucket.items():
+                    last_5[key] = last_5.get(key, 0) + count
+
+        epoch = datetime(1970, 1, 1)
+        return {
+            "generated_at": now,
+            "version": version,
+            "total": sum(by_session.values()),
+            "by_session": by_session,
+            "by_gate": [
+                {"session_type": s, "gate_number": g, "total": count, "last_5_minutes": last_5.get((s, g), 0)}
+                for (s, g), count in sorted(totals.items())
+            ],
+            "per_minute": [
+                {"minute": epoch + timedelta(minutes=minute), "session_type": s, "gate_number": g, "count": count}
+                for minute, bucket in sorted(minutes.items())
+                for (s, g), count in sorted(bucket.items())
+            ]
+        }
+
+
+# Create singleton instance
+live_counters = LiveCounterService()
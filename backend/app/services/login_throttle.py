@@ -0,0 +1,102 @@
+"""
+Login throttle - limits failed login attempts per client
+Checked before any bcrypt work, so a flood of bad passwords is rejected
+without spending CPU on it
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque
+
+from ..core.config import settings
+
+# Keys held at most - beyond this the least recently failed keys are dropped
+MAX_TRACKED_KEYS = 50000
+
+
+class LoginThrottle:
+    """
+    Sliding-window failure counters
+
+    - Per client IP + username: LOGIN_MAX_FAILURES_PER_USER failures
+    - Per client IP (any username): LOGIN_MAX_FAILURES_PER_IP failures
+    - Per username (any IP): LOGIN_MAX_FAILURES_PER_ACCOUNT failures
+    within LOGIN_FAILURE_WINDOW_SECONDS; a successful login clears the
+    IP + username counter.
+
+    Keys are kept in least-recently-failed order, so a flood of new keys
+    evicts stale counters instead of disabling tracking - an attacker
+    that keeps failing stays at the recent end.
+    """
+
+    def __init__(self):
+        """Initialize empty counters"""
+        self._failures: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.blocked = 0
+
+    @staticmethod
+    def _keys(username: str, client_ip: str):
+        """(IP + username, IP, username) counter keys"""
+        username = username.strip().lower()
+        return f"user:{client_ip}:{username}", f"ip:{client_ip}", f"account:{username}"
+
+    def _prune(self, key: str, now: float) -> Deque[float]:
+        """Drop failures older than the window"""
+        failures = self._failures.get(key)
+        if failures is None:
+            return deque()
+        cutoff = now - settings.LOGIN_FAILURE_WINDOW_SECONDS
+        while failures and failures[0] <= cutoff:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+        return failures
+
+    def retry_after(self, username: str, client_ip: str) -> int:
+        """
+        Check whether a login attempt may proceed
+
+        Returns:
+            0 if allowed, otherwise seconds until the next attempt is allowed
+        """
+        now = time.monotonic()
+        user_key, ip_key, account_key = self._keys(username, client_ip)
+        with self._lock:
+            wait = 0.0
+            for key, limit in ((user_key, settings.LOGIN_MAX_FAILURES_PER_USER),
+                               (ip_key, settings.LOGIN_MAX_FAILURES_PER_IP),
+                               (account_key, settings.LOGIN_MAX_FAILURES_PER_ACCOUNT)):
+                failures = self._prune(key, now)
+                if len(failures) >= limit:
+                    # Allowed again once the oldest failure that counts leaves the window
+                    oldest = failures[len(failures) - limit]
+                    wait = max(wait, oldest + settings.LOGIN_FAILURE_WINDOW_SECONDS - now)
+            if wait > 0:
+                self.blocked += 1
+            return int(wait) + 1 if wait > 0 else 0
+
+    def record_failure(self, username: str, client_ip: str) -> None:
+        """Count a failed attempt (unknown user, wrong password)"""
+        now = time.monotonic()
+        with self._lock:
+            for key in self._keys(username, client_ip):
+                self._failures.setdefault(key, deque()).append(now)
+                self._failures.move_to_end(key)
+            while len(self._failures) > MAX_TRACKED_KEYS:
+                self._failures.popitem(last=False)
+
+    def record_success(self, username: str, client_ip: str) -> None:
+        """Clear the IP + username counter after a successful login"""
+        user_key = self._keys(username, client_ip)[0]
+        with self._lock:
+            self._failures.pop(user_key, None)
+
+    def stats(self) -> dict:
+        """Get throttle counters"""
+        with self._lock:
+            return {"tracked_keys": len(self._failures), "blocked_attempts": self.blocked}
+
+
+# Create singleton instance
+login_throttle = LoginThrottle()
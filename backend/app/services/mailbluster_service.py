@@ -2,13 +2,14 @@
 MailBluster API Integration Service
 Handles email sending via MailBluster API
 """
-import requests
-import base64
-from pathlib import Path
+import html
 from typing import List, Optional, Dict
 from datetime import datetime
 
 from ..core.config import settings
+from .attachment_cache import attachment_cache
+from .email_router import render_placeholders
+from .http_pool import http_sessions
 
 
 class MailBlusterService:
@@ -16,10 +17,173 @@ class MailBlusterService:
 
     API_BASE_URL = "https://api.mailbluster.com/api"
 
+    # Pass email HTML per pass type - {{name}} is filled in at send time
+    PASS_EMAIL_TEMPLATES = {
+        "exhibition_day1": {
+            "subject": "Swavlamban 2025 - Exhibition Pass (Day 1 - 25 November)",
+            "body": """<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h2 style="color: #1D4E89;">Swavlamban 2025 - Exhibition Pass</h2>
+
+        <p>Dear {{name}},</p>
+
+        <p>Your exhibition pass for <strong>Swavlamban 2025 - Day 1</strong> has been generated.</p>
+
+        <div style="background: #f5f7fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <h3 style="color: #1D4E89; margin-top: 0;">EVENT DETAILS:</h3>
+            <ul style="list-style: none; padding-left: 0;">
+                <li>📅 <strong>Date:</strong> 25 November 2025 (Monday)</li>
+                <li>🕐 <strong>Time:</strong> 1100 - 1730 hrs</li>
+                <li>📍 <strong>Venue:</strong> Exhibition Hall</li>
+            </ul>
+        </div>
+
+        <div style="background: #e8f4f8; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <h3 style="color: #1D4E89; margin-top: 0;">ACCESS:</h3>
+            <ul>
+                <li>Exhibition viewing</li>
+                <li>Industry booths and stalls</li>
+                <li>Innovation displays</li>
+            </ul>
+        </div>
+
+        <p><strong>Please find your pass attached.</strong> Print or show this pass on your mobile device at the entry gate.</p>
+
+        <p style="margin-top: 30px;">For support: <a href="mailto:niio-tdac@navy.gov.in">niio-tdac@navy.gov.in</a></p>
+
+        <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd;">
+            <p style="color: #666; font-size: 14px;">
+                Best regards,<br>
+                <strong>Team Swavlamban 2025</strong><br>
+                Indian Navy | Innovation & Self-Reliance
+            </p>
+        </div>
+    </div>
+</body>
+</html>"""
+        },
+        "exhibition_day2": {
+            "subject": "Swavlamban 2025 - Exhibition Pass (Day 2 - 26 November)",
+            "body": """<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h2 style="color: #1D4E89;">Swavlamban 2025 - Exhibition Pass</h2>
+
+        <p>Dear {{name}},</p>
+
+        <p>Your exhibition pass for <strong>Swavlamban 2025 - Day 2</strong> has been generated.</p>
+
+        <div style="background: #f5f7fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <h3 style="color: #1D4E89; margin-top: 0;">EVENT DETAILS:</h3>
+            <ul style="list-style: none; padding-left: 0;">
+                <li>📅 <strong>Date:</strong> 26 November 2025 (Tuesday)</li>
+                <li>🕐 <strong>Time:</strong> 1000 - 1730 hrs</li>
+                <li>📍 <strong>Venue:</strong> Exhibition Hall</li>
+            </ul>
+        </div>
+
+        <p><strong>Please find your pass attached.</strong> Print or show this pass on your mobile device at the entry gate.</p>
+
+        <p style="margin-top: 30px;">For support: <a href="mailto:niio-tdac@navy.gov.in">niio-tdac@navy.gov.in</a></p>
+
+        <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd;">
+            <p style="color: #666; font-size: 14px;">
+                Best regards,<br>
+                <strong>Team Swavlamban 2025</strong><br>
+                Indian Navy | Innovation & Self-Reliance
+            </p>
+        </div>
+    </div>
+</body>
+</html>"""
+        },
+        "interactive_sessions": {
+            "subject": "Swavlamban 2025 - Panel Discussion Pass (26 November)",
+            "body": """<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h2 style="color: #1D4E89;">Swavlamban 2025 - Panel Discussion Pass</h2>
+
+        <p>Dear {{name}},</p>
+
+        <p>Your pass for <strong>Panel Discussions</strong> has been generated.</p>
+
+        <div style="background: #f5f7fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <h3 style="color: #1D4E89; margin-top: 0;">SESSION DETAILS:</h3>
+            <ul style="list-style: none; padding-left: 0;">
+                <li>📅 <strong>Date:</strong> 26 November 2025 (Tuesday)</li>
+                <li>📍 <strong>Venue:</strong> Zorawar Hall</li>
+            </ul>
+        </div>
+
+        <p><strong>Please arrive 15 minutes before your session starts.</strong></p>
+
+        <p style="margin-top: 30px;">For support: <a href="mailto:niio-tdac@navy.gov.in">niio-tdac@navy.gov.in</a></p>
+
+        <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd;">
+            <p style="color: #666; font-size: 14px;">
+                Best regards,<br>
+                <strong>Team Swavlamban 2025</strong><br>
+                Indian Navy | Innovation & Self-Reliance
+            </p>
+        </div>
+    </div>
+</body>
+</html>"""
+        },
+        "plenary": {
+            "subject": "Swavlamban 2025 - Plenary Session Pass (26 November)",
+            "body": """<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h2 style="color: #1D4E89;">Swavlamban 2025 - Plenary Session Pass</h2>
+
+        <p>Dear {{name}},</p>
+
+        <p>Your pass for the <strong>Plenary Session</strong> has been generated.</p>
+
+        <div style="background: #f5f7fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <h3 style="color: #1D4E89; margin-top: 0;">SESSION DETAILS:</h3>
+            <ul style="list-style: none; padding-left: 0;">
+                <li>📅 <strong>Date:</strong> 26 November 2025 (Tuesday)</li>
+                <li>🕐 <strong>Time:</strong> 1530 - 1615 hrs (Gates open at 1500)</li>
+                <li>📍 <strong>Venue:</strong> Zorawar Hall</li>
+            </ul>
+        </div>
+
+        <div style="background: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <h3 style="color: #856404; margin-top: 0;">HIGHLIGHTS:</h3>
+            <ul>
+                <li>Address by Chief Guest</li>
+                <li>CNS Welcome Address</li>
+                <li>Release of Books/Documents/MoUs</li>
+            </ul>
+        </div>
+
+        <p><strong>⚠️ Please be seated by 1620 hrs. Formal dress code mandatory.</strong></p>
+
+        <p style="margin-top: 30px;">For support: <a href="mailto:niio-tdac@navy.gov.in">niio-tdac@navy.gov.in</a></p>
+
+        <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd;">
+            <p style="color: #666; font-size: 14px;">
+                Best regards,<br>
+                <strong>Team Swavlamban 2025</strong><br>
+                Indian Navy | Innovation & Self-Reliance
+            </p>
+        </div>
+    </div>
+</body>
+</html>"""
+        }
+    }
+
     def __init__(self):
         """Initialize MailBluster service"""
         self.api_key = settings.MAILBLUSTER_API_KEY
         self.brand_id = settings.MAILBLUSTER_BRAND_ID if hasattr(settings, 'MAILBLUSTER_BRAND_ID') else None
+        # Shared keep-alive connection pool (one per process)
+        self.session = http_sessions.session("mailbluster")
 
     def _get_headers(self) -> Dict[str, str]:
         """Get API headers with authorization"""
@@ -59,7 +223,8 @@ class MailBlusterService:
             if tags:
                 payload["tags"] = tags
 
-            response = requests.post(url, json=payload, headers=self._get_headers())
+            response = self.session.post(url, json=payload, headers=self._get_headers(),
+                                         timeout=http_sessions.timeout)
 
             if response.status_code in [200, 201]:
                 return True
@@ -110,7 +275,8 @@ class MailBlusterService:
             if attachments:
                 payload["attachments"] = attachments
 
-            response = requests.post(url, json=payload, headers=self._get_headers())
+            response = self.session.post(url, json=payload, headers=self._get_headers(),
+                                         timeout=http_sessions.timeout)
 
             if response.status_code in [200, 201]:
                 return True
@@ -173,186 +339,24 @@ class MailBlusterService:
             bool: True if successful, False otherwise
         """
         try:
-            # Get email template based on pass type
-            templates = {
-                "exhibition_day1": {
-                    "subject": "Swavlamban 2025 - Exhibition Pass (Day 1 - 25 November)",
-                    "body": f"""<html>
-<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-        <h2 style="color: #1D4E89;">Swavlamban 2025 - Exhibition Pass</h2>
-
-        <p>Dear {name},</p>
-
-        <p>Your exhibition pass for <strong>Swavlamban 2025 - Day 1</strong> has been generated.</p>
-
-        <div style="background: #f5f7fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h3 style="color: #1D4E89; margin-top: 0;">EVENT DETAILS:</h3>
-            <ul style="list-style: none; padding-left: 0;">
-                <li>📅 <strong>Date:</strong> 25 November 2025 (Monday)</li>
-                <li>🕐 <strong>Time:</strong> 1100 - 1730 hrs</li>
-                <li>📍 <strong>Venue:</strong> Exhibition Hall</li>
-            </ul>
-        </div>
-
-        <div style="background: #e8f4f8; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h3 style="color: #1D4E89; margin-top: 0;">ACCESS:</h3>
-            <ul>
-                <li>Exhibition viewing</li>
-                <li>Industry booths and stalls</li>
-                <li>Innovation displays</li>
-            </ul>
-        </div>
-
-        <p><strong>Please find your pass attached.</strong> Print or show this pass on your mobile device at the entry gate.</p>
-
-        <p style="margin-top: 30px;">For support: <a href="mailto:niio-tdac@navy.gov.in">niio-tdac@navy.gov.in</a></p>
-
-        <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd;">
-            <p style="color: #666; font-size: 14px;">
-                Best regards,<br>
-                <strong>Team Swavlamban 2025</strong><br>
-                Indian Navy | Innovation & Self-Reliance
-            </p>
-        </div>
-    </div>
-</body>
-</html>"""
-                },
-                "exhibition_day2": {
-                    "subject": "Swavlamban 2025 - Exhibition Pass (Day 2 - 26 November)",
-                    "body": f"""<html>
-<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-        <h2 style="color: #1D4E89;">Swavlamban 2025 - Exhibition Pass</h2>
-
-        <p>Dear {name},</p>
-
-        <p>Your exhibition pass for <strong>Swavlamban 2025 - Day 2</strong> has been generated.</p>
-
-        <div style="background: #f5f7fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h3 style="color: #1D4E89; margin-top: 0;">EVENT DETAILS:</h3>
-            <ul style="list-style: none; padding-left: 0;">
-                <li>📅 <strong>Date:</strong> 26 November 2025 (Tuesday)</li>
-                <li>🕐 <strong>Time:</strong> 1000 - 1730 hrs</li>
-                <li>📍 <strong>Venue:</strong> Exhibition Hall</li>
-            </ul>
-        </div>
-
-        <p><strong>Please find your pass attached.</strong> Print or show this pass on your mobile device at the entry gate.</p>
-
-        <p style="margin-top: 30px;">For support: <a href="mailto:niio-tdac@navy.gov.in">niio-tdac@navy.gov.in</a></p>
-
-        <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd;">
-            <p style="color: #666; font-size: 14px;">
-                Best regards,<br>
-                <strong>Team Swavlamban 2025</strong><br>
-                Indian Navy | Innovation & Self-Reliance
-            </p>
-        </div>
-    </div>
-</body>
-</html>"""
-                },
-                "interactive_sessions": {
-                    "subject": "Swavlamban 2025 - Panel Discussion Pass (26 November)",
-                    "body": f"""<html>
-<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-        <h2 style="color: #1D4E89;">Swavlamban 2025 - Panel Discussion Pass</h2>
-
-        <p>Dear {name},</p>
-
-        <p>Your pass for <strong>Panel Discussions</strong> has been generated.</p>
-
-        <div style="background: #f5f7fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h3 style="color: #1D4E89; margin-top: 0;">SESSION DETAILS:</h3>
-            <ul style="list-style: none; padding-left: 0;">
-                <li>📅 <strong>Date:</strong> 26 November 2025 (Tuesday)</li>
-                <li>📍 <strong>Venue:</strong> Zorawar Hall</li>
-            </ul>
-        </div>
-
-        <p><strong>Please arrive 15 minutes before your session starts.</strong></p>
-
-        <p style="margin-top: 30px;">For support: <a href="mailto:niio-tdac@navy.gov.in">niio-tdac@navy.gov.in</a></p>
-
-        <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd;">
-            <p style="color: #666; font-size: 14px;">
-                Best regards,<br>
-                <strong>Team Swavlamban 2025</strong><br>
-                Indian Navy | Innovation & Self-Reliance
-            </p>
-        </div>
-    </div>
-</body>
-</html>"""
-                },
-                "plenary": {
-                    "subject": "Swavlamban 2025 - Plenary Session Pass (26 November)",
-                    "body": f"""<html>
-<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-        <h2 style="color: #1D4E89;">Swavlamban 2025 - Plenary Session Pass</h2>
-
-        <p>Dear {name},</p>
-
-        <p>Your pass for the <strong>Plenary Session</strong> has been generated.</p>
-
-        <div style="background: #f5f7fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h3 style="color: #1D4E89; margin-top: 0;">SESSION DETAILS:</h3>
-            <ul style="list-style: none; padding-left: 0;">
-                <li>📅 <strong>Date:</strong> 26 November 2025 (Tuesday)</li>
-                <li>🕐 <strong>Time:</strong> 1530 - 1615 hrs (Gates open at 1500)</li>
-                <li>📍 <strong>Venue:</strong> Zorawar Hall</li>
-            </ul>
-        </div>
-
-        <div style="background: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h3 style="color: #856404; margin-top: 0;">HIGHLIGHTS:</h3>
-            <ul>
-                <li>Address by Chief Guest</li>
-                <li>CNS Welcome Address</li>
-                <li>Release of Books/Documents/MoUs</li>
-            </ul>
-        </div>
-
-        <p><strong>⚠️ Please be seated by 1620 hrs. Formal dress code mandatory.</strong></p>
-
-        <p style="margin-top: 30px;">For support: <a href="mailto:niio-tdac@navy.gov.in">niio-tdac@navy.gov.in</a></p>
-
-        <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd;">
-            <p style="color: #666; font-size: 14px;">
-                Best regards,<br>
-                <strong>Team Swavlamban 2025</strong><br>
-                Indian Navy | Innovation & Self-Reliance
-            </p>
-        </div>
-    </div>
-</body>
-</html>"""
-                }
-            }
-
-            template = templates.get(pass_type, templates["exhibition_day1"])
+            template = self.PASS_EMAIL_TEMPLATES.get(pass_type, self.PASS_EMAIL_TEMPLATES["exhibition_day1"])
+            html_content = render_placeholders(template["body"], {"name": html.escape(name, quote=False)})
 
             # Prepare attachments
-            attachments = []
-            for pass_file in pass_files:
-                if Path(pass_file).exists():
-                    with open(pass_file, 'rb') as f:
-                        file_content = base64.b64encode(f.read()).decode('utf-8')
-                        attachments.append({
-                            "filename": Path(pass_file).name,
-                            "content": file_content,
-                            "type": "image/png"
-                        })
+            attachments = [
+                {
+                    "filename": attachment.filename,
+                    "content": attachment.base64_content,
+                    "type": attachment.content_type
+                }
+                for attachment in attachment_cache.get_many(pass_files)
+            ]
 
             # Send email
             return self.send_transactional_email(
                 to_email=to_email,
                 subject=template["subject"],
-                html_content=template["body"],
+                html_content=html_content,
                 attachments=attachments if attachments else None,
                 from_name="Swavlamban 2025 Team"
             )
@@ -373,7 +377,7 @@ class MailBlusterService:
         """
         try:
             url = f"{self.API_BASE_URL}/leads/{lead_id}"
-            response = requests.get(url, headers=self._get_headers())
+            response = self.session.get(url, headers=self._get_headers(), timeout=http_sessions.timeout)
 
             if response.status_code == 200:
                 return response.json()
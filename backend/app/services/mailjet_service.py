@@ -2,20 +2,24 @@
 Mailjet API Service
 Fast email sending using Mailjet REST API v3.1
 Much faster than SMTP (10s vs 90s per email)
-Uses official mailjet-rest library (proven to work in 2024)
+Uses the mailjet-rest endpoint configuration over a pooled keep-alive session
 """
 from mailjet_rest import Client
-import base64
+import json
 import time
-from pathlib import Path
 from typing import List, Optional
 
 from ..core.config import settings
+from .attachment_cache import attachment_cache
+from .email_router import BatchRecipient, PLACEHOLDER
+from .http_pool import http_sessions
 
 
 class MailjetService:
     """Service for sending emails via Mailjet API v3.1"""
 
+    MAX_BATCH_SIZE = 50  # Messages per Send API v3.1 request
+
     def __init__(self):
         """Initialize Mailjet API service using official mailjet-rest library"""
         self.api_key = settings.MAILJET_API_KEY
@@ -23,10 +27,39 @@ class MailjetService:
         self.sender_email = settings.EMAIL_SENDER  # Use configured sender email
         self.sender_name = "Swavlamban 2025"
 
+        # Long-lived client and keep-alive connection pool (shared by every send in this process)
+        # mailjet-rest posts through module-level requests calls, so only its endpoint
+        # configuration is used and requests go through the pooled session
+        self.client = Client(auth=(self.api_key, self.api_secret), version='v3.1')
+        self.send_url, self.send_headers = self.client.config['send']
+        self.session = http_sessions.session("mailjet")
+
+    def _post_send(self, data: dict):
+        """POST a Send API v3.1 payload over the pooled connection"""
+        return self.session.post(
+            self.send_url,
+            data=json.dumps(data),
+            headers=self.send_headers,
+            auth=self.client.auth,
+            timeout=http_sessions.timeout
+        )
+
+    @staticmethod
+    def _build_attachments(attachments: List[str]) -> List[dict]:
+        """Build Mailjet attachment objects from file paths"""
+        return [
+            {
+                "ContentType": attachment.content_type,
+                "Filename": attachment.filename,
+                "Base64Content": attachment.base64_content
+            }
+            for attachment in attachment_cache.get_many(attachments)
+        ]
+
     def send_email(self, to_email: str, subject: str, html_content: str,
                    text_content: str = "", attachments: List[str] = None) -> bool:
         """
-        Send email via Mailjet API v3.1 using official mailjet-rest library
+        Send email via Mailjet API v3.1
 
         Args:
             to_email: Recipient email
@@ -41,12 +74,6 @@ class MailjetService:
         try:
             start_time = time.time()
 
-            # Initialize Mailjet client (2024 pattern - PROVEN TO WORK)
-            mailjet = Client(
-                auth=(self.api_key, self.api_secret),
-                version='v3.1'
-            )
-
             # Build message payload
             message = {
                 "From": {
@@ -69,28 +96,8 @@ class MailjetService:
             # Add attachments
             attachment_start = time.time()
             if attachments:
-                message["Attachments"] = []
-                for file_path in attachments:
-                    if Path(file_path).exists():
-                        with open(file_path, 'rb') as f:
-                            file_data = f.read()
-                            file_name = Path(file_path).name
-
-                            # Determine content type based on extension
-                            if file_name.endswith('.png'):
-                                content_type = "image/png"
-                            elif file_name.endswith('.jpg') or file_name.endswith('.jpeg'):
-                                content_type = "image/jpeg"
-                            elif file_name.endswith('.pdf'):
-                                content_type = "application/pdf"
-                            else:
-                                content_type = "application/octet-stream"
-
-                            message["Attachments"].append({
-                                "ContentType": content_type,
-                                "Filename": file_name,
-                                "Base64Content": base64.b64encode(file_data).decode('utf-8')
-                            })
+                # Static images come pre-encoded from the shared attachment cache
+                message["Attachments"] = self._build_attachments(attachments)
             attachment_time = time.time() - attachment_start
 
             # Build full payload
@@ -98,12 +105,12 @@ class MailjetService:
                 "Messages": [message]
             }
 
-            # Send via Mailjet official library (2024 pattern - PROVEN TO WORK)
+            # Send over the pooled keep-alive connection
             api_start = time.time()
-            print(f"📤 Sending to Mailjet API (official library): {to_email}")
+            print(f"📤 Sending to Mailjet API: {to_email}")
             print(f"   API Key: {self.api_key[:10]}...")
 
-            result = mailjet.send.create(data=data)
+            result = self._post_send(data)
             api_time = time.time() - api_start
 
             total_time = time.time() - start_time
@@ -136,11 +143,85 @@ class MailjetService:
             print(f"❌ Failed to send email to {to_email} via Mailjet API: {e}")
             return False
 
+    def send_batch(self, recipients: List[BatchRecipient], subject: str, html_content: str,
+                   text_content: str = "", attachments: List[str] = None) -> List[Optional[str]]:
+        """
+        Send one message per recipient in a single Mailjet API v3.1 request
+
+        The subject, bodies and attachments go in Globals (sent once for the
+        whole batch); each message only carries its recipient and variables.
+        {{key}} placeholders are filled per recipient by Mailjet templating.
+
+        Args:
+            recipients: At most MAX_BATCH_SIZE recipients
+            subject: Email subject with {{key}} placeholders
+            html_content: HTML email body with {{key}} placeholders
+            text_content: Plain text email body (optional)
+            attachments: List of file paths attached to every message
+
+        Returns:
+            Error per recipient, in input order (None = sent)
+        """
+        if len(recipients) > self.MAX_BATCH_SIZE:
+            raise ValueError(f"Mailjet accepts at most {self.MAX_BATCH_SIZE} messages per request")
+
+        globals_part = {
+            "From": {
+                "Email": self.sender_email,
+                "Name": self.sender_name
+            },
+            "Subject": self._template(subject),
+            "HTMLPart": self._template(html_content),
+            "TemplateLanguage": True
+        }
+        if text_content:
+            globals_part["TextPart"] = self._template(text_content)
+        if attachments:
+            # Encoded once and shared by every message of the batch
+            globals_part["Attachments"] = self._build_attachments(attachments)
+
+        data = {
+            "Globals": globals_part,
+            "Messages": [
+                {
+                    "To": [{"Email": recipient.email, "Name": recipient.name}],
+                    "Variables": recipient.values
+                }
+                for recipient in recipients
+            ]
+        }
+
+        start_time = time.time()
+        result = self._post_send(data)
+        response_data = result.json()
+        messages = response_data.get("Messages") or []
+
+        errors: List[Optional[str]] = []
+        for idx in range(len(recipients)):
+            msg_result = messages[idx] if idx < len(messages) else {}
+            if result.status_code == 200 and msg_result.get("Status") == "success":
+                errors.append(None)
+                continue
+            # A 400 rejects the whole request - messages without their own errors share the request error
+            error_msgs = [e.get('ErrorMessage', 'Unknown error') for e in msg_result.get("Errors", [])]
+            errors.append("; ".join(error_msgs) or
+                          f"Mailjet API request failed with status {result.status_code}: "
+                          f"{response_data.get('ErrorMessage', 'batch rejected')}")
+
+        sent = sum(1 for error in errors if error is None)
+        print(f"📬 Mailjet batch: {sent}/{len(recipients)} accepted (took {time.time() - start_time:.1f}s)")
+        return errors
+
+    @staticmethod
+    def _template(text: str) -> str:
+        """Translate {{key}} placeholders to Mailjet template variables"""
+        return PLACEHOLDER.sub(lambda m: '{{var:%s:""}}' % m.group(1), text)
+
     def send_bulk_email(self, recipients: List[dict], subject: str,
                        html_content: str, text_content: str = "",
                        attachments: List[str] = None) -> dict:
         """
-        Send bulk emails via Mailjet API v3.1 using official mailjet-rest library
+        Send bulk emails via Mailjet API v3.1 (batches of MAX_BATCH_SIZE, see send_batch)
 
         Args:
             recipients: List of dicts with 'email' and 'name' keys
@@ -152,114 +233,31 @@ class MailjetService:
         Returns:
             dict: Results with success_count, failed_count, and errors
         """
-        try:
-            start_time = time.time()
-
-            # Initialize Mailjet client (2024 pattern - PROVEN TO WORK)
-            mailjet = Client(
-                auth=(self.api_key, self.api_secret),
-                version='v3.1'
-            )
-
-            # Build messages array (one message per recipient for proper tracking)
-            messages = []
-
-            # Prepare attachments once (reused for all messages)
-            attachment_list = []
-            if attachments:
-                for file_path in attachments:
-                    if Path(file_path).exists():
-                        with open(file_path, 'rb') as f:
-                            file_data = f.read()
-                            file_name = Path(file_path).name
-
-                            # Determine content type
-                            if file_name.endswith('.png'):
-                                content_type = "image/png"
-                            elif file_name.endswith('.jpg') or file_name.endswith('.jpeg'):
-                                content_type = "image/jpeg"
-                            elif file_name.endswith('.pdf'):
-                                content_type = "application/pdf"
-                            else:
-                                content_type = "application/octet-stream"
-
-                            attachment_list.append({
-                                "ContentType": content_type,
-                                "Filename": file_name,
-                                "Base64Content": base64.b64encode(file_data).decode('utf-8')
-                            })
-
-            # Create message for each recipient
-            for recipient in recipients:
-                message = {
-                    "From": {
-                        "Email": self.sender_email,
-                        "Name": self.sender_name
-                    },
-                    "To": [
-                        {
-                            "Email": recipient['email'],
-                            "Name": recipient.get('name', '')
-                        }
-                    ],
-                    "Subject": subject,
-                    "HTMLPart": html_content
-                }
-
-                if text_content:
-                    message["TextPart"] = text_content
-
-                if attachment_list:
-                    message["Attachments"] = attachment_list
-
-                messages.append(message)
-
-            # Build payload
-            data = {
-                "Messages": messages
-            }
-
-            # Send via Mailjet official library (2024 pattern - PROVEN TO WORK)
-            result = mailjet.send.create(data=data)
-
-            total_time = time.time() - start_time
-
-            # Process response
-            results = {
-                'success_count': 0,
-                'failed_count': 0,
-                'errors': []
-            }
-
-            if result.status_code == 200:
-                response_data = result.json()
-                for idx, msg_result in enumerate(response_data.get("Messages", [])):
-                    if msg_result.get("Status") == "success":
-                        results['success_count'] += 1
-                    else:
-                        results['failed_count'] += 1
-                        recipient_email = recipients[idx]['email']
-                        errors = msg_result.get("Errors", [])
-                        error_msgs = [e.get('ErrorMessage', 'Unknown error') for e in errors]
-                        results['errors'].append({
-                            'email': recipient_email,
-                            'errors': error_msgs
-                        })
-
-                print(f"✅ Bulk email completed: {results['success_count']} success, {results['failed_count']} failed (took {total_time:.1f}s)")
-            else:
-                print(f"❌ Mailjet bulk API request failed with status {result.status_code}")
-                results['failed_count'] = len(recipients)
-                results['errors'].append({
-                    'error': f"API request failed: {result.json()}"
-                })
-
-            return results
-
-        except Exception as e:
-            print(f"❌ Failed to send bulk emails via Mailjet API: {e}")
-            return {
-                'success_count': 0,
-                'failed_count': len(recipients) if recipients else 0,
-                'errors': [{'error': str(e)}]
-            }
+        results = {
+            'success_count': 0,
+            'failed_count': 0,
+            'errors': []
+        }
+        batch_recipients = [BatchRecipient(email=r['email'], name=r.get('name', '')) for r in recipients]
+
+        start_time = time.time()
+        for start in range(0, len(batch_recipients), self.MAX_BATCH_SIZE):
+            batch = batch_recipients[start:start + self.MAX_BATCH_SIZE]
+            try:
+                errors = self.send_batch(batch, subject, html_content, text_content, attachments)
+            except Exception as e:
+                print(f"❌ Failed to send bulk emails via Mailjet API: {e}")
+                errors = [str(e)] * len(batch)
+
+            for recipient, error in zip(batch, errors):
+                if error is None:
+                    results['success_count'] += 1
+                else:
+                    results['failed_count'] += 1
+                    results['errors'].append({
+                        'email': recipient.email,
+                        'errors': [error]
+                    })
+
+        print(f"✅ Bulk email completed: {results['success_count']} success, {results['failed_count']} failed (took {time.time() - start_time:.1f}s)")
+        return results
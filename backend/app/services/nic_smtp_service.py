@@ -8,12 +8,11 @@ import base64
 import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from pathlib import Path
 from typing import List, Optional
 
 from ..core.config import settings
+from .attachment_cache import attachment_cache
+from .smtp_pool import get_smtp_pool
 
 
 class NICSmtpService:
@@ -27,6 +26,13 @@ class NICSmtpService:
         self.sender_password = settings.NIC_EMAIL_PASSWORD
         self.use_ssl = True  # Use SSL (port 465) instead of TLS
 
+        # Shared connection pool - login happens once per connection, not per email
+        self.pool = get_smtp_pool(
+            self.smtp_server, self.smtp_port,
+            self.sender_email, self.sender_password,
+            use_ssl=self.use_ssl
+        )
+
     def send_email(self, to_email: str, subject: str, html_content: str,
                    text_content: str = "", attachments: List[str] = None) -> bool:
         """
@@ -60,41 +66,21 @@ class NICSmtpService:
             part2 = MIMEText(html_content, 'html')
             msg.attach(part2)
 
-            # Add attachments
+            # Add attachments (static images come pre-encoded from the cache)
             attachment_start = time.time()
-            if attachments:
-                for file_path in attachments:
-                    if Path(file_path).exists():
-                        with open(file_path, 'rb') as f:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(f.read())
-                            encoders.encode_base64(part)
-                            part.add_header(
-                                'Content-Disposition',
-                                f'attachment; filename={Path(file_path).name}'
-                            )
-                            msg.attach(part)
+            for attachment in attachment_cache.get_many(attachments):
+                msg.attach(attachment.mime_part())
             attachment_time = time.time() - attachment_start
 
-            # Send email using SSL (port 465) instead of TLS (port 587)
-            # Use SMTP_SSL for port 465 instead of SMTP with STARTTLS
+            # Send over a pooled SSL (port 465) connection - reconnects automatically if dropped
             smtp_start = time.time()
-            with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=30) as server:
-                # Disable debug mode for faster sending (was causing 30-60s delays)
-                # server.set_debuglevel(1)  # Commented out for production speed
-                login_start = time.time()
-                server.login(self.sender_email, self.sender_password)
-                login_time = time.time() - login_start
-
-                send_start = time.time()
-                server.send_message(msg)
-                send_time = time.time() - send_start
-
+            self.pool.send_message(msg)
             smtp_time = time.time() - smtp_start
+
             total_time = time.time() - start_time
 
             print(f"✅ Email sent successfully to {to_email} via NIC SMTP")
-            print(f"   ⏱️ Timing breakdown: Total={total_time:.1f}s | Attachments={attachment_time:.1f}s | SMTP={smtp_time:.1f}s (Login={login_time:.1f}s, Send={send_time:.1f}s)")
+            print(f"   ⏱️ Timing breakdown: Total={total_time:.1f}s | Attachments={attachment_time:.1f}s | SMTP={smtp_time:.1f}s")
             return True
 
         except Exception as e:
@@ -106,7 +92,7 @@ class NICSmtpService:
                        attachments: List[str] = None) -> dict:
         """
         Send bulk emails to multiple recipients
-        Uses PERSISTENT CONNECTION for faster bulk sending
+        Uses the shared connection pool (no login per email)
 
         Args:
             recipients: List of email addresses
@@ -121,49 +107,37 @@ class NICSmtpService:
         results = {"success": 0, "failed": 0}
 
         try:
-            # OPTIMIZATION: Reuse single SMTP connection for all emails
-            with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                server.login(self.sender_email, self.sender_password)
-                print(f"✅ Connected to NIC SMTP for bulk sending ({len(recipients)} emails)")
-
-                for email in recipients:
-                    try:
-                        # Create message for this recipient
-                        msg = MIMEMultipart('alternative')
-                        msg['From'] = f"Swavlamban 2025 <{self.sender_email}>"
-                        msg['To'] = email
-                        msg['Subject'] = subject
-
-                        # Add text and HTML parts
-                        if text_content:
-                            part1 = MIMEText(text_content, 'plain')
-                            msg.attach(part1)
-
-                        part2 = MIMEText(html_content, 'html')
-                        msg.attach(part2)
-
-                        # Add attachments
-                        if attachments:
-                            for file_path in attachments:
-                                if Path(file_path).exists():
-                                    with open(file_path, 'rb') as f:
-                                        part = MIMEBase('application', 'octet-stream')
-                                        part.set_payload(f.read())
-                                        encoders.encode_base64(part)
-                                        part.add_header(
-                                            'Content-Disposition',
-                                            f'attachment; filename={Path(file_path).name}'
-                                        )
-                                        msg.attach(part)
-
-                        # Send using persistent connection
-                        server.send_message(msg)
-                        results["success"] += 1
-                        print(f"✅ Sent to {email}")
-
-                    except Exception as e:
-                        results["failed"] += 1
-                        print(f"❌ Failed to send to {email}: {e}")
+            encoded_attachments = attachment_cache.get_many(attachments)
+            print(f"📤 NIC SMTP bulk sending ({len(recipients)} emails)")
+
+            for email in recipients:
+                try:
+                    # Create message for this recipient
+                    msg = MIMEMultipart('alternative')
+                    msg['From'] = f"Swavlamban 2025 <{self.sender_email}>"
+                    msg['To'] = email
+                    msg['Subject'] = subject
+
+                    # Add text and HTML parts
+                    if text_content:
+                        part1 = MIMEText(text_content, 'plain')
+                        msg.attach(part1)
+
+                    part2 = MIMEText(html_content, 'html')
+                    msg.attach(part2)
+
+                    # Add attachments (encoded once for all recipients)
+                    for attachment in encoded_attachments:
+                        msg.attach(attachment.mime_part())
+
+                    # Send over a pooled connection
+                    self.pool.send_message(msg)
+                    results["success"] += 1
+                    print(f"✅ Sent to {email}")
+
+                except Exception as e:
+                    results["failed"] += 1
+                    print(f"❌ Failed to send to {email}: {e}")
 
         except Exception as e:
             print(f"❌ Bulk email connection failed: {e}")
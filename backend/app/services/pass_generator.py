@@ -3,14 +3,84 @@ Pass generation service - QR code generation and overlay on pass templates
 """
 import qrcode
 import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from PIL import Image, ImageDraw, ImageFont
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 
 from ..core.config import settings
 from ..core.security import hash_id_number, create_hmac_signature
 from ..models import Entry
+from .template_cache import template_cache
+from .render_cache import RenderCache
+from .asset_optimizer import asset_optimizer
+from .qr_payload import qr_payload
+
+
+@dataclass
+class PassEntrySnapshot:
+    """
+    Plain copy of the Entry fields needed for rendering
+
+    ORM objects are bound to a DB session and cannot be shipped to worker
+    processes, so batch rendering works on these snapshots instead.
+    """
+    id: int
+    name: str
+    id_type: str
+    id_number: str
+    email: str = ""
+    exhibition_day1: bool = False
+    exhibition_day2: bool = False
+    interactive_sessions: bool = False
+    plenary: bool = False
+    is_exhibitor_pass: bool = False
+
+    @property
+    def is_exhibitor(self) -> bool:
+        """Check if this is an exhibitor pass (from bulk upload)"""
+        return self.is_exhibitor_pass
+
+    @property
+    def has_any_pass(self) -> bool:
+        """Check if any pass is allocated (exhibitor pass or individual passes)"""
+        return bool(self.is_exhibitor_pass or self.exhibition_day1 or self.exhibition_day2
+                    or self.interactive_sessions or self.plenary)
+
+    @classmethod
+    def from_entry(cls, entry: Entry) -> "PassEntrySnapshot":
+        """Build a snapshot from an Entry model"""
+        return cls(
+            id=entry.id,
+            name=entry.name,
+            id_type=entry.id_type,
+            id_number=entry.id_number,
+            email=entry.email,
+            exhibition_day1=bool(entry.exhibition_day1),
+            exhibition_day2=bool(entry.exhibition_day2),
+            interactive_sessions=bool(entry.interactive_sessions),
+            plenary=bool(entry.plenary),
+            is_exhibitor_pass=bool(entry.is_exhibitor_pass)
+        )
+
+
+@dataclass
+class BatchPassResult:
+    """Result of rendering passes for one entry in a batch"""
+    entry_id: int
+    files: List[Path] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
 
 
 class PassGenerator:
@@ -25,6 +95,10 @@ class PassGenerator:
         "plenary": "EP-PLENARY.png"                       # Plenary session
     }
     
+    # QR/layout parameters that affect the rendered PNG - part of the render cache key,
+    # so change this whenever create_qr_image / overlay_qr_on_pass output changes
+    RENDER_PARAMS = "qr:v1,box10,border5,#8B4513/#F5DEB3|overlay:v1,left60,frame-250"
+
     # Session details for QR code
     SESSION_DETAILS = {
         "exhibition_day1": {
@@ -70,6 +144,16 @@ class PassGenerator:
             "venue": "Zorawar Hall, Manekshaw Centre"
         }
     }
+
+    # Pass type -> sessions it admits to (encoded in signed QR payloads)
+    PASS_SESSIONS = {
+        "exhibition_day1": ("exhibition_day1",),
+        "exhibition_day2": ("exhibition_day2",),
+        "exhibition_both_days": ("exhibition_day1", "exhibition_day2"),
+        "exhibition_both_days_exhibitor": ("exhibition_day1", "exhibition_day2"),
+        "interactive_sessions": ("interactive_sessions",),
+        "plenary": ("plenary",)
+    }
     
     def __init__(self):
         self.images_dir = Path(settings.IMAGE_ASSETS_DIR)
@@ -88,9 +172,55 @@ class PassGenerator:
         
         # Pass templates directory
         self.passes_dir = self.images_dir / "Passes"
+
+        # Content-addressed store of rendered passes (generated_passes/_renders/)
+        self.render_cache = RenderCache(self.output_dir)
+
+        # Long-lived render process pool (created on first batch, see render_pool)
+        self._render_pool: Optional[ProcessPoolExecutor] = None
+        self._render_pool_lock = threading.Lock()
     
+    @classmethod
+    def session_window(cls, session_type: str) -> Tuple[datetime, datetime]:
+        """
+        Gate opening and closing time for a session
+
+        Args:
+            session_type: Key of SESSION_DETAILS (single-day sessions)
+
+        Returns:
+            (opens, closes) as aware datetimes in EVENT_TIMEZONE - gates open
+            CHECKIN_EARLY_ENTRY_MINUTES before the session starts
+        """
+        details = cls.SESSION_DETAILS[session_type]
+        tz = ZoneInfo(settings.EVENT_TIMEZONE)
+        day = datetime.strptime(details["date"], "%Y-%m-%d")
+        start = datetime.strptime(details["time_start"], "%H%M")
+        end = datetime.strptime(details["time_end"], "%H%M")
+        opens = day.replace(hour=start.hour, minute=start.minute, tzinfo=tz) - timedelta(
+            minutes=settings.CHECKIN_EARLY_ENTRY_MINUTES
+        )
+        closes = day.replace(hour=end.hour, minute=end.minute, tzinfo=tz)
+        return opens, closes
+
     def generate_qr_data(self, entry: Entry, pass_type: str, username: str) -> str:
-        """Generate clean text format QR data"""
+        """
+        Generate QR data for a pass
+
+        QR_PAYLOAD_MODE 'signed' (default) gives a compact signed payload that
+        gates verify without a database lookup; 'text' gives the human-readable
+        text block below.
+        """
+        if settings.QR_PAYLOAD_MODE == "signed" and pass_type in self.PASS_SESSIONS:
+            sessions = self.PASS_SESSIONS[pass_type]
+            windows = [self.session_window(s) for s in sessions]
+            return qr_payload.encode(
+                entry.id,
+                sessions,
+                valid_from=min(opens for opens, _ in windows),
+                valid_until=max(closes for _, closes in windows)
+            )
+
         session = self.SESSION_DETAILS.get(pass_type, {})
 
         # Format ID number with hyphens to prevent phone number detection on iPhone
@@ -133,12 +263,8 @@ Valid for entry on specified date and session only."""
     def overlay_qr_on_pass(self, pass_template_path: Path, qr_image: Image.Image,
                            output_path: Path, template_filename: str) -> Path:
         """Overlay QR code on pass template - EXACT 2024 code"""
-        # Load the pass template
-        template = Image.open(pass_template_path)
-
-        # Convert palette mode to RGB to preserve QR code colors
-        if template.mode == 'P':
-            template = template.convert('RGB')
+        # Get a copy of the pre-decoded pass template (already RGB)
+        template = template_cache.get(pass_template_path)
 
         # Calculate the size of the left frame
         frame_width = template.width // 3
@@ -163,51 +289,55 @@ Valid for entry on specified date and session only."""
 
         return output_path
     
-    def determine_passes_needed(self, entry: Entry) -> List[tuple]:
+    def determine_passes_needed(self, entry: Entry, verbose: bool = True) -> List[tuple]:
         """Determine which pass files are needed for this entry"""
         passes = []
+        log = print if verbose else (lambda *args, **kwargs: None)
 
         # DEBUG: Log all entry properties
-        print(f"🔍 DEBUG determine_passes_needed for Entry {entry.id}:")
-        print(f"   - Name: {entry.name}")
-        print(f"   - is_exhibitor_pass: {entry.is_exhibitor_pass}")
-        print(f"   - is_exhibitor (property): {entry.is_exhibitor}")
-        print(f"   - exhibition_day1: {entry.exhibition_day1}")
-        print(f"   - exhibition_day2: {entry.exhibition_day2}")
-        print(f"   - interactive_sessions: {entry.interactive_sessions}")
-        print(f"   - plenary: {entry.plenary}")
+        log(f"🔍 DEBUG determine_passes_needed for Entry {entry.id}:")
+        log(f"   - Name: {entry.name}")
+        log(f"   - is_exhibitor_pass: {entry.is_exhibitor_pass}")
+        log(f"   - is_exhibitor (property): {entry.is_exhibitor}")
+        log(f"   - exhibition_day1: {entry.exhibition_day1}")
+        log(f"   - exhibition_day2: {entry.exhibition_day2}")
+        log(f"   - interactive_sessions: {entry.interactive_sessions}")
+        log(f"   - plenary: {entry.plenary}")
 
         # EXHIBITORS get combined exhibition pass for both days
         if entry.is_exhibitor:
-            print(f"   ✅ Adding exhibition_both_days pass (Exhibitor)")
+            log(f"   ✅ Adding exhibition_both_days pass (Exhibitor)")
             passes.append(("exhibition_both_days", self.PASS_TEMPLATES["exhibition_both_days_exhibitor"]))
         else:
             # VISITORS get individual exhibition day passes
             if entry.exhibition_day1:
-                print(f"   ✅ Adding exhibition_day1 pass")
+                log(f"   ✅ Adding exhibition_day1 pass")
                 passes.append(("exhibition_day1", self.PASS_TEMPLATES["exhibition_day1_visitor"]))
             if entry.exhibition_day2:
-                print(f"   ✅ Adding exhibition_day2 pass")
+                log(f"   ✅ Adding exhibition_day2 pass")
                 passes.append(("exhibition_day2", self.PASS_TEMPLATES["exhibition_day2_visitor"]))
 
         # BOTH exhibitors AND visitors can attend interactive sessions
         if entry.interactive_sessions:
-            print(f"   ✅ Adding interactive_sessions pass")
+            log(f"   ✅ Adding interactive_sessions pass")
             passes.append(("interactive_sessions", self.PASS_TEMPLATES["interactive_sessions"]))
 
         # BOTH exhibitors AND visitors can attend plenary session
         if entry.plenary:
-            print(f"   ✅ Adding plenary pass")
+            log(f"   ✅ Adding plenary pass")
             passes.append(("plenary", self.PASS_TEMPLATES["plenary"]))
 
-        print(f"   📊 Total passes to generate: {len(passes)}")
+        log(f"   📊 Total passes to generate: {len(passes)}")
         return passes
     
-    def get_additional_attachments(self, entry: Entry) -> List[Path]:
+    def get_additional_attachments(self, entry: Entry, variant: str = "original") -> List[Path]:
         """
         Get Invitations and Event Flow images based on passes allocated
         Returns list of Path objects for email attachments
 
+        variant="email" returns the compressed email variants (when available)
+        instead of the full-resolution originals.
+
         EMAIL ATTACHMENTS:
         - Invitations (Invitation/)
         - Event Flow schedules (EF/)
@@ -301,12 +431,18 @@ Valid for entry on specified date and session only."""
                     attachments.append(ef_file)
                     print(f"   📅 Added Event Flow: EF26.png (Day 2)")
 
+        if variant == "email":
+            attachments = [asset_optimizer.email_variant(path) for path in attachments]
+
         return attachments
 
-    def generate_passes_for_entry(self, entry: Entry, username: str) -> List[Path]:
+    def generate_passes_for_entry(self, entry: Entry, username: str,
+                                  attachment_variant: str = "original") -> List[Path]:
         """
         Generate all passes for an entry and include DND + Event Flow attachments
         Returns list of all files to be attached to email (QR passes + DNDs + Event Flows)
+
+        attachment_variant="email" selects compressed Invitation/Event Flow images.
         """
         print(f"🎫 Starting pass generation for Entry {entry.id} ({entry.name})")
         print(f"   Passes directory: {self.passes_dir}")
@@ -330,22 +466,38 @@ Valid for entry on specified date and session only."""
             # Generate QR data
             qr_data = self.generate_qr_data(entry, pass_type, username)
 
-            # Create QR image
-            qr_img = self.create_qr_image(qr_data, pass_type, template_filename)
-
             # Output filename
             safe_name = entry.name.replace(" ", "_").replace("/", "-")
             output_filename = f"{safe_name}_{entry.id}_{pass_type}.png"
             output_path = self.output_dir / output_filename
 
-            # Overlay QR on pass (QR already at correct size)
-            self.overlay_qr_on_pass(template_path, qr_img, output_path, template_filename)
+            if settings.PASS_RENDER_CACHE:
+                cache_key = self.render_cache.key(template_path, qr_data, self.RENDER_PARAMS)
+                if self.render_cache.lookup(cache_key):
+                    self.render_cache.materialize(cache_key, output_path)
+                    generated_passes.append(output_path)
+                    print(f"♻️  Reused cached pass: {output_filename}")
+                    continue
+
+                # Render into the cache, then expose it under the usual filename
+                qr_img = self.create_qr_image(qr_data, pass_type, template_filename)
+                render_path = self.render_cache.temp_path(cache_key)
+                self.overlay_qr_on_pass(template_path, qr_img, render_path, template_filename)
+                self.render_cache.store(cache_key, render_path)
+                self.render_cache.materialize(cache_key, output_path)
+            else:
+                # Create QR image
+                qr_img = self.create_qr_image(qr_data, pass_type, template_filename)
+
+                # Overlay QR on pass (QR already at correct size)
+                self.overlay_qr_on_pass(template_path, qr_img, output_path, template_filename)
+
             generated_passes.append(output_path)
 
             print(f"✅ Generated pass: {output_filename}")
 
         # Add DND and Event Flow attachments
-        additional_attachments = self.get_additional_attachments(entry)
+        additional_attachments = self.get_additional_attachments(entry, variant=attachment_variant)
         generated_passes.extend(additional_attachments)
 
         if additional_attachments:
@@ -355,6 +507,144 @@ Valid for entry on specified date and session only."""
 
         return generated_passes
 
+    def render_keys_for_entry(self, entry: Entry, username: str) -> List[str]:
+        """
+        Render cache keys of all passes an entry would get right now
+
+        Used by render cache garbage collection to find renders that are still referenced.
+        """
+        keys = []
+        for pass_type, template_filename in self.determine_passes_needed(entry, verbose=False):
+            template_path = self.passes_dir / template_filename
+            if not template_path.exists():
+                continue
+            qr_data = self.generate_qr_data(entry, pass_type, username)
+            keys.append(self.render_cache.key(template_path, qr_data, self.RENDER_PARAMS))
+        return keys
+
+    def warm_templates(self) -> int:
+        """Decode all pass templates into the template cache"""
+        return template_cache.warm(
+            self.passes_dir / filename for filename in set(self.PASS_TEMPLATES.values())
+        )
+
+    def generate_batch(self, entries: Iterable, username: str,
+                       max_workers: Optional[int] = None,
+                       attachment_variant: str = "original") -> List[BatchPassResult]:
+        """
+        Generate passes for many entries using a process pool
+
+        Rendering (QR encoding + Pillow compositing + PNG encoding) is CPU-bound,
+        so entries are fanned out over the shared render pool (see render_pool).
+        Its workers decode the templates once and are reused by every batch.
+
+        Args:
+            entries: Entry models (or PassEntrySnapshot objects)
+            username: Username of the user generating the passes
+            max_workers: 1 renders in this process; otherwise the pool is used
+                (its size is settings.PASS_RENDER_WORKERS / CPU count)
+            attachment_variant: "original" or "email" (see get_additional_attachments)
+
+        Returns:
+            One BatchPassResult per entry, in input order. Failures are reported
+            per entry and do not abort the batch.
+        """
+        snapshots = [
+            e if isinstance(e, PassEntrySnapshot) else PassEntrySnapshot.from_entry(e)
+            for e in entries
+        ]
+        if not snapshots:
+            return []
+
+        workers = min(max_workers or self.render_pool_size, len(snapshots))
+
+        print(f"🏭 Batch pass generation: {len(snapshots)} entries, {workers} worker(s)")
+
+        # Single entries (or a pool size of 1) are not worth the inter-process round trip
+        if workers == 1:
+            results = []
+            for snapshot in snapshots:
+                try:
+                    files = self.generate_passes_for_entry(snapshot, username, attachment_variant)
+                    results.append(BatchPassResult(entry_id=snapshot.id, files=files))
+                except Exception as e:
+                    print(f"❌ Pass generation failed for Entry {snapshot.id}: {e}")
+                    results.append(BatchPassResult(entry_id=snapshot.id, error=str(e)))
+            return results
+
+        results = []
+        executor = self.render_pool()
+        futures = [
+            executor.submit(_render_entry_in_worker, snapshot, username, attachment_variant)
+            for snapshot in snapshots
+        ]
+        # Collect in submission order so results line up with the input
+        for snapshot, future in zip(snapshots, futures):
+            try:
+                files = [Path(f) for f in future.result()]
+                results.append(BatchPassResult(entry_id=snapshot.id, files=files))
+            except BrokenProcessPool as e:
+                # A worker died - start a fresh pool for the next batch
+                self._discard_render_pool(executor)
+                print(f"❌ Pass generation failed for Entry {snapshot.id}: render pool broke ({e})")
+                results.append(BatchPassResult(entry_id=snapshot.id, error=f"Render pool failed: {e}"))
+            except Exception as e:
+                print(f"❌ Pass generation failed for Entry {snapshot.id}: {e}")
+                results.append(BatchPassResult(entry_id=snapshot.id, error=str(e)))
+
+        failed = sum(1 for r in results if not r.success)
+        print(f"✅ Batch pass generation complete: {len(results) - failed} succeeded, {failed} failed")
+        return results
+
+    @property
+    def render_pool_size(self) -> int:
+        """Worker processes in the render pool (settings.PASS_RENDER_WORKERS, 0 = CPU count)"""
+        return max(settings.PASS_RENDER_WORKERS or os.cpu_count() or 1, 1)
+
+    def render_pool(self) -> ProcessPoolExecutor:
+        """
+        Shared render process pool, created on first use and kept until shutdown
+
+        Workers are started with 'spawn' rather than forked: the API process
+        runs background threads (outbox dispatcher, check-in refresher, bulk
+        jobs), and a forked child could inherit locks held by them.
+        """
+        with self._render_pool_lock:
+            if self._render_pool is None:
+                self._render_pool = ProcessPoolExecutor(
+                    max_workers=self.render_pool_size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_render_worker
+                )
+                print(f"🏭 Render pool started ({self.render_pool_size} worker processes)")
+            return self._render_pool
+
+    def _discard_render_pool(self, executor: ProcessPoolExecutor) -> None:
+        """Forget a broken pool (only if it is still the current one)"""
+        with self._render_pool_lock:
+            if self._render_pool is executor:
+                self._render_pool = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown_render_pool(self) -> None:
+        """Stop the render pool's worker processes (call on app shutdown)"""
+        with self._render_pool_lock:
+            executor, self._render_pool = self._render_pool, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _init_render_worker() -> None:
+    """Process pool initializer - decode templates once per worker"""
+    pass_generator.warm_templates()
+
+
+def _render_entry_in_worker(snapshot: PassEntrySnapshot, username: str,
+                            attachment_variant: str) -> List[str]:
+    """Render passes for one entry inside a worker process"""
+    files = pass_generator.generate_passes_for_entry(snapshot, username, attachment_variant)
+    return [str(p) for p in files]
+
 
 # Create singleton instance
 pass_generator = PassGenerator()
@@ -0,0 +1,110 @@
+"""
+Password hasher - bcrypt off the event loop
+bcrypt at 12 rounds takes ~250ms of CPU; running it inside an async handler
+stalls every other request on the worker. Hashing and verification run in a
+small dedicated thread pool (bcrypt releases the GIL) with a bounded queue
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from ..core.config import settings
+from ..core.security import hash_password, verify_password
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the hashing queue is full (caller should retry shortly)"""
+
+
+class PasswordHasher:
+    """Bounded thread pool for bcrypt with queue-depth metrics"""
+
+    def __init__(self):
+        """Initialize (the pool is created on first use)"""
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0  # Queued + running
+        self._running = 0
+        self._max_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool sized by PASSWORD_HASH_WORKERS"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(settings.PASSWORD_HASH_WORKERS, 1), thread_name_prefix="bcrypt"
+                    )
+        return self._executor
+
+    async def _run(self, fn: Callable, *args):
+        """
+        Run a bcrypt call in the pool
+
+        Raises:
+            PasswordHasherBusyError: more than PASSWORD_HASH_MAX_QUEUE calls already waiting
+        """
+        limit = max(settings.PASSWORD_HASH_WORKERS, 1) + settings.PASSWORD_HASH_MAX_QUEUE
+        with self._lock:
+            if self._pending >= limit:
+                self._rejected += 1
+                raise PasswordHasherBusyError("Too many login requests, please try again in a moment")
+            self._pending += 1
+            self._max_pending = max(self._max_pending, self._pending)
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._wait_total += started - submitted
+                    self._run_total += finished - started
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, job)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password (see core.security.hash_password)"""
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password (see core.security.verify_password)"""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        """Get pool / queue metrics"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": max(settings.PASSWORD_HASH_WORKERS, 1),
+                "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "max_pending": self._max_pending,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_total / completed * 1000, 1) if completed else 0.0,
+                "avg_hash_ms": round(self._run_total / completed * 1000, 1) if completed else 0.0
+            }
+
+
+# Create singleton instance
+password_hasher = PasswordHasher()
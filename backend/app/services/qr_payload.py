@@ -0,0 +1,184 @@
+"""
+Signed QR payload - compact, offline-verifiable pass codes
+A pass QR carries only the entry ID, the sessions it admits, its validity
+window and a truncated HMAC tag, base45-encoded so it fits the QR
+alphanumeric mode (small, low-version codes that scan quickly)
+"""
+import hmac
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import FrozenSet, Iterable
+
+from ..core.config import settings
+from ..core.security import create_hmac_signature
+
+
+class InvalidPayloadError(Exception):
+    """Raised when a QR payload is malformed, has a bad signature or unknown version"""
+
+
+# Prefix marking a signed payload (everything after it is base45)
+PREFIX = "SW:"
+
+# Payload format version (first byte of the signed data)
+VERSION = 1
+
+# version, entry id, session bitmask, valid from, valid until (minutes since epoch, UTC)
+HEADER = struct.Struct(">BIBII")
+
+# Truncated HMAC-SHA256 tag length - 64 bits is plenty for a pass that is valid for two days
+TAG_BYTES = 8
+
+# Session -> bit in the session bitmask
+SESSION_BITS = {
+    "exhibition_day1": 1 << 0,
+    "exhibition_day2": 1 << 1,
+    "interactive_sessions": 1 << 2,
+    "plenary": 1 << 3
+}
+
+# RFC 9285 alphabet - identical to the QR alphanumeric character set
+BASE45_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+BASE45_VALUES = {ch: i for i, ch in enumerate(BASE45_ALPHABET)}
+
+
+def base45_encode(data: bytes) -> str:
+    """Encode bytes as base45 (RFC 9285)"""
+    out = []
+    for i in range(0, len(data) - 1, 2):
+        value = data[i] * 256 + data[i + 1]
+        value, c = divmod(value, 45)
+        e, d = divmod(value, 45)
+        out.append(BASE45_ALPHABET[c] + BASE45_ALPHABET[d] + BASE45_ALPHABET[e])
+    if len(data) % 2:
+        d, c = divmod(data[-1], 45)
+        out.append(BASE45_ALPHABET[c] + BASE45_ALPHABET[d])
+    return "".join(out)
+
+
+def base45_decode(text: str) -> bytes:
+    """
+    Decode base45 text (RFC 9285)
+
+    Raises:
+        ValueError: invalid characters or length
+    """
+    try:
+        values = [BASE45_VALUES[ch] for ch in text]
+    except KeyError:
+        raise ValueError("Invalid base45 character")
+    if len(values) % 3 == 1:
+        raise ValueError("Invalid base45 length")
+
+    out = bytearray()
+    for i in range(0, len(values), 3):
+        chunk = values[i:i + 3]
+        value = sum(v * 45 ** n for n, v in enumerate(chunk))
+        if len(chunk) == 3:
+            if value > 0xFFFF:
+                raise ValueError("Invalid base45 triplet")
+            out.extend(divmod(value, 256))
+        else:
+            if value > 0xFF:
+                raise ValueError("Invalid base45 pair")
+            out.append(value)
+    return bytes(out)
+
+
+def _to_minutes(value: datetime) -> int:
+    """Aware datetime -> minutes since the Unix epoch"""
+    return int(value.timestamp()) // 60
+
+
+def _from_minutes(value: int) -> datetime:
+    """Minutes since the Unix epoch -> aware UTC datetime"""
+    return datetime.fromtimestamp(value * 60, tz=timezone.utc)
+
+
+@dataclass(frozen=True)
+class QRPayload:
+    """Verified contents of a signed pass QR code"""
+    version: int
+    entry_id: int
+    sessions: FrozenSet[str]
+    valid_from: datetime  # UTC
+    valid_until: datetime  # UTC
+
+    def is_valid_at(self, now: datetime) -> bool:
+        """Check the validity window (now must be timezone-aware)"""
+        return self.valid_from <= now <= self.valid_until
+
+
+class QRPayloadCodec:
+    """Encodes and verifies signed pass payloads"""
+
+    @staticmethod
+    def _key() -> str:
+        """Signing key (falls back to the JWT secret)"""
+        return settings.QR_SIGNING_KEY or settings.JWT_SECRET_KEY
+
+    def _tag(self, header: bytes) -> bytes:
+        """Truncated HMAC-SHA256 of the header bytes"""
+        return bytes.fromhex(create_hmac_signature(header.hex(), self._key()))[:TAG_BYTES]
+
+    @staticmethod
+    def is_signed(qr_data: str) -> bool:
+        """Check whether scanned text is a signed payload (vs. the human-readable format)"""
+        return qr_data.strip().startswith(PREFIX)
+
+    def encode(self, entry_id: int, sessions: Iterable[str],
+               valid_from: datetime, valid_until: datetime) -> str:
+        """
+        Build a signed payload
+
+        Args:
+            entry_id: Entry primary key
+            sessions: Session types the pass admits to (keys of SESSION_BITS)
+            valid_from / valid_until: Timezone-aware validity window
+
+        Returns:
+            QR text (PREFIX + base45), 36 characters for the v1 format
+        """
+        mask = 0
+        for session in sessions:
+            mask |= SESSION_BITS[session]
+        header = HEADER.pack(VERSION, entry_id, mask, _to_minutes(valid_from), _to_minutes(valid_until))
+        return PREFIX + base45_encode(header + self._tag(header))
+
+    def decode(self, qr_data: str) -> QRPayload:
+        """
+        Verify and decode a signed payload - no database access
+
+        Raises:
+            InvalidPayloadError: not a signed payload, malformed, unknown version or bad tag
+        """
+        text = qr_data.strip()
+        if not text.startswith(PREFIX):
+            raise InvalidPayloadError("Not a signed pass payload")
+        try:
+            raw = base45_decode(text[len(PREFIX):])
+        except ValueError as e:
+            raise InvalidPayloadError(str(e))
+
+        if not raw or raw[0] != VERSION:
+            raise InvalidPayloadError(f"Unsupported payload version: {raw[0] if raw else 'none'}")
+        if len(raw) != HEADER.size + TAG_BYTES:
+            raise InvalidPayloadError("Invalid payload length")
+
+        header, tag = raw[:HEADER.size], raw[HEADER.size:]
+        if not hmac.compare_digest(tag, self._tag(header)):
+            raise InvalidPayloadError("Invalid signature")
+
+        version, entry_id, mask, valid_from, valid_until = HEADER.unpack(header)
+        return QRPayload(
+            version=version,
+            entry_id=entry_id,
+            sessions=frozenset(s for s, bit in SESSION_BITS.items() if mask & bit),
+            valid_from=_from_minutes(valid_from),
+            valid_until=_from_minutes(valid_until)
+        )
+
+
+# Create singleton instance
+qr_payload = QRPayloadCodec()
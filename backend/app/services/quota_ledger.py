@@ -0,0 +1,186 @@
+"""
+Quota ledger service - atomic entry / pass quota enforcement
+Every allocation change is applied as one conditional UPDATE on the user's
+quota_ledgers row, so concurrent registrations cannot overshoot a quota
+"""
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import Entry, QuotaLedger, User
+
+
+class QuotaExceededError(Exception):
+    """Raised when an allocation would exceed one of the user's quotas"""
+
+    def __init__(self, counter: str, used: int, limit: int, message: str):
+        self.counter = counter
+        self.used = used
+        self.limit = limit
+        super().__init__(message)
+
+
+# Ledger counter -> (Entry pass flag, User limit column, display name)
+PASS_COUNTERS = {
+    "ex_day1_used": ("exhibition_day1", "quota_ex_day1", "Exhibition Day 1"),
+    "ex_day2_used": ("exhibition_day2", "quota_ex_day2", "Exhibition Day 2"),
+    "interactive_used": ("interactive_sessions", "quota_interactive", "Interactive Sessions"),
+    "plenary_used": ("plenary", "quota_plenary", "Plenary")
+}
+
+
+class QuotaLedgerService:
+    """Keeps quota_ledgers in step with entries and enforces quotas"""
+
+    @staticmethod
+    def _limit(user: User, counter: str) -> int:
+        """Quota for a ledger counter"""
+        if counter == "entries_used":
+            return user.max_entries
+        return getattr(user, PASS_COUNTERS[counter][1])
+
+    @staticmethod
+    def allocation(entry) -> Dict[str, int]:
+        """
+        Ledger counters consumed by one entry
+
+        Args:
+            entry: Entry model, EntryCreate schema or dict of pass flags
+        """
+        def flag(name: str) -> bool:
+            if isinstance(entry, dict):
+                return bool(entry.get(name))
+            return bool(getattr(entry, name, False))
+
+        counts = {"entries_used": 1}
+        for counter, (pass_flag, _, _) in PASS_COUNTERS.items():
+            counts[counter] = int(flag(pass_flag))
+        return counts
+
+    def delta(self, before=None, after=None) -> Dict[str, int]:
+        """Counter changes between two allocations (None = no entry)"""
+        old = self.allocation(before) if before is not None else {}
+        new = self.allocation(after) if after is not None else {}
+        return {
+            counter: new.get(counter, 0) - old.get(counter, 0)
+            for counter in ["entries_used", *PASS_COUNTERS]
+        }
+
+    def apply(self, db: Session, user: User, delta: Dict[str, int]) -> None:
+        """
+        Apply counter changes for a user, enforcing quotas for increments
+
+        Runs in the caller's transaction - commit it together with the entry
+        change (or roll back both). On PostgreSQL the UPDATE holds the ledger
+        row lock until then, serializing concurrent allocations for the user.
+
+        Raises:
+            QuotaExceededError: if any incremented counter would pass its quota
+        """
+        changes = {counter: d for counter, d in delta.items() if d}
+        if not changes:
+            return
+
+        values = {counter: getattr(QuotaLedger, counter) + d for counter, d in changes.items()}
+        conditions = [QuotaLedger.username == user.username]
+        for counter, d in changes.items():
+            if d > 0:
+                conditions.append(getattr(QuotaLedger, counter) + d <= self._limit(user, counter))
+
+        stmt = update(QuotaLedger).where(*conditions).values(**values).execution_options(
+            synchronize_session=False
+        )
+
+        # Normal case: one round trip. A miss means either a quota is full or the
+        # user has no ledger row yet (first allocation since the ledger existed).
+        if db.execute(stmt).rowcount == 1:
+            return
+        if self._ensure(db, user.username) and db.execute(stmt).rowcount == 1:
+            return
+        self._raise_exceeded(db, user, changes)
+
+    def _raise_exceeded(self, db: Session, user: User, changes: Dict[str, int]) -> None:
+        """Find the counter that blocked an allocation and raise for it"""
+        ledger = db.get(QuotaLedger, user.username, populate_existing=True)
+        for counter, d in changes.items():
+            if d <= 0:
+                continue
+            used = getattr(ledger, counter) if ledger else 0
+            limit = self._limit(user, counter)
+            if used + d > limit:
+                if counter == "entries_used":
+                    message = f"Entry quota exceeded. Maximum {limit} entries allowed."
+                else:
+                    name = PASS_COUNTERS[counter][2]
+                    message = f"{name} quota exceeded. You have allocated {used} passes out of {limit} allowed."
+                raise QuotaExceededError(counter, used, limit, message)
+        # Should not happen - ledger row could not be created or changed concurrently
+        raise QuotaExceededError("entries_used", 0, 0, "Quota check failed, please try again.")
+
+    @staticmethod
+    def counts_from_entries(db: Session, username: str) -> Dict[str, int]:
+        """Count a user's current allocations directly from the entries table"""
+        def count_where(condition, label: str):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0).label(label)
+
+        row = db.query(
+            func.count(Entry.id).label("entries_used"),
+            *[count_where(getattr(Entry, pass_flag).is_(True), counter)
+              for counter, (pass_flag, _, _) in PASS_COUNTERS.items()]
+        ).filter(Entry.username == username).one()
+        return {counter: getattr(row, counter) for counter in ["entries_used", *PASS_COUNTERS]}
+
+    def _ensure(self, db: Session, username: str) -> bool:
+        """
+        Create a user's ledger row from the entries table if it does not exist
+
+        Returns:
+            True if the row was missing (and has now been created)
+        """
+        if db.get(QuotaLedger, username) is not None:
+            return False
+        try:
+            with db.begin_nested():
+                db.add(QuotaLedger(username=username, **self.counts_from_entries(db, username)))
+        except IntegrityError:
+            # Created concurrently by another request
+            pass
+        return True
+
+    def rebuild(self, db: Session, username: Optional[str] = None) -> int:
+        """
+        Recompute ledger rows from the entries table (after manual data fixes)
+
+        Args:
+            db: Database session (committed by this method)
+            username: Only rebuild this user (default: all users)
+
+        Returns:
+            Number of ledger rows written
+        """
+        query = db.query(User.username)
+        if username:
+            query = query.filter(User.username == username)
+
+        written = 0
+        for (name,) in query.all():
+            counts = self.counts_from_entries(db, name)
+            ledger = db.get(QuotaLedger, name)
+            if ledger is None:
+                db.add(QuotaLedger(username=name, **counts))
+            else:
+                for counter, value in counts.items():
+                    setattr(ledger, counter, value)
+            written += 1
+        db.commit()
+        return written
+
+    def forget(self, db: Session, username: str) -> None:
+        """Drop a user's ledger row (when the user is deleted)"""
+        db.query(QuotaLedger).filter(QuotaLedger.username == username).delete(synchronize_session=False)
+
+
+# Create singleton instance
+quota_ledger = QuotaLedgerService()
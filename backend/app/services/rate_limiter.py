@@ -0,0 +1,248 @@
+"""
+Email rate limiter - token bucket per provider with a daily cap
+Sends run at each provider's allowed rate (with short bursts) instead of
+fixed sleeps, and a provider whose daily quota is used up is skipped.
+Rates are enforced per process; daily caps are counted in the database.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models import EmailProviderUsage
+
+
+class TokenBucket:
+    """
+    Token bucket for one provider (thread-safe, per process)
+
+    Tokens refill at per_second up to burst. A send reserves its tokens
+    even when the bucket is empty - the balance goes negative and the
+    caller sleeps until it is repaid - so concurrent senders queue up in
+    order instead of polling.
+    """
+
+    def __init__(self, per_second: float, burst: float, daily: int):
+        """
+        Args:
+            per_second: Sustained sends per second (0 = unlimited)
+            burst: Sends allowed back to back after an idle period
+            daily: Sends per UTC day (0 = unlimited) - enforced by DailyQuota
+        """
+        self.per_second = max(per_second, 0.0)
+        self.burst = max(burst, 1.0)
+        self.daily = max(int(daily), 0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.acquired = 0
+        self.waited = 0  # Reservations (sends or batch requests) that had to wait for tokens
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.rejected = 0  # Sends refused because the daily cap was reached
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.per_second)
+        self.updated = now
+
+    def reject(self, count: int = 1) -> None:
+        """Count sends refused because the daily cap was reached"""
+        with self._lock:
+            self.rejected += count
+
+    def reserve(self, count: int = 1) -> float:
+        """
+        Reserve count sends
+
+        Returns:
+            Seconds to wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.acquired += count
+            if not self.per_second:
+                return 0.0
+
+            self.tokens -= count
+            delay = -self.tokens / self.per_second if self.tokens < 0 else 0.0
+            if delay > 0:
+                self.waited += 1
+                self.wait_seconds += delay
+                self.max_wait_seconds = max(self.max_wait_seconds, delay)
+            return delay
+
+    def stats(self) -> dict:
+        """Limits, current tokens and wait-time metrics"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "per_second": self.per_second,
+                "burst": self.burst,
+                "tokens": round(self.tokens, 2),
+                "daily_cap": self.daily,
+                "acquired": self.acquired,
+                "waited": self.waited,
+                "wait_seconds_total": round(self.wait_seconds, 2),
+                "wait_seconds_avg": round(self.wait_seconds / self.waited, 2) if self.waited else 0.0,
+                "wait_seconds_max": round(self.max_wait_seconds, 2),
+                "rejected_daily_cap": self.rejected
+            }
+
+
+class DailyQuota:
+    """
+    Sends per provider and UTC day, shared by all processes
+
+    Reservations are taken from the provider's email_provider_usage row with
+    a conditional UPDATE (sent + count <= cap), so processes cannot overshoot
+    the cap together and a restart does not reset it.
+    """
+
+    def take(self, provider: str, count: int, cap: int) -> bool:
+        """
+        Reserve count of today's sends
+
+        If the usage table cannot be reached the send is allowed (the
+        provider enforces its own quota) rather than blocking all email.
+
+        Returns:
+            False if the daily cap would be exceeded
+        """
+        today = datetime.utcnow().date()
+        db = SessionLocal()
+        try:
+            for _ in range(2):
+                result = db.execute(
+                    update(EmailProviderUsage)
+                    .where(
+                        EmailProviderUsage.provider == provider,
+                        EmailProviderUsage.day == today,
+                        EmailProviderUsage.sent + count <= cap
+                    )
+                    .values(sent=EmailProviderUsage.sent + count)
+                )
+                if result.rowcount == 1:
+                    db.commit()
+                    return True
+                db.rollback()
+                if db.get(EmailProviderUsage, (provider, today)) is not None or count > cap:
+                    return False
+                # First send of the day - another process may create the row concurrently
+                try:
+                    db.add(EmailProviderUsage(provider=provider, day=today, sent=count))
+                    db.commit()
+                    return True
+                except IntegrityError:
+                    db.rollback()
+            return False
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Daily quota check for {provider} failed ({e}) - sending anyway")
+            return True
+        finally:
+            db.close()
+
+    def release(self, provider: str, count: int) -> None:
+        """
+        Give back count of today's reserved sends that were not delivered
+
+        The conditional decrement (sent >= count) never takes the counter
+        below zero, e.g. for a reservation made before UTC midnight.
+        """
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(EmailProviderUsage)
+                .where(
+                    EmailProviderUsage.provider == provider,
+                    EmailProviderUsage.day == datetime.utcnow().date(),
+                    EmailProviderUsage.sent >= count
+                )
+                .values(sent=EmailProviderUsage.sent - count)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Daily quota refund for {provider} failed: {e}")
+        finally:
+            db.close()
+
+    def used(self, provider: str) -> Optional[int]:
+        """Sends reserved today by all processes (None if unavailable)"""
+        db = SessionLocal()
+        try:
+            usage = db.get(EmailProviderUsage, (provider, datetime.utcnow().date()))
+            return usage.sent if usage else 0
+        except Exception:
+            return None
+        finally:
+            db.close()
+
+
+class ProviderRateLimiter:
+    """Token buckets for every provider, configured by EMAIL_RATE_LIMITS"""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        """
+        Args:
+            limits: {provider: {"per_second", "burst", "daily"}} (default: settings.EMAIL_RATE_LIMITS)
+        """
+        self.limits = settings.EMAIL_RATE_LIMITS if limits is None else limits
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.quota = DailyQuota()
+
+    def bucket(self, provider: str) -> TokenBucket:
+        """Bucket for a provider (unconfigured providers are unlimited)"""
+        with self._lock:
+            if provider not in self._buckets:
+                limit = self.limits.get(provider, {})
+                self._buckets[provider] = TokenBucket(
+                    per_second=float(limit.get("per_second", 0)),
+                    burst=float(limit.get("burst", 1)),
+                    daily=int(limit.get("daily", 0))
+                )
+            return self._buckets[provider]
+
+    def acquire(self, provider: str, count: int = 1) -> bool:
+        """
+        Wait until count sends to the provider are allowed
+
+        Args:
+            provider: Provider key ('brevo', 'mailjet', ...)
+            count: Messages about to be sent (a batch request takes one token per recipient)
+
+        Returns:
+            False if the provider's daily cap is reached (nothing reserved, use another provider)
+        """
+        bucket = self.bucket(provider)
+        if bucket.daily and not self.quota.take(provider, count, bucket.daily):
+            bucket.reject(count)
+            return False
+        delay = bucket.reserve(count)
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    def release(self, provider: str, count: int = 1) -> None:
+        """Refund the daily cap for count acquired sends that failed (tokens are not refunded)"""
+        if count > 0 and self.bucket(provider).daily:
+            self.quota.release(provider, count)
+
+    def stats(self, providers: List[str]) -> Dict[str, dict]:
+        """Rate limit metrics per provider (sent_today is shared, the rest is this process)"""
+        stats = {}
+        for provider in providers:
+            bucket = self.bucket(provider)
+            stats[provider] = bucket.stats()
+            stats[provider]["sent_today"] = self.quota.used(provider) if bucket.daily else None
+        return stats
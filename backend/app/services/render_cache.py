@@ -0,0 +1,158 @@
+"""
+Pass render cache - content-addressed store of rendered pass PNGs
+A rendered pass only depends on the template bytes, the QR payload and the render
+parameters, so repeat generation / re-sends of an unchanged entry reuse the stored PNG
+"""
+import hashlib
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+class RenderCache:
+    """
+    On-disk cache of rendered passes under <output_dir>/_renders/<hash>.png
+
+    Files in generated_passes/ are hard links to the cached render (copies on
+    filesystems without hard link support), so a hit costs no rendering and no
+    PNG encoding.
+    """
+
+    CACHE_DIR = "_renders"
+
+    def __init__(self, output_dir: Path):
+        """Initialize cache inside the pass output directory"""
+        self.root = Path(output_dir) / self.CACHE_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Resolved template path -> (mtime_ns, size, sha256 of file bytes)
+        self._template_digests: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def template_digest(self, template_path: Path) -> str:
+        """SHA-256 of a template file (recomputed only when the file changes)"""
+        path = Path(template_path).resolve()
+        stat = path.stat()
+        with self._lock:
+            cached = self._template_digests.get(str(path))
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                return cached[2]
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+
+        with self._lock:
+            self._template_digests[str(path)] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def key(self, template_path: Path, qr_data: str, render_params: str) -> str:
+        """
+        Build the cache key for one pass
+
+        Args:
+            template_path: Pass template the QR is drawn on
+            qr_data: Exact QR payload
+            render_params: Serialized QR/layout parameters (bump when rendering changes)
+
+        Returns:
+            Hex digest identifying the rendered PNG
+        """
+        h = hashlib.sha256()
+        for part in (self.template_digest(template_path), qr_data, render_params):
+            h.update(part.encode('utf-8'))
+            h.update(b'\0')
+        return h.hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Location of a cached render"""
+        return self.root / f"{key}.png"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Get a cached render, or None on a miss"""
+        path = self.path_for(key)
+        with self._lock:
+            if path.exists():
+                self.hits += 1
+                return path
+            self.misses += 1
+        return None
+
+    def temp_path(self, key: str) -> Path:
+        """Unique temporary path to render into before store() (safe across processes)"""
+        return self.root / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp.png"
+
+    def store(self, key: str, rendered_path: Path) -> Path:
+        """Atomically move a freshly rendered file into the cache"""
+        cached = self.path_for(key)
+        os.replace(rendered_path, cached)
+        return cached
+
+    def materialize(self, key: str, output_path: Path) -> Path:
+        """
+        Expose a cached render at output_path
+
+        Uses a hard link when possible and falls back to a copy.
+        """
+        cached = self.path_for(key)
+        output_path = Path(output_path)
+
+        try:
+            if output_path.exists() and os.path.samefile(cached, output_path):
+                return output_path
+        except OSError:
+            pass
+
+        tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(cached, tmp_path)
+        except OSError:
+            shutil.copyfile(cached, tmp_path)
+        os.replace(tmp_path, output_path)
+        return output_path
+
+    def collect_garbage(self, referenced_keys: Iterable[str], min_age_seconds: int = 3600) -> Dict[str, int]:
+        """
+        Delete cached renders that no entry references any more
+
+        Args:
+            referenced_keys: Keys of all passes that current entries would render
+            min_age_seconds: Keep renders younger than this (may belong to in-flight jobs)
+
+        Returns:
+            Counts of kept / removed files and bytes freed
+        """
+        keep: Set[str] = set(referenced_keys)
+        cutoff = time.time() - min_age_seconds
+        kept = removed = freed = 0
+
+        for path in self.root.iterdir():
+            if not path.is_file():
+                continue
+            stat = path.stat()
+            is_tmp = path.name.startswith('.')
+            if not is_tmp and path.stem in keep:
+                kept += 1
+                continue
+            if stat.st_mtime > cutoff:
+                kept += 1
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += stat.st_size
+
+        return {"kept": kept, "removed": removed, "bytes_freed": freed}
+
+    def stats(self) -> dict:
+        """Get cache counters"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses
+            }
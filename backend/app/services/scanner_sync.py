@@ -0,0 +1,399 @@
+"""
+Scanner sync service - offline gate scanners
+Devices download valid pass tokens, revocations and recorded check-ins as
+keyset-paginated deltas, scan offline, and upload their check-ins in batches
+"""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import server_timestamp_param
+from ..models import CheckIn, Entry, PassRevocation, ScannerDevice, User
+from .checkin_index import checkin_index
+from .live_counters import live_counters
+from .pass_generator import PassGenerator, pass_generator
+
+
+class SyncCursorError(Exception):
+    """Raised when a sync cursor cannot be decoded"""
+
+
+class ScannerSyncService:
+    """Builds sync deltas for scanner devices and ingests offline check-ins"""
+
+    # ------------------------------------------------------------------
+    # Cursors
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode_cursor(cursor: dict) -> str:
+        """Opaque URL-safe cursor"""
+        raw = json.dumps(cursor, separators=(",", ":"), default=str).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(since: Optional[str]) -> dict:
+        """
+        Decode a cursor from a previous sync (None = full download)
+
+        Raises:
+            SyncCursorError: malformed cursor
+        """
+        if not since:
+            return {"u": None, "e": 0, "ru": None, "r": 0, "cu": None, "c": 0}
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(since + "=" * (-len(since) % 4)))
+            # Cursors from before revocations / check-ins had timestamps (no "ru" / "cu")
+            # re-download those from the start - devices apply them idempotently
+            return {
+                "u": datetime.fromisoformat(cursor["u"]) if cursor.get("u") else None,
+                "e": int(cursor["e"]),
+                "ru": datetime.fromisoformat(cursor["ru"]) if cursor.get("ru") else None,
+                "r": int(cursor["r"]),
+                "cu": datetime.fromisoformat(cursor["cu"]) if cursor.get("cu") else None,
+                "c": int(cursor["c"])
+            }
+        except (ValueError, KeyError, TypeError) as e:
+            raise SyncCursorError(f"Invalid sync cursor: {e}")
+
+    @staticmethod
+    def _keyset(changed_at, row_id, settled: datetime, after: Optional[datetime], after_id: int):
+        """
+        Rows changed before the settle time and after the (changed_at, id) cursor
+
+        Args:
+            changed_at: Server-default timestamp column (updated_at / revoked_at)
+            row_id: Primary key column (tie-breaker)
+            settled: Rows changed after this are held back until the next sync
+            after: Cursor timestamp (None = from the start)
+            after_id: Cursor id
+        """
+        condition = changed_at < server_timestamp_param(settled)
+        if after is None:
+            return condition
+        after = server_timestamp_param(after)
+        return and_(condition, or_(changed_at > after, and_(changed_at == after, row_id > after_id)))
+
+    @staticmethod
+    def _utc(value: Optional[datetime]) -> Optional[datetime]:
+        """Naive UTC datetime (the format check-in times are stored in)"""
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    # ------------------------------------------------------------------
+    # Devices
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_device(db: Session, device_id: str, operator: User) -> Optional[ScannerDevice]:
+        """
+        Look up a scanner device, registering unknown devices on first contact
+
+        Returns:
+            The device, or None if it has been deactivated
+        """
+        device = db.get(ScannerDevice, device_id)
+        if device is None:
+            device = ScannerDevice(device_id=device_id, device_name=device_id,
+                                   operator_username=operator.username)
+            db.add(device)
+            db.flush()
+        return device if device.is_active else None
+
+    # ------------------------------------------------------------------
+    # Delta download
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _pass_record(entry: Entry, organization: Optional[str]) -> dict:
+        """Everything a device needs to verify an entry's passes offline"""
+        passes = pass_generator.determine_passes_needed(entry, verbose=False)
+        sessions = set()
+        for pass_type, _ in passes:
+            sessions.update(PassGenerator.PASS_SESSIONS.get(pass_type, ()))
+        return {
+            "entry_id": entry.id,
+            "name": entry.name,
+            "organization": organization or "",
+            "sessions": sorted(sessions),
+            "tokens": [pass_generator.generate_qr_data(entry, pass_type, entry.username)
+                       for pass_type, _ in passes]
+        }
+
+    def sync(self, db: Session, device: ScannerDevice, since: Optional[str] = None,
+             limit: Optional[int] = None) -> dict:
+        """
+        Changes since a device's last sync
+
+        Entries, revocations and check-ins are each paged on a (timestamp, id)
+        keyset - updated_at, revoked_at and updated_at (bumped when an offline
+        scan moves a check-in). Devices call again with the returned cursor
+        while has_more is true. Rows changed in the last
+        SCANNER_SYNC_SETTLE_SECONDS are held back until the next sync, so the
+        cursor never moves past a timestamp (or a lower id) that other
+        transactions may still commit (timestamps have one-second resolution
+        on SQLite).
+
+        Args:
+            db: Database session (committed by this method - updates last_sync)
+            device: Scanner device
+            since: Cursor from the previous response (None = full download)
+            limit: Maximum rows of each kind (default SCANNER_SYNC_PAGE_SIZE)
+
+        Returns:
+            Dict matching ScannerSyncResponse
+
+        Raises:
+            SyncCursorError: malformed cursor
+        """
+        cursor = self._decode_cursor(since)
+        limit = max(1, min(limit or settings.SCANNER_SYNC_PAGE_SIZE, settings.SCANNER_SYNC_PAGE_SIZE))
+
+        settled = datetime.utcnow() - timedelta(seconds=settings.SCANNER_SYNC_SETTLE_SECONDS)
+        entries = db.query(Entry, User.organization).join(User, User.username == Entry.username).filter(
+            self._keyset(Entry.updated_at, Entry.id, settled, cursor["u"], cursor["e"])
+        ).order_by(Entry.updated_at, Entry.id).limit(limit + 1).all()
+
+        revocations = db.query(PassRevocation.id, PassRevocation.entry_id, PassRevocation.revoked_at).filter(
+            self._keyset(PassRevocation.revoked_at, PassRevocation.id, settled, cursor["ru"], cursor["r"])
+        ).order_by(PassRevocation.revoked_at, PassRevocation.id).limit(limit + 1).all()
+
+        checkins = db.query(
+            CheckIn.id, CheckIn.entry_id, CheckIn.session_type, CheckIn.check_in_time,
+            CheckIn.gate_number, CheckIn.updated_at
+        ).filter(
+            self._keyset(CheckIn.updated_at, CheckIn.id, settled, cursor["cu"], cursor["c"])
+        ).order_by(CheckIn.updated_at, CheckIn.id).limit(limit + 1).all()
+
+        has_more = len(entries) > limit or len(revocations) > limit or len(checkins) > limit
+        entries, revocations, checkins = entries[:limit], revocations[:limit], checkins[:limit]
+
+        next_cursor = dict(cursor)
+        if entries:
+            last = entries[-1][0]
+            next_cursor["u"], next_cursor["e"] = last.updated_at, last.id
+        if revocations:
+            next_cursor["ru"], next_cursor["r"] = revocations[-1].revoked_at, revocations[-1].id
+        if checkins:
+            next_cursor["cu"], next_cursor["c"] = checkins[-1].updated_at, checkins[-1].id
+
+        # Build records before the commit expires the loaded entries
+        passes = [self._pass_record(entry, organization) for entry, organization in entries]
+        device.last_sync = datetime.utcnow()
+        db.commit()
+
+        return {
+            "cursor": self._encode_cursor(next_cursor),
+            "has_more": has_more,
+            "passes": passes,
+            # A full download has nothing to revoke on the device
+            "revoked": [r.entry_id for r in revocations] if since else [],
+            "checked_in": [
+                {"entry_id": c.entry_id, "session_type": c.session_type,
+                 "checked_in_at": c.check_in_time, "gate_number": c.gate_number}
+                for c in checkins
+            ]
+        }
+
+    # ------------------------------------------------------------------
+    # Revocations
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def revoke(db: Session, entry_ids: List[int], reason: str, revoked_by: Optional[str] = None) -> None:
+        """Log revoked passes - call in the same transaction as the delete"""
+        db.bulk_insert_mappings(PassRevocation, [
+            {"entry_id": entry_id, "reason": reason, "revoked_by": revoked_by}
+            for entry_id in entry_ids
+        ])
+
+    # ------------------------------------------------------------------
+    # Batch upload
+    # ------------------------------------------------------------------
+
+    def upload_checkins(self, db: Session, device: ScannerDevice, operator: str,
+                        scans: List[dict]) -> dict:
+        """
+        Ingest check-ins recorded offline, in one transaction
+
+        Idempotent: re-uploading a batch changes nothing. Conflicts (the same
+        attendee and session scanned at several gates) resolve to the earliest
+        scan - an existing check-in that is later than an offline scan is
+        moved to the offline scan's time and gate. Scans of deleted entries
+        are rejected individually ('revoked' / 'not_found'); the rest of the
+        batch is still stored.
+
+        Args:
+            db: Database session (committed by this method)
+            device: Uploading scanner device
+            operator: Username of the uploading operator
+            scans: Dicts with scan_id, qr_data, session_type, scanned_at, gate_number, gate_location
+
+        Returns:
+            Dict matching ScannerBatchResponse
+        """
+        results: List[dict] = []
+        # (entry_id, session_type) -> [(scanned_at UTC, result index, scan)]
+        claims: Dict[Tuple[int, str], List[Tuple[datetime, int, dict]]] = {}
+
+        for scan in scans:
+            scanned_at = scan["scanned_at"]
+            if scanned_at.tzinfo is None:
+                scanned_at = scanned_at.replace(tzinfo=timezone.utc)
+            outcome = checkin_index.verify(scan["qr_data"], scan.get("session_type"), now=scanned_at)
+            results.append({
+                "scan_id": scan.get("scan_id"),
+                "status": outcome.status,
+                "message": outcome.message,
+                "entry_id": outcome.entry.id if outcome.entry else None,
+                "session_type": outcome.session_type,
+                "checked_in_at": None
+            })
+            if outcome.valid:
+                key = (outcome.entry.id, outcome.session_type)
+                claims.setdefault(key, []).append((self._utc(scanned_at), len(results) - 1, scan))
+
+        # The index may still hold entries deleted on another worker
+        self._reject_missing(claims, results, self._missing_entries(db, claims))
+
+        final_times = {}
+        new_rows: List[dict] = []
+        conflicts = 0
+        while claims:
+            try:
+                final_times, new_rows = self._store_claims(db, device, operator, claims, results)
+                db.commit()
+                break
+            except IntegrityError:
+                db.rollback()
+                missing = self._missing_entries(db, claims)
+                if missing:
+                    # Entry deleted since the check above (foreign key) - drop those scans and retry
+                    self._reject_missing(claims, results, missing)
+                    continue
+                # A concurrent upload / live scan inserted the same check-in first - retry once
+                if conflicts:
+                    raise
+                conflicts += 1
+
+        for key, checked_in_at in final_times.items():
+            checkin_index.mark_checked_in(key[0], key[1], checked_in_at)
+            for _, index, _ in claims[key]:
+                results[index]["checked_in_at"] = checked_in_at
+        for row in new_rows:
+            live_counters.record(row["session_type"], row["gate_number"], row["check_in_time"])
+
+        counts = {status: sum(1 for r in results if r["status"] == status) for status in ("accepted", "duplicate")}
+        print(f"📲 Scanner {device.device_id}: {len(results)} offline scans, "
+              f"{counts['accepted']} accepted, {counts['duplicate']} duplicate")
+        return {
+            "received": len(results),
+            "accepted": counts["accepted"],
+            "duplicates": counts["duplicate"],
+            "rejected": len(results) - counts["accepted"] - counts["duplicate"],
+            "results": results
+        }
+
+    @staticmethod
+    def _missing_entries(db: Session, claims: Dict[Tuple[int, str], list]) -> Dict[int, str]:
+        """
+        Entries of the claims that no longer exist
+
+        Returns:
+            {entry_id: 'revoked' (deleted after its passes were issued) or 'not_found'}
+        """
+        entry_ids = {entry_id for entry_id, _ in claims}
+        if not entry_ids:
+            return {}
+        missing = entry_ids - {entry_id for (entry_id,) in db.query(Entry.id).filter(Entry.id.in_(entry_ids))}
+        if not missing:
+            return {}
+        revoked: Set[int] = {
+            entry_id for (entry_id,) in
+            db.query(PassRevocation.entry_id).filter(PassRevocation.entry_id.in_(missing))
+        }
+        return {entry_id: "revoked" if entry_id in revoked else "not_found" for entry_id in missing}
+
+    @staticmethod
+    def _reject_missing(claims: Dict[Tuple[int, str], List[Tuple[datetime, int, dict]]],
+                        results: List[dict], missing: Dict[int, str]) -> None:
+        """Mark the scans of deleted entries rejected and remove them from the claims"""
+        if not missing:
+            return
+        checkin_index.evict(missing)
+        for key in [key for key in claims if key[0] in missing]:
+            status = missing[key[0]]
+            message = "Pass has been revoked" if status == "revoked" else "No registration found for this pass"
+            for _, index, _ in claims.pop(key):
+                results[index].update(status=status, message=message, checked_in_at=None)
+
+    def _store_claims(self, db: Session, device: ScannerDevice, operator: str,
+                      claims: Dict[Tuple[int, str], List[Tuple[datetime, int, dict]]],
+                      results: List[dict]) -> Tuple[Dict[Tuple[int, str], datetime], List[dict]]:
+        """
+        Insert / move check-ins for valid offline scans (earliest scan wins)
+
+        Returns:
+            (final check-in time per key, inserted rows)
+        """
+        existing = {
+            (c.entry_id, c.session_type): c
+            for c in db.query(CheckIn).filter(
+                CheckIn.entry_id.in_({entry_id for entry_id, _ in claims})
+            ).with_for_update()
+            if (c.entry_id, c.session_type) in claims
+        }
+
+        new_rows = []
+        final_times = {}
+        for key, scans in claims.items():
+            scans.sort(key=lambda s: s[0])
+            scanned_at, winner, scan = scans[0]
+            session_name = PassGenerator.SESSION_DETAILS[key[1]]["name"]
+            current = existing.get(key)
+            current_time = self._utc(current.check_in_time) if current else None
+
+            for _, index, _ in scans:
+                results[index].update(status="duplicate", message=f"Already checked in to {session_name}")
+
+            if current is not None and current_time <= scanned_at:
+                # Already recorded (by a live scan, another gate or an earlier upload of this batch)
+                final_times[key] = current_time
+                continue
+
+            values = {
+                "check_in_time": scanned_at,
+                "gate_number": scan.get("gate_number") or device.gate_number,
+                "gate_location": scan.get("gate_location") or device.gate_location,
+                "scanner_device_id": device.device_id,
+                "scanner_operator": operator
+            }
+            if current is None:
+                new_rows.append(dict(values, entry_id=key[0], session_type=key[1],
+                                     session_name=session_name, verification_status="verified"))
+                results[winner].update(status="accepted", message=f"Welcome to {session_name}")
+            else:
+                current.notes = (f"Earlier offline scan replaced check-in at {current_time:%Y-%m-%d %H:%M:%S} "
+                                 f"({current.gate_number or current.scanner_device_id or 'unknown gate'})")
+                # The update bumps updated_at, so devices download the moved check-in again
+                for column, value in values.items():
+                    setattr(current, column, value)
+                results[winner].update(status="accepted",
+                                       message=f"Welcome to {session_name} (earliest scan, replaced later check-in)")
+            final_times[key] = scanned_at
+
+        if new_rows:
+            db.bulk_insert_mappings(CheckIn, new_rows)
+        db.flush()
+        return final_times, new_rows
+
+
+# Create singleton instance
+scanner_sync = ScannerSyncService()
@@ -0,0 +1,225 @@
+"""
+SMTP connection pool - keeps authenticated SMTP connections open between sends
+Shared by NIC SMTP and Gmail SMTP services so login/handshake is not paid per email
+"""
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.message import Message
+from typing import Deque, Dict, Tuple
+
+from ..core.config import settings
+
+
+class _PooledConnection:
+    """An authenticated SMTP connection with bookkeeping timestamps"""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of logged-in SMTP connections
+
+    - Idle connections older than keepalive_interval are checked with NOOP before reuse
+    - Connections older than max_age are closed and replaced
+    - send_message() reconnects once on SMTPServerDisconnected
+    """
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 use_ssl: bool = True, max_size: int = None, max_age: int = None,
+                 keepalive_interval: int = None, timeout: int = 30):
+        """Initialize pool (connections are opened lazily)"""
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.max_size = max_size or settings.SMTP_POOL_SIZE
+        self.max_age = max_age or settings.SMTP_POOL_MAX_AGE_SECONDS
+        self.keepalive_interval = keepalive_interval or settings.SMTP_KEEPALIVE_SECONDS
+        self.timeout = timeout
+
+        self._idle: Deque[_PooledConnection] = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+
+        # Counters for monitoring
+        self.connects = 0
+        self.reuses = 0
+        self.reconnects = 0
+
+    def _connect(self) -> _PooledConnection:
+        """Open and authenticate a new connection"""
+        start = time.time()
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            server.starttls()
+        server.login(self.username, self.password)
+        self.connects += 1
+        print(f"🔌 SMTP connection opened to {self.host}:{self.port} ({time.time() - start:.1f}s)")
+        return _PooledConnection(server)
+
+    @staticmethod
+    def _close(conn: _PooledConnection) -> None:
+        """Close a connection, ignoring errors from already-dead sockets"""
+        try:
+            conn.server.quit()
+        except Exception:
+            try:
+                conn.server.close()
+            except Exception:
+                pass
+
+    def _is_usable(self, conn: _PooledConnection) -> bool:
+        """Check age and (if idle for a while) liveness of a connection"""
+        now = time.monotonic()
+        if now - conn.created_at > self.max_age:
+            return False
+        if now - conn.last_used > self.keepalive_interval:
+            try:
+                code, _ = conn.server.noop()
+                return code == 250
+            except OSError:  # includes SMTPException
+                return False
+        return True
+
+    def _acquire(self) -> _PooledConnection:
+        """Get a usable connection, opening one if the pool has capacity"""
+        while True:
+            with self._cond:
+                while not self._idle and self._open >= self.max_size:
+                    self._cond.wait()
+                conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    self._open += 1
+
+            if conn is None:
+                break
+
+            # Liveness check (NOOP) outside the lock - a slow server must not block other senders
+            if self._is_usable(conn):
+                with self._cond:
+                    self.reuses += 1
+                return conn
+            self._close(conn)
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+
+        # Connect outside the lock - login can take seconds
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn: _PooledConnection, discard: bool = False) -> None:
+        """Return a connection to the pool (or drop it if it is broken)"""
+        with self._cond:
+            if discard:
+                self._open -= 1
+                self._close(conn)
+            else:
+                conn.last_used = time.monotonic()
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection
+
+        Usage:
+            with pool.connection() as server:
+                server.send_message(msg)
+        """
+        conn = self._acquire()
+        try:
+            yield conn.server
+        except smtplib.SMTPServerDisconnected:
+            self._release(conn, discard=True)
+            raise
+        except smtplib.SMTPException:
+            # Protocol-level errors (e.g. refused recipient) leave the connection usable
+            self._release(conn)
+            raise
+        except OSError:
+            # Socket errors - connection state is unknown
+            self._release(conn, discard=True)
+            raise
+        except Exception:
+            self._release(conn)
+            raise
+        else:
+            self._release(conn)
+
+    def send_message(self, msg: Message) -> None:
+        """
+        Send a message over a pooled connection
+
+        Reconnects and retries once if the server dropped the connection.
+        """
+        for attempt in range(2):
+            try:
+                with self.connection() as server:
+                    server.send_message(msg)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                if attempt:
+                    raise
+                self.reconnects += 1
+                print(f"🔄 SMTP connection to {self.host} lost ({e}), reconnecting...")
+
+    def close_all(self) -> None:
+        """Close all idle connections"""
+        with self._cond:
+            while self._idle:
+                self._open -= 1
+                self._close(self._idle.pop())
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Get pool counters"""
+        with self._cond:
+            return {
+                "server": f"{self.host}:{self.port}",
+                "open": self._open,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "connects": self.connects,
+                "reuses": self.reuses,
+                "reconnects": self.reconnects
+            }
+
+
+# One pool per (server, account) shared across the whole process
+_pools: Dict[Tuple[str, int, str, bool], SMTPConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(host: str, port: int, username: str, password: str,
+                  use_ssl: bool = True) -> SMTPConnectionPool:
+    """Get the shared pool for an SMTP server and account"""
+    key = (host, port, username, use_ssl)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.password != password:
+            pool = SMTPConnectionPool(host, port, username, password, use_ssl=use_ssl)
+            _pools[key] = pool
+        return pool
+
+
+def smtp_pool_stats() -> list:
+    """Get counters for all SMTP pools"""
+    with _pools_lock:
+        return [pool.stats() for pool in _pools.values()]
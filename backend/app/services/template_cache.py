@@ -0,0 +1,108 @@
+"""
+Pass template cache - keeps decoded pass templates in memory
+Templates are decoded once per process and handed out as cheap copies for compositing
+"""
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+from PIL import Image
+
+
+class TemplateCache:
+    """Process-wide cache of decoded (RGB) pass templates"""
+
+    def __init__(self):
+        """Initialize empty cache"""
+        # Resolved path -> (mtime_ns, decoded image)
+        self._templates: Dict[str, Tuple[int, Image.Image]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, template_path: Path) -> Image.Image:
+        """Decode a template from disk (palette images converted to RGB)"""
+        with Image.open(template_path) as img:
+            # Convert palette mode to RGB to preserve QR code colors
+            if img.mode == 'P':
+                template = img.convert('RGB')
+            else:
+                template = img.copy()
+        return template
+
+    def get(self, template_path: Path) -> Image.Image:
+        """
+        Get a copy of the decoded template, safe to paste onto
+
+        Args:
+            template_path: Path to the pass template PNG
+
+        Returns:
+            A fresh copy of the decoded template image
+        """
+        return self.get_shared(template_path).copy()
+
+    def get_shared(self, template_path: Path) -> Image.Image:
+        """
+        Get the cached decoded template itself (must NOT be modified)
+
+        The entry is keyed by filename and modification time, so replacing
+        a template on disk invalidates the cached copy automatically.
+        """
+        key = str(Path(template_path).resolve())
+        mtime_ns = Path(template_path).stat().st_mtime_ns
+
+        with self._lock:
+            cached = self._templates.get(key)
+            if cached and cached[0] == mtime_ns:
+                self.hits += 1
+                return cached[1]
+
+        # Decode outside the lock so other templates are not blocked
+        template = self._load(template_path)
+
+        with self._lock:
+            self.misses += 1
+            self._templates[key] = (mtime_ns, template)
+
+        if cached:
+            print(f"🔄 Template changed on disk, reloaded: {Path(template_path).name}")
+        return template
+
+    def warm(self, template_paths) -> int:
+        """
+        Pre-decode a set of templates
+
+        Args:
+            template_paths: Iterable of template paths
+
+        Returns:
+            Number of templates loaded
+        """
+        loaded = 0
+        for template_path in template_paths:
+            if Path(template_path).exists():
+                self.get_shared(template_path)
+                loaded += 1
+        return loaded
+
+    def invalidate(self, template_path: Path = None) -> None:
+        """Drop one template (or all templates) from the cache"""
+        with self._lock:
+            if template_path is None:
+                self._templates.clear()
+            else:
+                self._templates.pop(str(Path(template_path).resolve()), None)
+
+    def stats(self) -> dict:
+        """Get cache hit/miss counters"""
+        with self._lock:
+            return {
+                "templates_cached": len(self._templates),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# Create singleton instance
+template_cache = TemplateCache()
@@ -0,0 +1,80 @@
+"""
+User cache - short-lived cache of authenticated users
+Saves the users table round trip that get_current_user makes on every
+authenticated request; entries expire after USER_CACHE_TTL_SECONDS and are
+invalidated immediately (in this worker) when a user is changed
+"""
+import copy
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..core.config import settings
+from ..models import User
+
+# Mapped column attributes of User (what gets cached - no relationships)
+USER_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+class UserCache:
+    """
+    Username -> column values of the User row, with a per-user version
+
+    The version is bumped by invalidate(); a lookup that raced with an update
+    (version changed while it read the database) is not cached. Other API
+    workers pick up changes when their entry expires, so deactivation takes
+    effect everywhere within USER_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        """Initialize empty cache"""
+        self._entries: Dict[str, Tuple[float, int, dict]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, username: str) -> Optional[User]:
+        """
+        Get a user, from the cache if fresh
+
+        Cached users are attached to the request session without a query
+        (merge with load=False), so endpoints can use them like a loaded
+        row - lazy relationships and changes committed with db both work.
+
+        Args:
+            db: Request database session
+            username: Username from the access token
+
+        Returns:
+            User or None if it does not exist
+        """
+        ttl = settings.USER_CACHE_TTL_SECONDS
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._entries.get(username)
+            version = self._versions.get(username, 0)
+        if ttl > 0 and cached and cached[0] > now and cached[1] == version:
+            user = User(**copy.deepcopy(cached[2]))
+            make_transient_to_detached(user)
+            return db.merge(user, load=False)
+
+        user = db.query(User).filter(User.username == username).first()
+        if user is not None and ttl > 0:
+            values = {key: copy.deepcopy(getattr(user, key)) for key in USER_COLUMNS}
+            with self._lock:
+                if self._versions.get(username, 0) == version:
+                    self._entries[username] = (now + ttl, version, values)
+        return user
+
+    def invalidate(self, username: str) -> None:
+        """Drop a user from the cache (call after changing or deleting the user)"""
+        with self._lock:
+            self._versions[username] = self._versions.get(username, 0) + 1
+            self._entries.pop(username, None)
+
+
+# Create singleton instance
+user_cache = UserCache()
@@ -0,0 +1,135 @@
+"""
+Concurrency regression benchmark - light requests during pass generation
+Checks that blocking work (database calls, Pillow rendering) runs in the
+threadpool, so cheap requests are not serialised behind pass generations
+
+Usage:
+    python benchmark_concurrency.py ENTRY_ID                   # in-process app
+    python benchmark_concurrency.py ENTRY_ID --url=http://localhost:8000
+    python benchmark_concurrency.py ENTRY_ID --username=admin --password=admin123 --generations=4 --requests=40
+"""
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+
+from app.core.config import settings
+
+
+def parse_args() -> dict:
+    """ENTRY_ID plus --name=value options"""
+    options = {"url": None, "username": "admin", "password": "admin123",
+               "generations": "4", "requests": "40"}
+    positional = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--") and "=" in arg:
+            name, value = arg[2:].split("=", 1)
+            options[name] = value
+        else:
+            positional.append(arg)
+    if not positional:
+        print(__doc__)
+        sys.exit(1)
+    options["entry_id"] = int(positional[0])
+    return options
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile in milliseconds"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index] * 1000
+
+
+async def timed(client: httpx.AsyncClient, method: str, path: str, **kwargs) -> float:
+    """Seconds taken by one request (raises on error responses)"""
+    start = time.perf_counter()
+    response = await client.request(method, path, **kwargs)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def light_requests(client: httpx.AsyncClient, count: int) -> list:
+    """Cheap authenticated requests, issued concurrently in small waves"""
+    latencies = []
+    for _ in range(0, count, 5):
+        latencies += await asyncio.gather(*[
+            timed(client, "GET", f"{settings.API_V1_PREFIX}/entries/stats") for _ in range(5)
+        ])
+    return latencies
+
+
+async def run(options: dict) -> bool:
+    """Run the benchmark, return True if light requests were not serialised"""
+    if options["url"]:
+        transport = None
+        base_url = options["url"].rstrip("/")
+    else:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://benchmark"
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=120) as client:
+        response = await client.post(f"{settings.API_V1_PREFIX}/auth/login", json={
+            "username": options["username"], "password": options["password"]
+        })
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        generate = f"{settings.API_V1_PREFIX}/passes/generate/{options['entry_id']}"
+        generations = int(options["generations"])
+        count = int(options["requests"])
+
+        # Warm up (template cache, connection pool) and measure one generation alone
+        await timed(client, "POST", generate, json={"send_email": False})
+        single_generation = await timed(client, "POST", generate, json={"send_email": False})
+
+        baseline = await light_requests(client, count)
+
+        load = asyncio.gather(*[
+            timed(client, "POST", generate, json={"send_email": False}) for _ in range(generations)
+        ])
+        await asyncio.sleep(0)
+        under_load = await light_requests(client, count)
+        generation_times = await load
+
+    print(f"📄 Pass generation: {single_generation * 1000:.0f} ms alone, "
+          f"{max(generation_times) * 1000:.0f} ms slowest of {generations} concurrent")
+    print(f"⚡ Light requests (baseline):   p50 {percentile(baseline, 50):.1f} ms | p95 {percentile(baseline, 95):.1f} ms")
+    print(f"⚡ Light requests (under load): p50 {percentile(under_load, 50):.1f} ms | p95 {percentile(under_load, 95):.1f} ms")
+
+    # Serialised handlers would add at least a whole generation to every light request
+    return statistics.median(under_load) < statistics.median(baseline) + single_generation
+
+
+def main():
+    """Run the concurrency benchmark"""
+    options = parse_args()
+
+    print("=" * 60)
+    print("⏱️  Swavlamban 2025 - Concurrency Benchmark")
+    print("=" * 60)
+    print(f"   Target: {options['url'] or 'in-process app'}")
+    print(f"   Entry: {options['entry_id']} | Concurrent generations: {options['generations']} | Light requests: {options['requests']}")
+    print()
+
+    ok = asyncio.run(run(options))
+
+    print()
+    print("=" * 60)
+    if ok:
+        print("✅ Light requests are not serialised behind pass generation")
+    else:
+        print("❌ Light requests waited for pass generation - blocking work on the event loop?")
+    print("=" * 60)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
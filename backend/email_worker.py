@@ -0,0 +1,63 @@
+"""
+Email worker - sends queued pass emails from the email_outbox table
+Run one or more of these next to the API; each process runs
+EMAIL_OUTBOX_WORKERS concurrent senders
+
+Usage:
+    python email_worker.py              # EMAIL_OUTBOX_WORKERS senders
+    python email_worker.py --workers 8  # override the number of senders
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.core.database import init_db, SessionLocal
+from app.services.email_outbox import email_outbox
+
+
+def main():
+    """Run the email outbox workers until interrupted"""
+    workers = settings.EMAIL_OUTBOX_WORKERS
+    if "--workers" in sys.argv[1:]:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
+    print("=" * 60)
+    print("📮 Swavlamban 2025 - Email Outbox Worker")
+    print("=" * 60)
+    print(f"   Worker: {email_outbox.worker_id}")
+    print(f"   Senders: {workers} | Max attempts: {settings.EMAIL_OUTBOX_MAX_ATTEMPTS} | "
+          f"Retry base: {settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS}s")
+    for provider, limit in settings.EMAIL_RATE_LIMITS.items():
+        print(f"   Rate limit {provider}: {limit.get('per_second', 0)}/s, burst {limit.get('burst', 1)} (this process), "
+              f"daily cap {limit.get('daily', 0) or 'none'} (all processes)")
+    print()
+
+    init_db()
+    email_outbox.start(workers)
+
+    try:
+        while True:
+            time.sleep(60)
+            db = SessionLocal()
+            try:
+                stats = email_outbox.stats(db)
+            finally:
+                db.close()
+            print(f"📊 Outbox: {stats['queued']} queued, {stats['sending']} sending, "
+                  f"{stats['sent']} sent, {stats['failed']} failed")
+    except KeyboardInterrupt:
+        print()
+        print("⏹️  Stopping - waiting for emails being sent to finish...")
+        email_outbox.stop()
+
+    print("=" * 60)
+    print("✅ Email worker stopped")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Garbage-collect the pass render cache (generated_passes/_renders/)
+Removes cached renders that no current entry would produce any more
+(entry deleted, renamed, passes changed or template replaced)
+
+Usage:
+    python gc_render_cache.py                  # keep renders younger than 1 hour
+    python gc_render_cache.py --min-age 0      # remove every unreferenced render
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.database import SessionLocal
+from app.models import Entry
+from app.services.pass_generator import pass_generator
+
+
+def main():
+    """Collect referenced render keys and delete the rest"""
+    min_age = 3600
+    args = sys.argv[1:]
+    if "--min-age" in args:
+        min_age = int(args[args.index("--min-age") + 1])
+
+    print("=" * 60)
+    print("🧹 Swavlamban 2025 - Render Cache Cleanup")
+    print("=" * 60)
+    print(f"   Cache directory: {pass_generator.render_cache.root}")
+    print(f"   Keeping unreferenced renders younger than {min_age}s")
+    print()
+
+    db = SessionLocal()
+    referenced = set()
+    entries = 0
+    try:
+        # QR payloads are built per entry owner, same as pass generation
+        for entry in db.query(Entry).yield_per(500):
+            referenced.update(pass_generator.render_keys_for_entry(entry, entry.username))
+            entries += 1
+    finally:
+        db.close()
+
+    print(f"🔍 {entries} entries reference {len(referenced)} render(s)")
+
+    result = pass_generator.render_cache.collect_garbage(referenced, min_age_seconds=min_age)
+
+    print()
+    print("=" * 60)
+    print(f"✅ Removed {result['removed']} render(s), kept {result['kept']}, freed {result['bytes_freed']:,} bytes")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Build compressed email variants of Invitation / Event Flow / DND images
+Run this after replacing any image in images/Invitation, images/EF or images/DND
+
+Usage:
+    python optimize_assets.py            # build missing/stale variants
+    python optimize_assets.py --force    # rebuild everything
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.services.asset_optimizer import asset_optimizer
+
+
+def main():
+    """Optimize all email assets"""
+    force = "--force" in sys.argv[1:]
+
+    print("=" * 60)
+    print("🗜️  Swavlamban 2025 - Email Asset Optimizer")
+    print("=" * 60)
+    print(f"   Images directory: {asset_optimizer.images_dir}")
+    print(f"   Format: {settings.EMAIL_ASSET_FORMAT} | Max dimension: {settings.EMAIL_ASSET_MAX_DIMENSION}px | Quality: {settings.EMAIL_ASSET_QUALITY}")
+    print(f"   Force rebuild: {force}")
+    print()
+
+    variants = asset_optimizer.optimize_all(force=force)
+
+    total_original = 0
+    total_variant = 0
+    for variant in variants:
+        original = variant.parent.parent / f"{variant.stem}.png"
+        if original.exists():
+            total_original += original.stat().st_size
+            total_variant += variant.stat().st_size
+
+    print()
+    print("=" * 60)
+    if total_original:
+        print(f"📦 {total_original:,} -> {total_variant:,} bytes ({100 * total_variant / total_original:.0f}% of original)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ import requests
 import sys
 import os
 from pathlib import Path
-import time
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent / "backend"))
@@ -132,9 +131,7 @@ def send_all_exhibitor_passes():
                 # Don't fail the whole process if health check fails
                 print(f"   ⚠️ Health check failed (non-critical): {health_error}")
 
-        # Small delay to avoid overwhelming the API
-        if idx < len(exhibitors):
-            time.sleep(2)
+        # No fixed delay - emails are queued and the server paces them per provider (EMAIL_RATE_LIMITS)
 
     # Step 4: Summary
     print()
@@ -3,6 +3,10 @@
 ONE-TIME SCRIPT: Send schedule update email to exhibitors
 Notifies about Plenary Session moved from 26 Nov to 25 Nov
 This script sends a custom message and is NOT for regular use
+
+Usage:
+    python send_exhibitor_schedule_update.py        # TEST email only
+    python send_exhibitor_schedule_update.py --all  # All exhibitors (batched)
 """
 import sys
 import os
@@ -19,71 +23,23 @@ os.environ['DB_NAME'] = 'postgres'
 os.environ['DB_USER'] = 'postgres.scvzcvpyvmwzigusdsjl'
 os.environ['DB_PASSWORD'] = 'Ra3epL4uy45G9qTO'
 
-# Brevo API key and sender email should be set in .env file
+# Email provider API keys and sender email should be set in .env file
 # If not set, the script will fail with appropriate error message
 
 from app.core.database import get_db
 from app.models.entry import Entry
-from app.services.pass_generator import PassGenerator
-from app.services.brevo_service import BrevoService
-
-def send_exhibitor_schedule_update():
-    """Send schedule update email - FIRST RUN SENDS TEST TO abhishekvardhan86@gmail.com"""
-
-    print("=" * 70)
-    print("EXHIBITOR SCHEDULE UPDATE EMAIL SENDER (ONE-TIME)")
-    print("=" * 70)
-    print()
-
-    # Get database session
-    db = next(get_db())
-
-    # Get first exhibitor for TEST email
-    exhibitor = db.query(Entry).filter(Entry.is_exhibitor_pass == True).first()
-
-    if not exhibitor:
-        print("❌ No exhibitors found in database!")
-        return
-
-    print(f"📊 Sending TEST email FIRST for validation")
-    print(f"   Using exhibitor data: {exhibitor.name}")
-    print(f"   Test will be sent to: abhishekvardhan86@gmail.com")
-    print()
-
-    # Use only ONE exhibitor for test
-    exhibitors = [exhibitor]
-
-    print("=" * 70)
-    print("SENDING TEST EMAIL...")
-    print("=" * 70)
-    print()
-
-    success_count = 0
-    failed_count = 0
-
-    # Initialize pass generator and Brevo service
-    pass_gen = PassGenerator()
-    brevo = BrevoService()
+from app.services.pass_generator import pass_generator
+from app.services.email_service import email_service
+from app.services.email_router import BatchRecipient
 
-    for idx, exhibitor in enumerate(exhibitors, 1):
-        test_email = "abhishekvardhan86@gmail.com"
-        print(f"[{idx}/{len(exhibitors)}] Processing: {exhibitor.name} → {test_email}")
+TEST_EMAIL = "abhishekvardhan86@gmail.com"
 
-        try:
-            # Generate exhibitor passes
-            pass_files = pass_gen.generate_passes_for_entry(exhibitor, exhibitor.username)
+# CUSTOM ONE-TIME EMAIL with schedule change notice ({{name}} is filled per recipient)
+SUBJECT = "IMPORTANT: Schedule Change - Swavlamban 2025"
 
-            if not pass_files:
-                print(f"  ⚠️  No pass files generated!")
-                failed_count += 1
-                continue
-
-            # CUSTOM ONE-TIME EMAIL with schedule change notice
-            subject = "IMPORTANT: Schedule Change - Swavlamban 2025"
-
-            html_body = f"""<html>
+HTML_BODY = """<html>
 <body style="font-family: Arial, sans-serif; line-height: 1.6;">
-<p>Dear {exhibitor.name.title()},</p>
+<p>Dear {{name}},</p>
 
 <h2 style="color: #d32f2f;">IMPORTANT SCHEDULE UPDATE</h2>
 
@@ -122,8 +78,8 @@ def send_exhibitor_schedule_update():
 <h3>ATTACHMENTS:</h3>
 <hr>
 <ul>
-<li>✅ Your Exhibitor Passes (with QR codes)</li>
-<li>✅ Invitation Cards</li>
+<li>✅ Invitation Card</li>
+<li>✅ Your Exhibitor Passes (QR codes) emailed earlier remain valid - no new pass is needed</li>
 </ul>
 
 <hr>
@@ -154,48 +110,110 @@ Indian Navy | Innovation & Self-Reliance</p>
 </body>
 </html>"""
 
-            # Send email using BrevoService (same as registration repo)
-            attachment_paths = [str(pf) for pf in pass_files]  # Convert Path objects to strings
-            result = brevo.send_email(
-                to_email=test_email,
-                subject=subject,
-                html_content=html_body,
-                attachments=attachment_paths
-            )
-
-            if result:
-                print(f"  ✅ Test email sent successfully!")
-                success_count += 1
-            else:
-                print(f"  ❌ Email failed")
-                failed_count += 1
-
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
-            import traceback
-            traceback.print_exc()
-            failed_count += 1
+TEXT_BODY = """Dear {{name}},
 
-        print()
+IMPORTANT SCHEDULE UPDATE
+
+View change in programme of chief guest, the plenary session of 26 Nov 25 has been advanced to 1500 Hr on 25 Nov 25. All personnel are required to be seated by 1430 hr.
+
+PLENARY SESSION - NEW TIMING
+- Date: 25 November 2025 (Tuesday) [CHANGED FROM 26 NOV]
+- Time: 1500 - 1700 hrs
+- Venue: Zorawar Hall, Manekshaw Centre
+- IMPORTANT: Please be seated by 1430 hrs
+
+Your exhibitor passes (QR codes) emailed earlier remain valid - no new pass is needed.
+
+For support or queries, contact:
+011-26771528 | niio-tdac@navy.gov.in
+
+We apologize for any inconvenience caused by this schedule change.
+
+Best regards,
+Team Swavlamban 2025
+Indian Navy | Innovation & Self-Reliance"""
+
+
+def send_exhibitor_schedule_update(send_to_all: bool = False):
+    """
+    Send schedule update email - without --all only a TEST goes to abhishekvardhan86@gmail.com
+
+    The notice is the same for every exhibitor (only the name differs), so it
+    goes out through email_service.send_batch: Brevo/Mailjet batch requests
+    with one shared invitation card instead of one API call per exhibitor.
+    The QR passes do not change with the schedule and are not re-sent.
+    """
+
+    print("=" * 70)
+    print("EXHIBITOR SCHEDULE UPDATE EMAIL SENDER (ONE-TIME)")
+    print("=" * 70)
+    print()
+
+    # Get database session
+    db = next(get_db())
+
+    exhibitors = db.query(Entry).filter(Entry.is_exhibitor_pass == True).order_by(Entry.id).all()
+
+    if not exhibitors:
+        print("❌ No exhibitors found in database!")
+        return
+
+    if send_to_all:
+        # One message per address (an exhibitor may hold several entries)
+        recipients, seen = [], set()
+        for exhibitor in exhibitors:
+            address = (exhibitor.email or "").strip()
+            if address and address.lower() not in seen:
+                seen.add(address.lower())
+                recipients.append(BatchRecipient(email=address, name=exhibitor.name.title()))
+        print(f"📊 Sending schedule update to ALL {len(recipients)} exhibitors")
+    else:
+        # Use only ONE exhibitor for test
+        exhibitor = exhibitors[0]
+        recipients = [BatchRecipient(email=TEST_EMAIL, name=exhibitor.name.title())]
+        print("📊 Sending TEST email FIRST for validation")
+        print(f"   Using exhibitor data: {exhibitor.name}")
+        print(f"   Test will be sent to: {TEST_EMAIL}")
+    print()
+
+    # Invitation card is the same for every exhibitor - attached once per batch
+    attachments = pass_generator.get_additional_attachments(exhibitors[0], variant="email")
+
+    print("=" * 70)
+    print("SENDING EMAIL...")
+    print("=" * 70)
+    print()
+
+    results = email_service.send_batch(
+        recipients, SUBJECT, TEXT_BODY, attachments=attachments, html_body=HTML_BODY
+    )
+
+    failed = [(recipient, result) for recipient, result in zip(recipients, results) if not result.ok]
+    for recipient, result in failed:
+        print(f"  ❌ {recipient.email}: {result.error or 'Email failed'}")
+
+    success_count = len(results) - len(failed)
+    failed_count = len(failed)
 
     # Summary
+    print()
     print("=" * 70)
-    print("TEST EMAIL SUMMARY")
+    print("EMAIL SUMMARY")
     print("=" * 70)
     print(f"✅ Successful: {success_count}")
     print(f"❌ Failed: {failed_count}")
     print()
 
-    if success_count > 0:
-        print("🎉 Test email sent! Please check abhishekvardhan86@gmail.com")
+    if send_to_all:
+        print("🎉 Schedule update sent!" if success_count else "❌ Schedule update failed!")
+    elif success_count > 0:
+        print(f"🎉 Test email sent! Please check {TEST_EMAIL}")
         print()
         print("⚠️  TO SEND TO ALL EXHIBITORS:")
         print("   1. Validate the test email")
-        print("   2. Modify script to query ALL exhibitors")
-        print("   3. Remove test_email override")
-        print("   4. Run again")
+        print("   2. Run again with --all")
     else:
         print("❌ Test email failed!")
 
 if __name__ == "__main__":
-    send_exhibitor_schedule_update()
+    send_exhibitor_schedule_update(send_to_all="--all" in sys.argv[1:])
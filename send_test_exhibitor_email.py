@@ -21,6 +21,7 @@ os.environ['DB_PASSWORD'] = 'Ra3epL4uy45G9qTO'
 from app.core.database import get_db
 from app.models.entry import Entry
 from app.services.email_service import email_service
+from app.services.email_templates import PassSet
 from app.services.pass_generator import PassGenerator
 
 def send_test_email():
@@ -67,7 +68,7 @@ def send_test_email():
             recipient_email="abhishekvardhan86@gmail.com",  # Test email
             recipient_name=exhibitor.name,
             pass_files=pass_files,
-            pass_type="exhibitor"
+            pass_set=PassSet.from_entry(exhibitor)
         )
 
         if result:
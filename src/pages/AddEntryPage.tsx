@@ -45,6 +45,7 @@ export default function AddEntryPage() {
   const [form] = Form.useForm();
   const [loading, setLoading] = useState(false);
   const [csvData, setCsvData] = useState<any[]>([]);
+  const [csvFile, setCsvFile] = useState<File | null>(null);
   const [uploading, setUploading] = useState(false);
   const [uploadProgress, setUploadProgress] = useState(0);
   const [stats, setStats] = useState<any>(null);
@@ -157,6 +158,7 @@ export default function AddEntryPage() {
             console.log('First row object:', parsed[0]);
           }
           setCsvData(parsed);
+          setCsvFile(file);
           message.success(`✅ Loaded ${parsed.length} entries from CSV`, 5);
         } catch (error) {
           console.error('CSV parsing error:', error);
@@ -195,120 +197,30 @@ export default function AddEntryPage() {
       return;
     }
 
+    if (!csvFile) {
+      message.error('No CSV file selected');
+      return;
+    }
+
     setUploading(true);
     let successCount = 0;
     let failedCount = 0;
-    const failedRows: Array<{ row: number; reason: string }> = [];
+    let failedRows: Array<{ row: number; reason: string }> = [];
 
     console.log('Starting bulk upload of', csvData.length, 'entries');
 
-    for (let i = 0; i < csvData.length; i++) {
-      const row = csvData[i];
-      setUploadProgress(((i + 1) / csvData.length) * 100);
-
-      try {
-        // Log the row to see what keys are available
-        console.log('Processing row:', row);
-        console.log('Row keys:', Object.keys(row));
-        console.log('Row values:', Object.values(row));
-
-        // Validate row data - handle multiple header formats (use bracket notation for all)
-        const name = String(row['Name'] || row['name'] || '').trim();
-        const email = String(row['Email'] || row['email'] || '').trim();
-        const phone = String(row['Phone'] || row['phone'] || '').trim();
-        const id_type = String(row['ID_Type'] || row['id_type'] || row['ID Type'] || '').trim();
-        const id_number = String(row['ID_Number'] || row['id_number'] || row['ID Number'] || '').trim();
-
-        console.log('Extracted values:', { name, email, phone, id_type, id_number });
-
-        // Validate required fields
-        if (!name || name === 'nan') {
-          throw new Error('Missing name');
-        }
-
-        if (!email || email === 'nan' || !email.includes('@')) {
-          throw new Error(`Invalid email: ${email}`);
-        }
-
-        const phoneClean = phone.replace(/\D/g, '');
-        if (!phoneClean || phoneClean.length !== 10) {
-          throw new Error(`Invalid phone (must be 10 digits): ${phone}`);
-        }
-
-        // Validate ID type
-        const validIdTypes = ['Aadhaar', 'PAN', 'Passport', 'Driving License', 'Voter ID'];
-        if (!validIdTypes.includes(id_type)) {
-          throw new Error(`Invalid ID type: ${id_type}`);
-        }
-
-        if (!id_number || id_number === 'nan') {
-          throw new Error('Missing ID number');
-        }
-
-        // Parse pass selections - handle multiple header formats (use bracket notation)
-        const exhibition_day1 = String(
-          row['Exhibition_Day_1'] || row['Exhibition Day 1'] || row['exhibition_day1'] || ''
-        ).trim().toLowerCase() === 'yes';
-        const exhibition_day2 = String(
-          row['Exhibition_Day_2'] || row['Exhibition Day 2'] || row['exhibition_day2'] || ''
-        ).trim().toLowerCase() === 'yes';
-        const interactive_sessions = String(
-          row['Interactive_Sessions'] || row['Interactive Sessions'] || row['interactive_sessions'] || ''
-        ).trim().toLowerCase() === 'yes';
-        const plenary = String(
-          row['Plenary'] || row['plenary'] || ''
-        ).trim().toLowerCase() === 'yes';
-
-        console.log('Extracted passes:', { exhibition_day1, exhibition_day2, interactive_sessions, plenary });
-
-        // Check if at least one pass is selected
-        if (!exhibition_day1 && !exhibition_day2 && !interactive_sessions && !plenary) {
-          throw new Error('No passes selected');
-        }
-
-        // Get user's allowed passes
-        const allowed_passes = user?.allowed_passes || {};
-
-        // Check permissions
-        if (exhibition_day1 && !allowed_passes.exhibition_day1) {
-          throw new Error('Not allowed to create Exhibition Day 1 passes');
-        }
-
-        if (exhibition_day2 && !allowed_passes.exhibition_day2) {
-          throw new Error('Not allowed to create Exhibition Day 2 passes');
-        }
-
-        if (interactive_sessions && !allowed_passes.interactive_sessions) {
-          throw new Error('Not allowed to create Interactive Sessions passes');
-        }
-
-        if (plenary && !allowed_passes.plenary) {
-          throw new Error('Not allowed to create Plenary passes');
-        }
-
-        // Create entry
-        const entry = {
-          name,
-          email,
-          phone: phoneClean.startsWith('+91') ? phoneClean : `+91-${phoneClean}`,
-          id_type,
-          id_number,
-          exhibition_day1,
-          exhibition_day2,
-          interactive_sessions,
-          plenary,
-        };
-
-        console.log(`Creating entry ${i + 1}/${csvData.length}:`, entry);
-        await apiService.createEntry(entry);
-        successCount++;
-        console.log(`✅ Entry ${i + 1} created successfully`);
-      } catch (error: any) {
-        failedCount++;
-        const errorMsg = error.response?.data?.detail || error.message || 'Unknown error';
-        console.error(`❌ Entry ${i + 1} failed:`, errorMsg);
-        failedRows.push({ row: i + 2, reason: errorMsg });
-      }
+    try {
+      // Rows are validated, checked for duplicates and inserted server-side in one request
+      const report = await apiService.bulkImportEntries(csvFile, setUploadProgress);
+      successCount = report.created;
+      failedCount = report.failed;
+      failedRows = report.results
+        .filter((result) => result.status === 'failed')
+        .map((result) => ({ row: result.row, reason: result.error || 'Unknown error' }));
+    } catch (error: any) {
+      const errorMsg = error.response?.data?.detail || error.message || 'Unknown error';
+      console.error('❌ Bulk upload failed:', errorMsg);
+      message.error(`Bulk upload failed: ${errorMsg}`);
     }
 
     console.log('Bulk upload complete - Success:', successCount, 'Failed:', failedCount);
@@ -316,6 +228,7 @@ export default function AddEntryPage() {
     setUploading(false);
     setUploadProgress(0);
     setCsvData([]);
+    setCsvFile(null);
 
     if (successCount > 0) {
       message.success(`✅ Successfully uploaded ${successCount} entries!`);
@@ -244,49 +244,29 @@ export default function AdminPanelPage() {
     }
   };
 
-  const handleDownloadAllEntries = () => {
+  const handleDownloadAllEntries = async () => {
     if (entries.length === 0) {
       message.warning('No entries to download');
       return;
     }
 
-    const csvContent = [
-      ['ID', 'Name', 'Organization', 'Email', 'Phone', 'ID Type', 'Entry Type', 'Passes', 'Created'],
-      ...entries.map((entry) => {
-        const user = users.find((u) => u.username === entry.username);
-        const passes: string[] = [];
-        if (entry.exhibition_day1) passes.push('Ex-1');
-        if (entry.exhibition_day2) passes.push('Ex-2');
-        if (entry.interactive_sessions) passes.push('Interactive');
-        if (entry.plenary) passes.push('Plenary');
-
-        return [
-          entry.id,
-          `"${entry.name}"`,
-          `"${user?.organization || 'N/A'}"`,
-          `"${entry.email}"`,
-          `"${entry.phone}"`,
-          `"${entry.id_type}"`,
-          entry.is_exhibitor_pass ? '🏢 Exhibitor' : '👤 Visitor',
-          `"${passes.join(', ')}"`,
-          new Date(entry.created_at).toLocaleDateString(),
-        ];
-      }),
-    ]
-      .map((row) => row.join(','))
-      .join('\n');
-
-    const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-    const link = document.createElement('a');
-    const url = URL.createObjectURL(blob);
-    const timestamp = new Date().toISOString().replace(/[:.]/g, '-').split('T')[0];
-    link.setAttribute('href', url);
-    link.setAttribute('download', `swavlamban2025_all_entries_${timestamp}.csv`);
-    link.style.visibility = 'hidden';
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
-    message.success('CSV file downloaded successfully!');
+    try {
+      // Generated and streamed by the backend - no need to build the CSV in the browser
+      const blob = await apiService.exportEntries({ format: 'csv', include_pass_status: true });
+      const link = document.createElement('a');
+      const url = URL.createObjectURL(blob);
+      const timestamp = new Date().toISOString().replace(/[:.]/g, '-').split('T')[0];
+      link.setAttribute('href', url);
+      link.setAttribute('download', `swavlamban2025_all_entries_${timestamp}.csv`);
+      link.style.visibility = 'hidden';
+      document.body.appendChild(link);
+      link.click();
+      document.body.removeChild(link);
+      URL.revokeObjectURL(url);
+      message.success('CSV file downloaded successfully!');
+    } catch (error: any) {
+      message.error(`Failed to download entries: ${error.message || 'Unknown error'}`);
+    }
   };
 
   const handleDownloadOrgStats = () => {
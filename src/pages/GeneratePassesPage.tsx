@@ -140,7 +140,7 @@ export default function GeneratePassesPage() {
       await apiService.generatePasses(selectedEntry.id, true);
 
       setEmailStage(0);
-      message.success(`✅ Email sent successfully to ${selectedEntry.email}!`, 10);
+      message.success(`✅ Email queued for ${selectedEntry.email} - it is sent in the background`, 10);
       loadEntries();
     } catch (error) {
       console.error('Send email error:', error);
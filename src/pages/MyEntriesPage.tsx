@@ -88,16 +88,16 @@ export default function MyEntriesPage() {
   const handleGeneratePasses = async (entry: Entry) => {
     try {
       console.log('Generating passes for entry:', entry.id);
-      const hide = message.loading('Generating passes and sending email...', 0);
+      const hide = message.loading('Generating passes and queueing email...', 0);
       const result = await apiService.generatePasses(entry.id, true);
       console.log('Pass generation result:', result);
       hide(); // Only destroy the loading message
 
-      // Check if email actually sent - show message for 10 seconds
-      if (result.email_sent) {
-        message.success(`✅ ${result.pass_files.length} passes generated and emailed to ${entry.email}!`, 10);
+      // Email is sent in the background - delivery status shows up on the entry
+      if (result.email_queued) {
+        message.success(`✅ ${result.pass_files.length} passes generated, email to ${entry.email} is on its way!`, 10);
       } else {
-        message.warning(`⚠️ ${result.pass_files.length} passes generated but email failed. ${result.message}`, 10);
+        message.warning(`⚠️ ${result.pass_files.length} passes generated but email was not queued. ${result.message}`, 10);
       }
 
       loadData();
@@ -13,7 +13,13 @@ import type {
   Entry,
   CreateEntryRequest,
   DashboardStats,
-  PassGenerationResponse
+  OrganizationStats,
+  PassGenerationResponse,
+  BulkEmailJob,
+  BulkImportResponse,
+  EntryPage,
+  EntryPageParams,
+  LiveCounters
 } from '../types';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
@@ -107,6 +113,21 @@ class RealApiService {
     return response.data;
   }
 
+  // Bulk entry upload (CSV / XLSX) - validated and inserted server-side in one request
+  async bulkImportEntries(file: File, onProgress?: (percent: number) => void): Promise<BulkImportResponse> {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await this.api.post<BulkImportResponse>('/api/v1/entries/bulk', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+      onUploadProgress: (event) => {
+        if (onProgress && event.total) {
+          onProgress((event.loaded / event.total) * 100);
+        }
+      },
+    });
+    return response.data;
+  }
+
   async updateEntry(id: number, entry: Partial<CreateEntryRequest>): Promise<Entry> {
     const response = await this.api.put<Entry>(`/api/v1/entries/${id}`, entry);
     return response.data;
@@ -127,7 +148,7 @@ class RealApiService {
     const response = await this.api.post<PassGenerationResponse>(
       `/api/v1/passes/generate/${entryId}`,
       { send_email: sendEmail },
-      { timeout: 120000 } // 2 minute timeout for pass generation + email
+      { timeout: 60000 } // Pass generation only - emails are queued and sent in the background
     );
     return response.data;
   }
@@ -143,6 +164,50 @@ class RealApiService {
     return response.data;
   }
 
+  // Paginated entry list with server-side filters - pass next_cursor back as cursor
+  async getEntriesPage(params: EntryPageParams = {}): Promise<EntryPage> {
+    const response = await this.api.get<EntryPage>('/api/v1/admin/entries/page', { params });
+    return response.data;
+  }
+
+  // Server-side export (streamed CSV / XLSX) - returns the file as a Blob
+  async exportEntries(
+    params: Omit<EntryPageParams, 'cursor' | 'limit' | 'order' | 'include_total'> & {
+      format?: 'csv' | 'xlsx';
+      include_pass_status?: boolean;
+      include_checkins?: boolean;
+    } = {}
+  ): Promise<Blob> {
+    const response = await this.api.get('/api/v1/admin/entries/export', { params, responseType: 'blob' });
+    return response.data;
+  }
+
+  async getAllStats(): Promise<OrganizationStats[]> {
+    const response = await this.api.get<OrganizationStats[]>('/api/v1/admin/stats');
+    return response.data;
+  }
+
+  async getLiveCounters(window?: number): Promise<LiveCounters> {
+    const response = await this.api.get<LiveCounters>('/api/v1/checkin/live', {
+      params: window ? { window } : undefined,
+    });
+    return response.data;
+  }
+
+  /**
+   * Subscribe to live check-in counters (Server-Sent Events).
+   * Returns a function that closes the stream.
+   */
+  subscribeLiveCounters(onUpdate: (counters: LiveCounters) => void, window?: number): () => void {
+    const params = new URLSearchParams({ token: localStorage.getItem('token') || '' });
+    if (window) params.set('window', String(window));
+    const source = new EventSource(`${API_URL}/api/v1/checkin/live/stream?${params}`);
+    source.addEventListener('counters', (event) => {
+      onUpdate(JSON.parse((event as MessageEvent).data) as LiveCounters);
+    });
+    return () => source.close();
+  }
+
   async createUser(userData: Partial<User> & { password: string }): Promise<User> {
     const response = await this.api.post<User>('/api/v1/admin/users', userData);
     return response.data;
@@ -157,16 +222,20 @@ class RealApiService {
     await this.api.delete(`/api/v1/admin/users/${username}`);
   }
 
-  // Bulk email
-  async sendBulkEmail(entryIds: number[]): Promise<{ success: number; failed: number; }> {
-    const response = await this.api.post<{ success: number; failed: number; }>(
+  // Bulk email (runs as a background job - poll getBulkEmailJob for progress)
+  async sendBulkEmail(entryIds: number[]): Promise<BulkEmailJob> {
+    const response = await this.api.post<BulkEmailJob>(
       '/api/v1/admin/bulk-email',
-      { entry_ids: entryIds },
-      { timeout: 600000 } // 10 minute timeout for bulk email
+      { entry_ids: entryIds }
     );
     return response.data;
   }
 
+  async getBulkEmailJob(jobId: string): Promise<BulkEmailJob> {
+    const response = await this.api.get<BulkEmailJob>(`/api/v1/admin/bulk-email/${jobId}`);
+    return response.data;
+  }
+
   // Health check
   async healthCheck(): Promise<{ status: string; app?: string; server_ip?: string; database?: string; }> {
     const response = await this.api.get<{ status: string; app?: string; server_ip?: string; database?: string; }>('/health');
@@ -38,6 +38,9 @@ export interface Entry {
   pass_generated_exhibition_day2: boolean;
   pass_generated_interactive_sessions: boolean;
   pass_generated_plenary: boolean;
+  email_status?: 'queued' | 'sent' | 'failed' | null; // Pass email delivery (sent by the email outbox workers)
+  email_status_at?: string | null;
+  email_error?: string | null;
   created_at: string;
   updated_at: string;
 }
@@ -78,8 +81,92 @@ export interface DashboardStats {
   plenary_count: number;
 }
 
+export interface EntryPage {
+  total: number;
+  entries: Entry[];
+  next_cursor: number | null;
+}
+
+export interface EntryPageParams {
+  cursor?: number | null;
+  limit?: number;
+  order?: 'desc' | 'asc';
+  username?: string;
+  organization?: string;
+  pass_type?: 'exhibition_day1' | 'exhibition_day2' | 'interactive_sessions' | 'plenary';
+  is_exhibitor?: boolean;
+  generated?: boolean;
+  search?: string;
+  include_total?: boolean;
+}
+
+export interface BulkImportRowResult {
+  row: number;
+  status: 'created' | 'failed';
+  id_number?: string | null;
+  error?: string | null;
+}
+
+export interface BulkImportResponse {
+  total_rows: number;
+  created: number;
+  failed: number;
+  results: BulkImportRowResult[];
+}
+
+export interface OrganizationStats extends DashboardStats {
+  username: string;
+  organization: string;
+  quota_ex_day1: number;
+  quota_ex_day2: number;
+  quota_interactive: number;
+  quota_plenary: number;
+}
+
+export interface GateCounter {
+  session_type: string;
+  gate_number: string;
+  total: number;
+  last_5_minutes: number;
+}
+
+export interface MinuteCounter {
+  minute: string;
+  session_type: string;
+  gate_number: string;
+  count: number;
+}
+
+export interface LiveCounters {
+  generated_at: string;
+  version: number;
+  total: number;
+  by_session: Record<string, number>;
+  by_gate: GateCounter[];
+  per_minute: MinuteCounter[];
+}
+
 export interface PassGenerationResponse {
   pass_files: string[];
-  email_sent: boolean;
+  email_sent: boolean; // Always false - emails are queued (see email_queued / Entry.email_status)
+  email_queued: boolean;
   message: string;
 }
+
+export interface BulkEmailJob {
+  job_id: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  total: number;
+  processed: number;
+  sent: number;
+  failed: number;
+  remaining: number;
+  throughput_per_minute: number | null;
+  eta_seconds: number | null;
+  failures: { entry_id: number; email: string | null; error: string; }[];
+  error: string | null;
+  created_by: string | null;
+  created_at: string | null;
+  started_at: string | null;
+  finished_at: string | null;
+}